@@ -0,0 +1,205 @@
+import hmac
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import Blueprint, request, jsonify, send_file
+
+import config
+import querylog
+import backup
+import profiler
+import tenants
+import writequeue
+from database import pool_stats
+
+admin = Blueprint("admin", __name__, url_prefix="/admin")
+
+
+def admin_required(f):
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        if not config.ADMIN_TOKEN:
+            return jsonify({"error": "Endpoints administrativos desativados"}), 404
+
+        token = request.headers.get("X-Admin-Token")
+        auth_header = request.headers.get("Authorization", "")
+        if not token and auth_header.startswith("Bearer "):
+            token = auth_header.split(" ")[1]
+
+        if not token or not hmac.compare_digest(token, config.ADMIN_TOKEN):
+            return jsonify({"error": "Acesso negado"}), 403
+
+        return f(*args, **kwargs)
+    return wrapper
+
+
+@admin.route("/queries", methods=["GET"])
+@admin_required
+def query_stats():
+    limit = request.args.get("limit", type=int)
+    order = request.args.get("order", "total")  # total, count, p99, avg, rows
+
+    return jsonify({
+        "enabled": config.QUERY_STATS,
+        "slow_query_ms": config.SLOW_QUERY_MS,
+        "queries": querylog.snapshot(limit=limit, order=order)
+    })
+
+
+@admin.route("/queries", methods=["DELETE"])
+@admin_required
+def reset_query_stats():
+    querylog.reset()
+    return jsonify({"success": True})
+
+
+@admin.route("/writes", methods=["GET"])
+@admin_required
+def write_queue_stats():
+    return jsonify({"enabled": config.WRITE_QUEUE, "queues": writequeue.stats()})
+
+
+@admin.route("/writes/flush", methods=["POST"])
+@admin_required
+def flush_write_queue():
+    return jsonify({"flushed": writequeue.flush(timeout=config.WRITE_QUEUE_TIMEOUT)})
+
+
+@admin.route("/backups", methods=["GET"])
+@admin_required
+def list_backups():
+    return jsonify(backup.list_snapshots())
+
+
+@admin.route("/backups", methods=["POST"])
+@admin_required
+def create_backup():
+    try:
+        return jsonify([backup.snapshot(path) for path in backup.sources()]), 201
+    except (backup.BackupError, sqlite3.Error, OSError) as e:
+        return jsonify({"error": f"Falha no backup: {e}"}), 500
+
+
+@admin.route("/profiler", methods=["GET"])
+@admin_required
+def profiler_status():
+    return jsonify({"toggle": profiler.get_toggle(), "header": config.PROFILE_HEADER, "dir": config.PROFILE_DIR})
+
+
+@admin.route("/profiler", methods=["POST"])
+@admin_required
+def enable_profiler():
+    # {"target": "barbers.get_all_barbers" ou "/barbers", "rate": 0.1, "minutes": 10}
+    data = request.get_json() or {}
+    target = data.get("target")
+    if not target:
+        return jsonify({"error": "Campo 'target' é obrigatório (endpoint ou caminho)"}), 400
+    try:
+        toggle = profiler.set_toggle(target, data.get("rate", 1.0), data.get("minutes", 10))
+    except (TypeError, ValueError):
+        return jsonify({"error": "'rate' e 'minutes' devem ser números"}), 400
+    return jsonify(toggle), 201
+
+
+@admin.route("/profiler", methods=["DELETE"])
+@admin_required
+def disable_profiler():
+    profiler.clear_toggle()
+    return jsonify({"success": True})
+
+
+@admin.route("/profiles", methods=["GET"])
+@admin_required
+def list_profiles():
+    return jsonify(profiler.list_profiles(limit=request.args.get("limit", type=int)))
+
+
+@admin.route("/profiles/<name>", methods=["GET"])
+@admin_required
+def download_profile(name):
+    # ?format=text devolve o pstats legível; senão o .prof para o snakeviz/pstats
+    if request.args.get("format") == "text":
+        sort = request.args.get("sort", "cumulative")
+        if sort not in profiler.SORT_KEYS:
+            return jsonify({"error": f"sort inválido: {sort}", "valid": profiler.SORT_KEYS}), 400
+        text = profiler.profile_text(name, sort, request.args.get("limit", 50, type=int))
+        if text is None:
+            return jsonify({"error": "Perfil não encontrado"}), 404
+        return text, 200, {"Content-Type": "text/plain; charset=utf-8"}
+
+    path = profiler.profile_path(name)
+    if path is None:
+        return jsonify({"error": "Perfil não encontrado"}), 404
+    return send_file(os.path.abspath(path), mimetype="application/octet-stream", as_attachment=True, download_name=name)
+
+
+@admin.route("/profiles", methods=["DELETE"])
+@admin_required
+def delete_profiles():
+    return jsonify({"removed": profiler.prune(keep=0)})
+
+
+@admin.route("/tenants", methods=["GET"])
+@admin_required
+def list_tenants():
+    stats = pool_stats()
+    result = []
+    for shop in tenants.list_tenants():
+        path = tenants.tenant_path(shop)
+        pools = stats if path == config.DB_PATH else stats.get("tenants", {}).get(path)
+        result.append({
+            "shop": shop,
+            "path": path,
+            "bytes": os.path.getsize(path) if os.path.exists(path) else 0,
+            "pools": pools,
+        })
+    return jsonify(result)
+
+
+def _tenant_summary(conn, inicio, fim):
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT COUNT(*) FROM appointments WHERE datetime >= ? AND datetime < ?", (inicio, fim)
+    )
+    appointments = cursor.fetchone()[0]
+
+    cursor.execute("""
+        SELECT
+            IFNULL(SUM(CASE WHEN type = 'entrada' THEN amount END), 0),
+            IFNULL(SUM(CASE WHEN type = 'saida' THEN amount END), 0)
+        FROM cashflow
+        WHERE datetime >= ? AND datetime < ?
+    """, (inicio, fim))
+    entradas, saidas = cursor.fetchone()
+
+    return {
+        "appointments": appointments,
+        "entradas": float(entradas),
+        "saidas": float(saidas),
+        "liquido": float(entradas) - float(saidas),
+    }
+
+
+@admin.route("/tenants/report", methods=["GET"])
+@admin_required
+def tenants_report():
+    # Recebe ?month=2025-11; cada barbearia é lida pelo próprio pool
+    mes = request.args.get("month") or datetime.now().strftime("%Y-%m")
+    try:
+        inicio = datetime.strptime(mes, "%Y-%m")
+    except ValueError:
+        return jsonify({"error": "Parâmetro 'month' deve ser YYYY-MM"}), 400
+    fim = (inicio + timedelta(days=32)).replace(day=1)
+
+    report = tenants.for_each_tenant(
+        lambda conn: _tenant_summary(conn, inicio.strftime("%Y-%m-%d"), fim.strftime("%Y-%m-%d"))
+    )
+
+    totals = {"appointments": 0, "entradas": 0.0, "saidas": 0.0, "liquido": 0.0}
+    for summary in report.values():
+        if "error" not in summary:
+            for key in totals:
+                totals[key] += summary[key]
+
+    return jsonify({"month": mes, "tenants": report, "total": totals})
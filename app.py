@@ -1,54 +1,103 @@
-from http import client
+import importlib
+import threading
+
 from flask import Flask
 from flask_cors import CORS
-from auth import auth
-from barbers import barbers
-from cliente import clients
-from services import service
-from barbers import barber
-from appointments import appointments
-from products import products
-from stock import stock
-from package import package
-from barber_schedule import schedule
-from barber_schedule_get import schedule_get
-from orders import orders
-from database import get_db, close_connection
-from cashflow import cashflow
-
-
-
-
-
-
-
-
-
-
-
-app = Flask(__name__)
-
-# Libera tudo (para teste). Depois você pode restringir.
-CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True)
-
-app.register_blueprint(auth)
-app.register_blueprint(barbers)
-app.register_blueprint(barber)
-app.register_blueprint(clients)
-app.register_blueprint(service)
-app.register_blueprint(appointments)
-app.register_blueprint(products)
-app.register_blueprint(stock)
-app.register_blueprint(package)
-app.register_blueprint(schedule)
-app.register_blueprint(schedule_get)
-app.register_blueprint(orders)
-app.register_blueprint(cashflow)
 
-app.teardown_appcontext(close_connection)
- 
+import config
+
+# (módulo, blueprint): importados só dentro do create_app, para que "import app"
+# não carregue consulta.py, jwt, passlib... antes de alguém precisar do app
+BLUEPRINTS = [
+    ("auth", "auth"),
+    ("barbers", "barbers"),
+    ("barbers", "barber"),
+    ("cliente", "clients"),
+    ("services", "service"),
+    ("appointments", "appointments"),
+    ("products", "products"),
+    ("stock", "stock"),
+    ("package", "package"),
+    ("barber_schedule", "schedule"),
+    ("barber_schedule_get", "schedule_get"),
+    ("orders", "orders"),
+    ("cashflow", "cashflow"),
+    ("admin", "admin"),
+    ("health", "health"),
+]
+
+
+def create_app(settings=None):
+    """
+    Monta o app. settings sobrescreve valores do config.py (ex.: {"DB_AUTO_MIGRATE": False})
+    e vai também para app.config. Valores lidos na importação dos módulos (DB_PATH,
+    tamanhos de pool) só valem no primeiro create_app do processo.
+    """
+    settings = dict(settings or {})
+    for key, value in settings.items():
+        if key.isupper() and hasattr(config, key):
+            setattr(config, key, value)
+
+    import backup
+    import metrics
+    import pagination
+    import profiler
+    import tenants
+    from database import close_connection, connection
+    from migrate import upgrade
+
+    app = Flask(__name__)
+    app.config.update(settings)
+
+    # Libera tudo (para teste). Depois você pode restringir.
+    CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True)
+
+    for module, name in BLUEPRINTS:
+        app.register_blueprint(getattr(importlib.import_module(module), name))
+
+    app.teardown_appcontext(close_connection)
+
+    # Perfis cProfile sob demanda (cabeçalho X-Profile ou /admin/profiler)
+    profiler.init_app(app)
+
+    # Latência por rota, SQLite e pools no formato do Prometheus (GET /metrics)
+    metrics.init_app(app)
+
+    # Cursor/limit inválidos nas listagens viram 400
+    pagination.init_app(app)
+
+    if config.TENANTS_ENABLED:
+        # Cada requisição usa o banco da barbearia do token (ver tenants.py)
+        app.before_request(tenants.bind_tenant)
+
+    # Atualiza o banco em produção sem recriar as tabelas (ver migrate.py)
+    if config.DB_AUTO_MIGRATE:
+        if config.TENANTS_ENABLED:
+            tenants.upgrade_all()
+        else:
+            with connection() as conn:
+                upgrade(conn)
+
+    # Snapshots periódicos (BACKUP_INTERVAL > 0)
+    backup.start_scheduler()
+
+    return app
+
+
+_app_lock = threading.Lock()
+
+
+def __getattr__(name):
+    # "from app import app" / gunicorn app:app continuam funcionando: o app
+    # padrão só é montado no primeiro acesso
+    global app
+    if name != "app":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _app_lock:
+        if "app" not in globals():
+            app = create_app()
+    return app
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
-  
\ No newline at end of file
+    create_app().run(host='0.0.0.0', port=5000, debug=True)
@@ -1,6 +1,5 @@
-from flask import Blueprint, request, jsonify
-from utils import verify_token
-from users import get_user
+from flask import Blueprint, g, request, jsonify
+from middleware import login_required
 from consulta import create_appointments, delete_appointment_by_id, get_appointments_by_user, get_appointment_by_id, get_today_summary
 
 appointments = Blueprint('appointments', __name__)
@@ -8,20 +7,9 @@ appointments = Blueprint('appointments', __name__)
 
 
 @appointments.route('/appointments', methods=['POST'])
+@login_required
 def create_appointment():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-
-    if not decoded:
-        return jsonify({"error": "Token inválido"}), 401
-
-    user = get_user(decoded["email"])
-    if not user:
-        return jsonify({"error": "Usuário não encontrado"}), 404
+    user = g.user
 
     data = request.get_json()
     client_id = data.get("client_id")
@@ -46,20 +34,9 @@ def create_appointment():
 
 
 @appointments.route('/appointments', methods=['GET'])
+@login_required
 def list_appointments():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-
-    if not decoded:
-        return jsonify({"error": "Token inválido"}), 401
-
-    user = get_user(decoded["email"])
-    if not user:
-        return jsonify({"error": "Usuário não encontrado"}), 404
+    user = g.user
 
     try:
         appointments = get_appointments_by_user(user["email"])
@@ -78,20 +55,9 @@ def list_appointments():
 
 
 @appointments.route('/appointments/<int:appointment_id>', methods=['DELETE'])
+@login_required
 def delete_appointment(appointment_id):
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-
-    if not decoded:
-        return jsonify({"error": "Token inválido"}), 401
-
-    user = get_user(decoded["email"])
-    if not user:
-        return jsonify({"error": "Usuário não encontrado"}), 404
+    user = g.user
    
     appointment = get_appointment_by_id(appointment_id)
     if not appointment:
@@ -1,14 +1,49 @@
-from flask import Blueprint, request, jsonify 
+from flask import Blueprint, g, request, jsonify 
 from consulta import get_user_by_email
-from users import get_user, add_user
-from utils import generate_token, verify_token, hash_password, verify_password
-import sqlite3
+from users import get_user, add_user, update_password_hash
+from utils import access_token, verify_token, revoke_token, hash_password, verify_and_update_password
+from hashing import HashPoolBusy
+from ratelimit import RateLimited, login_ip, login_email, client_ip
+import config
+import refresh_tokens
+from refresh_tokens import RefreshError
+from middleware import login_required, bearer_token
 
 auth = Blueprint('auth', __name__, url_prefix='/auth')
 
+
+@auth.errorhandler(HashPoolBusy)
+def hash_pool_busy(e):
+    response = jsonify({ "error": "Servidor ocupado, tente novamente" })
+    response.headers["Retry-After"] = str(config.HASH_RETRY_AFTER)
+    return response, 503
+
+
+@auth.errorhandler(RateLimited)
+def rate_limited(e):
+    response = jsonify({ "error": "Muitas tentativas, tente novamente mais tarde" })
+    response.headers["Retry-After"] = str(e.retry_after)
+    return response, 429
+
+
+def session_response(user):
+    # Access token curto + refresh token opaco que gira a cada /auth/refresh
+    return jsonify({
+        "token": access_token(user),
+        "refresh_token": refresh_tokens.issue(user["email"]),
+        "expires_in": config.ACCESS_TOKEN_TTL,
+        "data": {
+            "avatar": user.get("avatar") or "",
+            "name": user["name"]
+        }
+    })
+
+
 @auth.route('/user', methods=['POST'])
 def register():
     try:
+        login_ip.hit(client_ip())
+
         data = request.json
         name = data.get('name')
         email = data.get('email')
@@ -23,9 +58,10 @@ def register():
         if not success:
             return jsonify({ "error": message }), 500
 
-        token = generate_token({ "email": email })
-        return jsonify({ "token": token })
+        return session_response(get_user(email))
 
+    except (HashPoolBusy, RateLimited):
+        raise
     except Exception as e:
         
         print("Erro ao registrar usuário:", e)
@@ -37,44 +73,56 @@ def register():
 
 @auth.route('/login', methods=['POST'])
 def login():
+    # Antes do banco e do bcrypt: é o que um ataque de força bruta quer gastar
+    login_ip.hit(client_ip())
+
     data = request.json
     email = data.get('email')
     password = data.get('password')
 
+    email_key = (email or "").strip().lower()
+    login_email.check(email_key)
+
     user = get_user_by_email(email)
-    if not user or not verify_password(password, user['password']):
+    if not user:
+        login_email.hit(email_key)
         return jsonify({ "error": "Credenciais inválidas" }), 401
 
-    token = generate_token({ "email": email })
-    return jsonify({ 
-        "token": token, 
-        "data": { 
-            "avatar": user.get("avatar", ""), 
-            "name": user["name"] 
-        } 
-    })
+    valid, new_hash = verify_and_update_password(password, user['password'])
+    if not valid:
+        login_email.hit(email_key)
+        return jsonify({ "error": "Credenciais inválidas" }), 401
 
+    login_email.reset(email_key)
 
+    if new_hash:
+        try:
+            update_password_hash(email, new_hash)
+        except Exception as e:
+            # O login segue valendo; tenta de novo na próxima vez
+            print("Erro ao atualizar hash da senha:", e)
 
+    return session_response(user)
 
-@auth.route('/check', methods=['POST'])
-def check():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({ "error": "Token não fornecido" }), 401
 
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
 
-    if not decoded:
-        return jsonify({ "error": "Token inválido" }), 401
 
-    user = get_user(decoded['email'])
-    if not user:
-        return jsonify({ "error": "Usuário não encontrado" }), 404
+@auth.route('/check', methods=['POST'])
+@login_required(load_user=False)
+def check():
+    # Tudo vem do próprio token: nenhuma consulta ao banco
+    claims = g.claims
+    if "name" not in claims:
+        # Tokens emitidos antes de nome/avatar irem no payload
+        user = get_user(claims["email"])
+        if not user:
+            return jsonify({ "error": "Usuário não encontrado" }), 404
+        claims = { "name": user["name"], "avatar": user["avatar"] }
 
-    new_token = generate_token({ "email": decoded['email'] })
-    return jsonify({ "token": new_token, "data": { "avatar": user["avatar"], "name": user["name"] } })
+    return jsonify({
+        "token": bearer_token(),
+        "data": { "avatar": claims.get("avatar") or "", "name": claims["name"] }
+    })
 
 
 @auth.route('/logout', methods=['POST'])
@@ -94,30 +142,51 @@ def logout():
     if not user:
         return jsonify({ "error": "Usuário não encontrado" }), 404
 
-    
+    revoke_token(token, decoded)
+    if data.get('refresh_token'):
+        refresh_tokens.revoke(data['refresh_token'])
     return jsonify({ "error": "" })  
 
 
 @auth.route('/refresh', methods=['POST'])
 def refresh_token():
     data = request.get_json()
+    refresh = data.get('refresh_token')
     token = data.get('token')
-    
-    if not token:
-        return jsonify({ "error": "Token não fornecido" }), 400
 
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({ "error": "Token inválido ou expirado" }), 401
+    if not refresh:
+        if not token:
+            return jsonify({ "error": "Token não fornecido" }), 400
 
-    user = get_user(decoded.get('email'))
+        # Apps antigos mandam o JWT de 7 dias: troca uma vez por um par novo.
+        # Só o formato antigo (sem name); um access token novo não vira sessão
+        decoded = verify_token(token)
+        if not decoded or "name" in decoded:
+            return jsonify({ "error": "Token inválido ou expirado" }), 401
+
+        user = get_user(decoded.get('email'))
+        if not user:
+            return jsonify({ "error": "Usuário não encontrado" }), 404
+
+        revoke_token(token, decoded)
+        return session_response(user)
+
+    try:
+        email, new_refresh = refresh_tokens.rotate(refresh)
+    except RefreshError as e:
+        if e.reason == "reused":
+            return jsonify({ "error": "Sessão encerrada, faça login novamente" }), 401
+        return jsonify({ "error": "Refresh token inválido ou expirado" }), 401
+
+    # get_user passa pelo cache de usuários
+    user = get_user(email)
     if not user:
         return jsonify({ "error": "Usuário não encontrado" }), 404
 
-    new_token = generate_token({ "email": decoded['email'] })
-
     return jsonify({
-        "token": new_token,
+        "token": access_token(user),
+        "refresh_token": new_refresh,
+        "expires_in": config.ACCESS_TOKEN_TTL,
         "data": {
             "name": user["name"],
             "avatar": user["avatar"]
@@ -127,24 +196,15 @@ def refresh_token():
 
 
 @auth.route('/favorite', methods=['POST'])
+@login_required(load_user=False)
 def favorite():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({ "error": "Token ausente ou inválido" }), 401
-
-    token = auth_header.split(" ")[1]
-
     data = request.get_json()
     barber_id = data.get('barber')
 
     if not barber_id:
         return jsonify({ "error": "barber_id é obrigatório" }), 400
 
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({ "error": "Token inválido" }), 401
-
-    user_email = decoded.get("email")
+    user_email = g.claims.get("email")
 
     # Alterna favorito
     from consulta import toggle_favorite
@@ -154,17 +214,9 @@ def favorite():
 
 
 @auth.route('/favorited', methods=['GET'])
+@login_required(load_user=False)
 def favorited():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({ "error": "Token ausente ou inválido" }), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({ "error": "Token inválido" }), 401
-
-    user_email = decoded.get("email")
+    user_email = g.claims.get("email")
     barber_id = request.args.get('barber')
 
     if not barber_id:
@@ -178,18 +230,9 @@ def favorited():
 
 
 @auth.route('/favorites', methods=['GET'])
+@login_required(load_user=False)
 def get_user_favorites():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({ "error": "Token ausente ou inválido" }), 401
-
-    token = auth_header.split(" ")[1]
-
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({ "error": "Token inválido ou expirado" }), 401
-
-    user_email = decoded.get("email")
+    user_email = g.claims.get("email")
 
     if not user_email:
         return jsonify({
@@ -0,0 +1,260 @@
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+
+import config
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos
+    fcntl = None
+
+
+class BackupError(Exception):
+    pass
+
+
+def _snapshot_name(source_path):
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    return f"{stem}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.db"
+
+
+def _check(path):
+    conn = sqlite3.connect(path)
+    try:
+        result = conn.execute("PRAGMA quick_check").fetchone()[0]
+    finally:
+        conn.close()
+    if result != "ok":
+        raise BackupError(f"Cópia inválida ({path}): {result}")
+
+
+def copy_database(source_path, dest_path, pages=None, pause=None, max_restarts=None):
+    """
+    Copia um banco aberto usando a API de backup do SQLite, em passos de
+    `pages` páginas com uma pausa entre eles para não disputar com as requisições.
+    Se o banco for alterado por outra conexão a cópia recomeça; depois de
+    `max_restarts` recomeços ela termina num passo só (em WAL isso não bloqueia escritas).
+    """
+    pages = config.BACKUP_PAGES if pages is None else pages
+    pause = config.BACKUP_PAUSE if pause is None else pause
+    max_restarts = config.BACKUP_MAX_RESTARTS if max_restarts is None else max_restarts
+
+    partial = dest_path + ".partial"
+    if os.path.exists(partial):
+        os.remove(partial)
+
+    state = {"last_remaining": None, "restarts": 0, "steps": 0}
+
+    class _Restart(Exception):
+        pass
+
+    def progress(status, remaining, total):
+        state["steps"] += 1
+        last = state["last_remaining"]
+        state["last_remaining"] = remaining
+        if last is not None and remaining > last:
+            state["restarts"] += 1
+            if state["restarts"] > max_restarts:
+                raise _Restart()
+        if pause:
+            time.sleep(pause)
+
+    start = time.monotonic()
+    src = sqlite3.connect(source_path, timeout=config.DB_BUSY_TIMEOUT)
+    dst = sqlite3.connect(partial)
+    try:
+        try:
+            src.backup(dst, pages=pages, progress=progress)
+        except _Restart:
+            src.backup(dst, pages=-1)
+    finally:
+        dst.close()
+        src.close()
+
+    _check(partial)
+    os.replace(partial, dest_path)
+
+    return {
+        "path": dest_path,
+        "bytes": os.path.getsize(dest_path),
+        "steps": state["steps"],
+        "restarts": state["restarts"],
+        "seconds": round(time.monotonic() - start, 3),
+    }
+
+
+def list_snapshots(directory=None):
+    directory = directory or config.BACKUP_DIR
+    if not os.path.isdir(directory):
+        return []
+    snapshots = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        path = os.path.join(directory, name)
+        if name.endswith(".db") and os.path.isfile(path):
+            snapshots.append({
+                "name": name,
+                "path": path,
+                "bytes": os.path.getsize(path),
+                "created_at": datetime.fromtimestamp(os.path.getmtime(path)).isoformat(timespec="seconds"),
+            })
+    return snapshots
+
+
+def prune(keep=None, directory=None, source_path=None):
+    # Com source_path a retenção vale só para os snapshots daquele banco
+    keep = config.BACKUP_KEEP if keep is None else keep
+    snapshots = list_snapshots(directory)
+    if source_path:
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        pattern = re.compile(rf"^{re.escape(stem)}-\d{{8}}-\d{{6}}-\d{{6}}\.db$")
+        snapshots = [s for s in snapshots if pattern.match(s["name"])]
+    removed = []
+    for snap in snapshots[keep:]:
+        os.remove(snap["path"])
+        removed.append(snap["name"])
+    return removed
+
+
+def sources():
+    if not config.TENANTS_ENABLED:
+        return [config.DB_PATH]
+    import tenants
+    return [tenants.tenant_path(shop) for shop in tenants.list_tenants()]
+
+
+def snapshot(source_path=None, directory=None, keep=None):
+    source_path = source_path or config.DB_PATH
+    directory = directory or config.BACKUP_DIR
+    os.makedirs(directory, exist_ok=True)
+
+    result = copy_database(source_path, os.path.join(directory, _snapshot_name(source_path)))
+    result["pruned"] = prune(keep, directory, source_path)
+    return result
+
+
+def restore(snapshot_path, target_path, force=False):
+    # Restaura num arquivo novo; a aplicação passa a usá-lo via DB_PATH
+    if not os.path.isfile(snapshot_path):
+        raise BackupError(f"Snapshot não encontrado: {snapshot_path}")
+    if os.path.exists(target_path) and not force:
+        raise BackupError(f"{target_path} já existe (use --force para sobrescrever)")
+
+    _check(snapshot_path)
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(target_path + suffix):
+            os.remove(target_path + suffix)
+    return copy_database(snapshot_path, target_path, pages=-1, pause=0)
+
+
+# ----- Agendamento -----
+
+_scheduler = None
+_stop = threading.Event()
+
+
+def _try_lock(directory):
+    # Com vários workers só um faz o snapshot de cada vez
+    if fcntl is None:
+        return True, None
+    os.makedirs(directory, exist_ok=True)
+    handle = open(os.path.join(directory, ".lock"), "w")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True, handle
+    except OSError:
+        handle.close()
+        return False, None
+
+
+def _last_round(directory):
+    try:
+        with open(os.path.join(directory, ".last_round")) as f:
+            return float(f.read())
+    except (OSError, ValueError):
+        return 0.0
+
+
+def _mark_round(directory, when):
+    with open(os.path.join(directory, ".last_round"), "w") as f:
+        f.write(repr(when))
+
+
+def _run_scheduler(interval):
+    while not _stop.wait(interval):
+        locked, handle = _try_lock(config.BACKUP_DIR)
+        if not locked:
+            continue
+        try:
+            # Cada worker tem seu próprio agendador (ex.: SERVER_PRELOAD=0): quem pega
+            # a trava só faz a rodada se nenhum outro fez uma no último intervalo
+            now = time.time()
+            if now - _last_round(config.BACKUP_DIR) < interval:
+                continue
+            _mark_round(config.BACKUP_DIR, now)
+            for source_path in sources():
+                try:
+                    result = snapshot(source_path)
+                    print(f"Backup criado: {result['path']} ({result['seconds']}s)")
+                except Exception as e:
+                    print(f"Erro no backup agendado de {source_path}:", e)
+        finally:
+            if handle is not None:
+                handle.close()
+
+
+def start_scheduler(interval=None):
+    global _scheduler
+    interval = config.BACKUP_INTERVAL if interval is None else interval
+    if interval <= 0 or (_scheduler is not None and _scheduler.is_alive()):
+        return None
+    _stop.clear()
+    _scheduler = threading.Thread(target=_run_scheduler, args=(interval,), name="backup-scheduler", daemon=True)
+    _scheduler.start()
+    return _scheduler
+
+
+def stop_scheduler():
+    _stop.set()
+
+
+def main(argv):
+    if not argv or argv[0] not in ("snapshot", "list", "restore", "prune"):
+        print("uso: python backup.py snapshot | list | prune | restore <snapshot> <destino> [--force]")
+        return 2
+
+    command = argv[0]
+    if command == "snapshot":
+        for source_path in sources():
+            result = snapshot(source_path)
+            print(f"{result['path']} ({result['bytes']} bytes, {result['steps']} passos, "
+                  f"{result['restarts']} recomeços, {result['seconds']}s)")
+            for name in result["pruned"]:
+                print(f"  removido: {name}")
+    elif command == "list":
+        for snap in list_snapshots():
+            print(f"{snap['created_at']}  {snap['bytes']:>12}  {snap['name']}")
+    elif command == "prune":
+        for source_path in sources():
+            for name in prune(source_path=source_path):
+                print(f"removido: {name}")
+    else:
+        args = [a for a in argv[1:] if a != "--force"]
+        if len(args) != 2:
+            print("uso: python backup.py restore <snapshot> <destino> [--force]")
+            return 2
+        try:
+            result = restore(args[0], args[1], force="--force" in argv)
+        except BackupError as e:
+            print(e)
+            return 1
+        print(f"Restaurado em {result['path']} ({result['seconds']}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
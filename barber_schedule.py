@@ -1,11 +1,28 @@
 from flask import Blueprint, request, jsonify
 from datetime import datetime
-import sqlite3
+from writequeue import write
 
 schedule = Blueprint('schedule', __name__)
 
-def get_db():
-    return sqlite3.connect("database.db", check_same_thread=False)
+
+def _replace_custom_hours(conn, barber_id, week):
+    # Apaga horários anteriores da semana
+    conn.execute("""
+        DELETE FROM barber_custom_hours 
+        WHERE barber_id = ?
+    """, (barber_id,))
+
+    # Insere nova configuração
+    updated_at = datetime.now().isoformat()
+    conn.executemany("""
+        INSERT INTO barber_custom_hours 
+        (barber_id, date, time, active, updated_at)
+        VALUES (?, ?, ?, ?, ?)
+    """, [
+        (barber_id, day["date"], h["time"], 0 if h["active"] else 1, updated_at)
+        for day in week
+        for h in day["hours"]
+    ])
 
 
 @schedule.route("/barbers/schedule/save", methods=["POST"])
@@ -19,34 +36,7 @@ def save_barber_schedule():
         return jsonify({"error": "Dados incompletos"}), 400
 
     try:
-        conn = get_db()
-        cur = conn.cursor()
-
-        # Apaga horários anteriores da semana
-        cur.execute("""
-            DELETE FROM barber_custom_hours 
-            WHERE barber_id = ?
-        """, (barber_id,))
-
-        # Insere nova configuração
-        for day in week:
-            date = day["date"]
-
-            for h in day["hours"]:
-                cur.execute("""
-                    INSERT INTO barber_custom_hours 
-                    (barber_id, date, time, active, updated_at)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (
-                    barber_id,
-                    date,
-                    h["time"],
-                    0 if h["active"] else 1,
-                    datetime.now().isoformat()
-                ))
-        
-        conn.commit()
-        conn.close()
+        write(_replace_custom_hours, barber_id, week)
 
         return jsonify({"success": True, "message": "Horários salvos com sucesso!"})
 
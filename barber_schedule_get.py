@@ -1,11 +1,8 @@
 from flask import Blueprint, request, jsonify
-import sqlite3
+from database import get_db
 
 schedule_get = Blueprint('schedule_get', __name__)
 
-def get_db():
-    return sqlite3.connect("database.db", check_same_thread=False)
-
 
 @schedule_get.route("/barbers/<int:barber_id>/schedule", methods=["GET"])
 def get_barber_schedule(barber_id):
@@ -15,7 +12,7 @@ def get_barber_schedule(barber_id):
         return jsonify({"error": "Parâmetro 'date' obrigatório"}), 400
 
     try:
-        conn = get_db()
+        conn = get_db(readonly=True)
         cur = conn.cursor()
 
         cur.execute("""
@@ -26,7 +23,6 @@ def get_barber_schedule(barber_id):
         """, (barber_id, date))
 
         rows = cur.fetchall()
-        conn.close()
 
         if not rows:
             # caso ainda não exista configuração retorna vazio (app sabe como tratar)
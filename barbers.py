@@ -1,8 +1,14 @@
-from flask import Blueprint, request, jsonify
-from utils import verify_token
-from users import get_user
+import json
+from flask import Blueprint, g, request, jsonify
+from middleware import login_required
 from datetime import datetime, timedelta
-import sqlite3
+from database import DB_PATH, get_db
+from geo import nearby
+import pagination
+from etag import etag
+from search import page_args, page_info, search
+import config
+from records import Barber, BARBER_COLUMNS, fetch_all, fetch_one, as_dicts
 from consulta import fetch_all_barbers, get_availability_for_date, get_full_barber, add_availability_for_date
 
 
@@ -13,59 +19,35 @@ barber = Blueprint('barber', __name__, url_prefix='/barber')
 
 
 @barbers.route('/barbers/all', methods=['GET'])
+@login_required(data=[])
+@etag("barbers", "photos", "testimonials", "availability", "availability_hours")
 def get_all_barbers():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({ "error": "Token inválido ou expirado", "data": [] }), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({ "error": "Usuário não encontrado", "data": [] }), 404
-
-
-    
-    return fetch_all_barbers()
+    return fetch_all_barbers(pagination.from_request())
 
 
 
 
 @barbers.route('/barbers/search', methods=['GET'])
+@login_required(query_token=True, data=[])
 def search_barbers():
-    token = request.args.get('token')
-    name_query = request.args.get('name', '').strip().lower()
-
-    if not token:
-        return jsonify({ "error": "Token não fornecido", "data": [] }), 401
-
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({ "error": "Token inválido ou expirado", "data": [] }), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({ "error": "Usuário não encontrado", "data": [] }), 404
+    name_query = request.args.get('name', '').strip()
+    page, per_page = page_args(request.args)
 
-    # Consulta ao banco filtrando por nome
-    conn = sqlite3.connect('database.db')
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
+    # Nome e cidade pelo barbers_fts, ordenado por relevância
+    conn = get_db(readonly=True)
 
-    search_pattern = f"%{name_query}%"
-    cur.execute("SELECT * FROM barbers WHERE LOWER(name) LIKE ?", (search_pattern,))
-    barbers = cur.fetchall()
-    
-    data = [dict(row) for row in barbers]
+    barbers, has_more = search(
+        conn, "barbers", name_query, page, per_page,
+        columns=", ".join(f"barbers.{c}" for c in Barber._fields),
+        fetch=lambda conn, sql, params: fetch_all(conn, Barber, sql, params),
+    )
 
-    conn.close()  # ✅ importante
+    data = as_dicts(barbers)
 
     return jsonify({
         "error": "",
-        "data": data
+        "data": data,
+        **page_info(page, per_page, has_more)
     })
 
 
@@ -73,21 +55,10 @@ def search_barbers():
 
 
 @barbers.route('/barbers', methods=['GET'])
+@login_required(query_token=True, loc="", data=[])
 def get_barbers():
-    token = request.args.get('token')
     loc = request.args.get('loc')
 
-    if not token:
-        return jsonify({ "error": "Token não fornecido", "loc": "", "data": [] }), 401
-
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({ "error": "Token inválido ou expirado", "loc": "", "data": [] }), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({ "error": "Usuário não encontrado", "loc": "", "data": [] }), 404
-
     if not loc:
         return jsonify({
             "error": "",
@@ -96,14 +67,11 @@ def get_barbers():
         })
 
     # Consulta ao banco filtrando pela localização
-    conn = sqlite3.connect('database.db')
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
+    conn = get_db(readonly=True)
 
-    cur.execute("SELECT * FROM barbers WHERE LOWER(loc) = LOWER(?)", (loc,))
-    barbers = cur.fetchall()
+    barbers = fetch_all(conn, Barber, f"SELECT {BARBER_COLUMNS} FROM barbers WHERE LOWER(loc) = LOWER(?)", (loc,))
 
-    data = [dict(barber) for barber in barbers]
+    data = as_dicts(barbers)
 
     return jsonify({
         "error": "",
@@ -113,23 +81,47 @@ def get_barbers():
 
 
 
-@barber.route('/<int:barber_id>', methods=['GET'])
-def get_barber(barber_id):
-    # Pega o cabeçalho Authorization
-    auth_header = request.headers.get('Authorization')
+@barbers.route('/barbers/nearby', methods=['GET'])
+@login_required(data=[])
+def get_nearby_barbers():
+    lat = request.args.get('lat', type=float)
+    lng = request.args.get('lng', type=float)
+    radius = request.args.get('radius', config.GEO_DEFAULT_RADIUS_KM, type=float)
+    limit = request.args.get('limit', config.GEO_DEFAULT_LIMIT, type=int)
+
+    if lat is None or lng is None or not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return jsonify({ "error": "lat e lng são obrigatórios", "data": [] }), 400
+    if radius is None or radius <= 0 or limit is None or limit <= 0:
+        return jsonify({ "error": "radius e limit devem ser positivos", "data": [] }), 400
+
+    radius = min(radius, config.GEO_MAX_RADIUS_KM)
+    limit = min(limit, config.GEO_MAX_LIMIT)
+
+    conn = get_db(readonly=True)
+    found = nearby(conn, g.get("db_path") or DB_PATH, lat, lng, radius, limit)
 
-    # Verifica se existe e começa com "Bearer "
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({ "error": "Token não fornecido" }), 401
+    # Os dados completos vêm numa consulta só; a ordem é a da distância
+    ids = json.dumps([barber_id for _, barber_id in found])
+    rows = {b.id: b for b in fetch_all(
+        conn, Barber, f"SELECT {BARBER_COLUMNS} FROM barbers WHERE id IN (SELECT value FROM json_each(?))", (ids,)
+    )}
+    data = [
+        dict(rows[barber_id]._asdict(), distance_km=round(distance, 3))
+        for distance, barber_id in found if barber_id in rows
+    ]
+
+    return jsonify({
+        "error": "",
+        "radius": radius,
+        "data": data
+    })
 
-    # Extrai o token do cabeçalho
-    token = auth_header.split(" ")[1]
 
-    # Valida o token
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({ "error": "Token inválido ou expirado" }), 401
 
+@barber.route('/<int:barber_id>', methods=['GET'])
+@login_required(load_user=False)
+@etag("barbers", "photos", "testimonials", "availability", "availability_hours", "barber_services", "services")
+def get_barber(barber_id):
     # Busca o barbeiro
     barber = get_full_barber(barber_id)
 
@@ -144,14 +136,7 @@ def get_barber(barber_id):
 
 
 def get_barber_by_id(barber_id):
-    conn = sqlite3.connect('database.db')
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
-
-    cur.execute("SELECT * FROM barbers WHERE id = ?", (barber_id,))
-    row = cur.fetchone()
-
-    return dict(row) if row else None
+    return fetch_one(get_db(readonly=True), Barber, f"SELECT {BARBER_COLUMNS} FROM barbers WHERE id = ?", (barber_id,))
 
 
 @barber.route("/barber/<int:barber_id>/availability")
@@ -159,8 +144,7 @@ def barber_availability(barber_id):
     date = request.args.get("date")
     if not date:
         return jsonify({"error":"date param required"}), 400
-    conn = sqlite3.connect('database.db')
-    conn.row_factory = sqlite3.Row
+    conn = get_db(readonly=True)
     cur = conn.cursor()
    
    
@@ -172,7 +156,6 @@ def barber_availability(barber_id):
       ORDER BY ah.hour
     """, (barber_id, date))
     rows = [dict(r) for r in cur.fetchall()]
-    conn.close()
     return jsonify({"hours": rows})
 
 
@@ -192,8 +175,7 @@ def add_availability_endpoint(barber_id):
 @barber.route("/availability/all", methods=["GET"])
 def get_all_availability():
     date = request.args.get("date")
-    conn = sqlite3.connect('database.db')
-    conn.row_factory = sqlite3.Row
+    conn = get_db(readonly=True)
     cur = conn.cursor()
     barbers = cur.execute("SELECT id, name FROM barbers").fetchall()
 
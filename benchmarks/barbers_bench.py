@@ -0,0 +1,123 @@
+"""
+Perfis de barbeiros (/barbers/all e /barber/<id>): o laço N+1 de antes contra
+consulta.load_barber_profiles, que faz uma consulta por tabela filha.
+
+    python benchmarks/barbers_bench.py [barbeiros ...] [--days 14] [--repeat 5]
+
+Mostra quantas consultas cada versão fez (contadas pelo trace do sqlite3) e o
+tempo; no carregador em lote o número de consultas não cresce com a base.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from consulta import load_barber_profiles  # noqa: E402
+from records import Barber, BARBER_COLUMNS, fetch_all  # noqa: E402
+
+HOURS = [f"{h:02d}:{m:02d}" for h in range(9, 19) for m in (0, 30)]
+
+
+def make_db(barbers, days, seed=1):
+    rnd = random.Random(seed)
+    conn = sqlite3.connect(":memory:")
+    conn.executescript("""
+        CREATE TABLE barbers (id INTEGER PRIMARY KEY, name TEXT, avatar TEXT, stars REAL, lat REAL, lng REAL, loc TEXT);
+        CREATE TABLE photos (id INTEGER PRIMARY KEY AUTOINCREMENT, barber_id INTEGER, url TEXT);
+        CREATE TABLE testimonials (id INTEGER PRIMARY KEY AUTOINCREMENT, barber_id INTEGER, name TEXT,
+                                   rate INTEGER, body TEXT);
+        CREATE TABLE availability (id INTEGER PRIMARY KEY AUTOINCREMENT, barber_id INTEGER, date TEXT);
+        CREATE TABLE availability_hours (id INTEGER PRIMARY KEY AUTOINCREMENT, availability_id INTEGER,
+                                         hour TEXT, is_booked BOOLEAN DEFAULT 0);
+        CREATE TABLE services (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE);
+        CREATE TABLE barber_services (id INTEGER PRIMARY KEY AUTOINCREMENT, barber_id INTEGER NOT NULL,
+                                      service_id INTEGER NOT NULL, price REAL NOT NULL, duration INTEGER NOT NULL,
+                                      UNIQUE(barber_id, service_id));
+        CREATE INDEX idx_availability_barber_date ON availability (barber_id, date);
+        CREATE INDEX idx_availability_hours_availability ON availability_hours (availability_id, hour, is_booked);
+        CREATE INDEX idx_photos_barber ON photos (barber_id);
+        CREATE INDEX idx_testimonials_barber ON testimonials (barber_id);
+        INSERT INTO services (name) VALUES ('Corte'), ('Barba'), ('Sobrancelha');
+    """)
+    for b in range(1, barbers + 1):
+        conn.execute("INSERT INTO barbers VALUES (?, ?, ?, ?, ?, ?, ?)",
+                     (b, f"Barbeiro {b}", f"https://i.pravatar.cc/150?u={b}", rnd.uniform(3, 5),
+                      rnd.uniform(-24, -23), rnd.uniform(-47, -46), "São Paulo"))
+        conn.executemany("INSERT INTO photos (barber_id, url) VALUES (?, ?)",
+                         [(b, f"https://picsum.photos/seed/{b}-{i}/400") for i in range(3)])
+        conn.executemany("INSERT INTO testimonials (barber_id, name, rate, body) VALUES (?, ?, ?, ?)",
+                         [(b, f"Cliente {i}", rnd.randint(3, 5), "Ótimo corte") for i in range(2)])
+        conn.executemany("INSERT INTO barber_services (barber_id, service_id, price, duration) VALUES (?, ?, ?, ?)",
+                         [(b, s, 30.0 + s * 5, 30) for s in (1, 2, 3)])
+        for d in range(days):
+            cur = conn.execute("INSERT INTO availability (barber_id, date) VALUES (?, ?)",
+                               (b, f"2025-11-{d + 1:02d}"))
+            conn.executemany("INSERT INTO availability_hours (availability_id, hour, is_booked) VALUES (?, ?, ?)",
+                             [(cur.lastrowid, h, int(rnd.random() < 0.3)) for h in HOURS])
+    conn.commit()
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def n_plus_one(conn):
+    # Como era o consulta.fetch_all_barbers: uma ida ao banco por barbeiro e por dia
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM barbers")
+    result = []
+    for barber in cursor.fetchall():
+        barber_id = barber["id"]
+        cursor.execute("SELECT url FROM photos WHERE barber_id = ?", (barber_id,))
+        photos = [row["url"] for row in cursor.fetchall()]
+        cursor.execute("SELECT name, rate, body FROM testimonials WHERE barber_id = ?", (barber_id,))
+        testimonials = [dict(row) for row in cursor.fetchall()]
+        cursor.execute("SELECT id, date FROM availability WHERE barber_id = ?", (barber_id,))
+        availability = []
+        for avail in cursor.fetchall():
+            cursor.execute("SELECT hour FROM availability_hours WHERE availability_id = ?", (avail["id"],))
+            availability.append({"date": avail["date"], "hours": [h["hour"] for h in cursor.fetchall()]})
+        result.append((barber_id, photos, testimonials, availability))
+    return result
+
+
+def batched(conn):
+    barbers = fetch_all(conn, Barber, f"SELECT {BARBER_COLUMNS} FROM barbers")
+    return load_barber_profiles(conn, barbers)
+
+
+def measure(conn, fn, repeat):
+    statements = []
+    conn.set_trace_callback(statements.append)
+    fn(conn)
+    conn.set_trace_callback(None)
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(conn)
+        best = min(best, time.perf_counter() - start)
+    return len(statements), best * 1000
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="N+1 contra carregador em lote dos perfis de barbeiros")
+    parser.add_argument("barbers", nargs="*", type=int, default=[10, 100, 500])
+    parser.add_argument("--days", type=int, default=14, help="dias de disponibilidade por barbeiro")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'barbeiros':>9} {'consultas N+1':>14} {'lote':>6} {'N+1 (ms)':>10} {'lote (ms)':>10} {'ganho':>7}")
+    for count in args.barbers:
+        conn = make_db(count, args.days)
+        old_queries, old_ms = measure(conn, n_plus_one, args.repeat)
+        new_queries, new_ms = measure(conn, batched, args.repeat)
+        print(f"{count:>9} {old_queries:>14} {new_queries:>6} {old_ms:>10.1f} {new_ms:>10.1f} "
+              f"{old_ms / new_ms:>6.1f}x")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,91 @@
+"""
+Micro-benchmark do caminho de leitura: sqlite3.Row + dict(row) (como era)
+contra tuplas mapeadas direto para records.User.
+
+    python benchmarks/bench_rows.py [linhas] [repetições]
+"""
+import os
+import sqlite3
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from records import User, USER_COLUMNS  # noqa: E402
+
+
+def make_db(rows):
+    conn = sqlite3.connect(":memory:")
+    conn.execute("""
+        CREATE TABLE users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT NOT NULL UNIQUE,
+            password TEXT NOT NULL,
+            avatar TEXT
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO users (name, email, password, avatar) VALUES (?, ?, ?, ?)",
+        ((f"Cliente {i}", f"cliente{i}@email.com", "$2b$12$" + "x" * 53, f"https://i.pravatar.cc/150?u={i}")
+         for i in range(rows))
+    )
+    conn.commit()
+    return conn
+
+
+def row_dicts(conn):
+    cur = conn.cursor()
+    cur.row_factory = sqlite3.Row
+    cur.execute(f"SELECT {USER_COLUMNS} FROM users")
+    return [dict(r) for r in cur.fetchall()]
+
+
+def row_records(conn):
+    cur = conn.cursor()
+    cur.row_factory = None
+    cur.execute(f"SELECT {USER_COLUMNS} FROM users")
+    return list(map(User._make, cur.fetchall()))
+
+
+def measure(fn, conn, rows, repeat):
+    fn(conn)  # aquece o cache de statements
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(conn)
+        best = min(best, time.perf_counter() - start)
+
+    # Memória retida pelo resultado (o que fica vivo até o jsonify/uso)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = fn(conn)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(s.size_diff for s in after.compare_to(before, "filename"))
+    del result
+
+    return best / rows * 1e9, retained / rows
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    conn = make_db(rows)
+
+    print(f"{rows} linhas, melhor de {repeat}")
+    print(f"{'caminho':<24}{'ns/linha':>12}{'bytes/linha':>14}")
+    results = {}
+    for name, fn in (("sqlite3.Row + dict", row_dicts), ("tupla -> records.User", row_records)):
+        ns, size = measure(fn, conn, rows, repeat)
+        results[name] = (ns, size)
+        print(f"{name:<24}{ns:>12.0f}{size:>14.0f}")
+
+    (ns_a, b_a), (ns_b, b_b) = results.values()
+    print(f"\neconomia: {100 * (1 - ns_b / ns_a):.0f}% de tempo, {b_a - b_b:.0f} bytes por linha")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Busca por proximidade (/barbers/nearby): KD-tree em memória, R*Tree do SQLite
+e varredura de todos os barbeiros, com N barbeiros em volta de cidades reais.
+
+    python benchmarks/geo_bench.py [barbeiros ...] [--queries 2000] [--radius 5] [--limit 20]
+
+Confere que as três devolvem os mesmos barbeiros e mostra a latência por busca.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import geo  # noqa: E402
+from migrate import MIGRATIONS_DIR, split_statements  # noqa: E402
+
+CITIES = [(-23.5505, -46.6333), (-22.9068, -43.1729), (-19.9167, -43.9345), (-25.4284, -49.2733),
+          (-30.0346, -51.2177), (-12.9777, -38.5016), (-8.0476, -34.8770), (-3.7319, -38.5267)]
+
+
+def make_db(count, seed=1):
+    rnd = random.Random(seed)
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE barbers (id INTEGER PRIMARY KEY, name TEXT, avatar TEXT, stars REAL, "
+                 "lat REAL, lng REAL, loc TEXT)")
+    points = []
+    for i in range(1, count + 1):
+        lat, lng = rnd.choice(CITIES)
+        points.append((i, lat + rnd.gauss(0, 0.15), lng + rnd.gauss(0, 0.15)))
+    conn.executemany("INSERT INTO barbers (id, lat, lng) VALUES (?, ?, ?)", points)
+    with open(os.path.join(MIGRATIONS_DIR, "0005_barbers_geo.sql"), encoding="utf-8") as f:
+        for statement in split_statements(f.read()):
+            conn.execute(statement)
+    conn.commit()
+    return conn, points
+
+
+def brute_force(points, lat, lng, radius_km, limit):
+    found = []
+    for barber_id, b_lat, b_lng in points:
+        distance = geo.haversine_km(lat, lng, b_lat, b_lng)
+        if distance <= radius_km:
+            found.append((distance, barber_id))
+    found.sort()
+    return found[:limit]
+
+
+def timed(fn, queries):
+    samples, results = [], []
+    for lat, lng in queries:
+        start = time.perf_counter()
+        results.append(fn(lat, lng))
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return results, samples[len(samples) // 2] * 1000, samples[int(len(samples) * 0.99)] * 1000
+
+
+def same(a, b):
+    # Empates na última posição podem trocar o id; compara as distâncias arredondadas
+    return [round(d, 6) for d, _ in a] == [round(d, 6) for d, _ in b]
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="k-NN de barbeiros: KD-tree x R*Tree x varredura")
+    parser.add_argument("barbers", nargs="*", type=int, default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--radius", type=float, default=5.0)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    print(f"{'barbeiros':>9} {'build (ms)':>10} {'kd p50':>8} {'kd p99':>8} {'rtree p50':>10} "
+          f"{'rtree p99':>10} {'scan p50':>9} {'iguais':>7}   (ms por busca)")
+    for count in args.barbers:
+        conn, points = make_db(count, args.seed)
+        rnd = random.Random(args.seed + count)
+        queries = []
+        for _ in range(args.queries):
+            lat, lng = rnd.choice(CITIES)
+            queries.append((lat + rnd.gauss(0, 0.2), lng + rnd.gauss(0, 0.2)))
+
+        start = time.perf_counter()
+        tree = geo.KDTree(points)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        kd, kd_p50, kd_p99 = timed(lambda lat, lng: tree.nearest(lat, lng, args.limit, args.radius), queries)
+        rt, rt_p50, rt_p99 = timed(lambda lat, lng: geo.nearby_rtree(conn, lat, lng, args.radius, args.limit),
+                                   queries)
+        scan_queries = queries[:max(1, args.queries // 20)]
+        scan, scan_p50, _ = timed(lambda lat, lng: brute_force(points, lat, lng, args.radius, args.limit),
+                                  scan_queries)
+        ok = all(same(a, b) for a, b in zip(kd, scan)) and all(same(a, b) for a, b in zip(rt, scan))
+
+        print(f"{count:>9} {build_ms:>10.1f} {kd_p50:>8.3f} {kd_p99:>8.3f} {rt_p50:>10.3f} "
+              f"{rt_p99:>10.3f} {scan_p50:>9.2f} {'sim' if ok else 'NÃO':>7}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,560 @@
+"""
+Benchmark HTTP de ponta a ponta com um mix de tráfego realista.
+
+    python benchmarks/http_bench.py                          # in-process (Flask test client)
+    python benchmarks/http_bench.py --serve                  # sobe o servidor local e mede por HTTP
+    python benchmarks/http_bench.py --serve gunicorn         # idem com o servidor de produção (serve.py)
+    python benchmarks/http_bench.py --url http://127.0.0.1:5000
+
+    --db synthetic_medium.db   base usada (gere com datagen.py); padrão DB_PATH
+    -c 8 -d 30                 8 clientes simultâneos por 30s (ou -n 5000 requisições)
+    --mix availability=50,login=0
+    --login-storm 16           16 clientes extras só fazendo login (hash no pool vs. resto)
+    --out results.json --compare anterior.json
+
+Os resultados (vazão e percentis por rota) vão para benchmarks/results/ em JSON
+para comparar versões.
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from urllib.parse import quote, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# Senha dos usuários criados pelo datagen.py
+DEFAULT_PASSWORD = "123456"
+
+
+# ----- Dados reais da base para montar as requisições -----
+
+class Fixtures:
+    def __init__(self, db_path, sample=2000):
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            def column(sql):
+                return [r[0] for r in conn.execute(sql, (sample,)).fetchall()]
+
+            self.emails = column("SELECT email FROM users ORDER BY id LIMIT ?")
+            self.barbers = column("SELECT id FROM barbers ORDER BY id LIMIT ?")
+            self.clients = column("SELECT id FROM clients ORDER BY id LIMIT ?")
+            self.locs = column("SELECT DISTINCT loc FROM barbers LIMIT ?") or ["São Paulo"]
+            self.barber_services = conn.execute(
+                "SELECT barber_id, service_id FROM barber_services LIMIT ?", (sample,)
+            ).fetchall()
+            self.availability = conn.execute(
+                "SELECT barber_id, date FROM availability ORDER BY id DESC LIMIT ?", (sample,)
+            ).fetchall()
+            self.months = column(
+                "SELECT DISTINCT substr(datetime, 1, 7) FROM cashflow WHERE datetime IS NOT NULL LIMIT ?"
+            ) or [datetime.now().strftime("%Y-%m")]
+        finally:
+            conn.close()
+
+        if not self.emails or not self.barbers or not self.clients:
+            raise SystemExit(f"{db_path} não tem usuários, barbeiros e clientes (gere com datagen.py)")
+        self.days = sorted({date for _, date in self.availability}) or [datetime.now().strftime("%Y-%m-%d")]
+
+
+# ----- Alvos: test client ou HTTP -----
+
+class Response:
+    __slots__ = ("status", "body", "retry_after")
+
+    def __init__(self, status, body, retry_after=None):
+        self.status = status
+        self.body = body
+        self.retry_after = retry_after
+
+    def json(self):
+        try:
+            return json.loads(self.body)
+        except ValueError:
+            return None
+
+
+class InProcessTarget:
+    name = "in-process"
+
+    def __init__(self):
+        from app import app
+        self.app = app
+
+    def session(self):
+        client = self.app.test_client()
+
+        def send(method, path, headers, body):
+            r = client.open(path, method=method, headers=headers, json=body)
+            return Response(r.status_code, r.get_data(), r.headers.get("Retry-After"))
+        return send
+
+    def close(self):
+        pass
+
+
+class HttpTarget:
+    name = "http"
+
+    def __init__(self, url, process=None):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.process = process
+
+    def session(self):
+        # Uma conexão keep-alive por cliente
+        state = {"conn": None}
+
+        def send(method, path, headers, body):
+            payload = None
+            headers = dict(headers)
+            if body is not None:
+                payload = json.dumps(body).encode()
+                headers["Content-Type"] = "application/json"
+            for attempt in (1, 2):
+                if state["conn"] is None:
+                    state["conn"] = http.client.HTTPConnection(self.host, self.port, timeout=60)
+                try:
+                    state["conn"].request(method, quote(path, safe="/?&=%:"), body=payload, headers=headers)
+                    r = state["conn"].getresponse()
+                    return Response(r.status, r.read(), r.getheader("Retry-After"))
+                except (http.client.HTTPException, OSError):
+                    state["conn"].close()
+                    state["conn"] = None
+                    if attempt == 2:
+                        raise
+        return send
+
+    def close(self):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.wait(10)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+SERVERS = {
+    "dev": [sys.executable, "-m", "flask", "--app", "app", "run",
+            "--port", "{port}", "--no-debugger", "--no-reload", "--with-threads"],
+    "gunicorn": [sys.executable, "serve.py", "--bind", "127.0.0.1:{port}"],
+}
+
+
+def start_server(db_path, command=None):
+    """Sobe o app em outro processo (servidor de desenvolvimento do Flask por padrão)."""
+    port = _free_port()
+    # pidfile próprio para não colidir com um servidor já rodando na máquina
+    env = dict(os.environ, DB_PATH=db_path, SERVER_PIDFILE="")
+    command = command or SERVERS["dev"]
+    command = [part.replace("{port}", str(port)) for part in command]
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Servidor saiu com código {process.returncode}: {' '.join(command)}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return HttpTarget(f"http://127.0.0.1:{port}", process)
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise SystemExit("Servidor não respondeu em 30s")
+
+
+# ----- Cenários -----
+# Cada cenário é um gerador: faz yield de (rota, método, caminho, corpo) e recebe a resposta.
+
+def scenario_login(ctx, rnd):
+    yield "POST /auth/login", "POST", "/auth/login", {
+        "email": rnd.choice(ctx.fixtures.emails), "password": ctx.password,
+    }
+
+
+def scenario_barber_list(ctx, rnd):
+    yield "GET /barbers/all", "GET", "/barbers/all", None
+
+
+def scenario_barber_search(ctx, rnd):
+    yield "GET /barbers?loc", "GET", f"/barbers?token={ctx.token(rnd)}&loc={rnd.choice(ctx.fixtures.locs)}", None
+
+
+def scenario_availability(ctx, rnd):
+    barber_id, date = rnd.choice(ctx.fixtures.availability) if ctx.fixtures.availability else (
+        rnd.choice(ctx.fixtures.barbers), rnd.choice(ctx.fixtures.days))
+    yield "GET /barber/<id>/availability", "GET", f"/barber/{barber_id}/availability?date={date}", None
+
+
+def scenario_schedule(ctx, rnd):
+    barber_id = rnd.choice(ctx.fixtures.barbers)
+    yield ("GET /barbers/<id>/schedule", "GET",
+           f"/barbers/{barber_id}/schedule?date={rnd.choice(ctx.fixtures.days)}", None)
+
+
+def scenario_booking(ctx, rnd):
+    barber_id, service_id = rnd.choice(ctx.fixtures.barber_services)
+    yield "POST /appointments", "POST", "/appointments", {
+        "client_id": rnd.choice(ctx.fixtures.clients),
+        "barber_id": barber_id,
+        "service_id": service_id,
+        "datetime": f"{rnd.choice(ctx.fixtures.days)} {rnd.randint(9, 18):02d}:{rnd.choice(('00', '30'))}:00",
+    }
+
+
+def scenario_order(ctx, rnd):
+    barber_id, service_id = rnd.choice(ctx.fixtures.barber_services)
+    number = f"bench-{threading.get_ident()}-{rnd.randrange(10**9)}"
+    r = yield "POST /orders/create", "POST", "/orders/create", {
+        "order_number": number, "client_id": rnd.choice(ctx.fixtures.clients), "barber_id": barber_id,
+    }
+    order_id = (r.json() or {}).get("order_id") if r.status == 201 else None
+    if order_id is None:
+        return
+    for _ in range(rnd.randint(1, 3)):
+        yield "POST /orders/item", "POST", "/orders/item", {
+            "comanda_id": order_id, "service_id": service_id, "barber_id": barber_id, "qtd": 1,
+        }
+    yield "POST /orders/number/<n>/finalizar", "POST", f"/orders/number/{number}/finalizar", {
+        "forma_pagamento": rnd.choice(("dinheiro", "cartao", "pix")), "desconto": 0,
+    }
+
+
+def scenario_orders_list(ctx, rnd):
+    yield "GET /orders/all", "GET", "/orders/all", None
+
+
+def scenario_cashflow_daily(ctx, rnd):
+    yield "GET /cashflow/daily", "GET", "/cashflow/daily", None
+
+
+def scenario_cashflow_monthly(ctx, rnd):
+    yield "GET /cashflow/monthly", "GET", f"/cashflow/monthly?month={rnd.choice(ctx.fixtures.months)}", None
+
+
+def scenario_cashflow_report(ctx, rnd):
+    yield "GET /cashflow/report", "GET", "/cashflow/report", None
+
+
+def scenario_today_summary(ctx, rnd):
+    yield "GET /appointments/today-summary", "GET", "/appointments/today-summary", None
+
+
+SCENARIOS = {
+    "login": scenario_login,
+    "barber_list": scenario_barber_list,
+    "barber_search": scenario_barber_search,
+    "availability": scenario_availability,
+    "schedule": scenario_schedule,
+    "booking": scenario_booking,
+    "order": scenario_order,
+    "orders_list": scenario_orders_list,
+    "cashflow_daily": scenario_cashflow_daily,
+    "cashflow_monthly": scenario_cashflow_monthly,
+    "cashflow_report": scenario_cashflow_report,
+    "today_summary": scenario_today_summary,
+}
+
+# Pesos do mix padrão: muita consulta de agenda/barbeiros, poucas escritas e logins
+DEFAULT_MIX = {
+    "login": 2,
+    "barber_list": 15,
+    "barber_search": 8,
+    "availability": 25,
+    "schedule": 12,
+    "booking": 6,
+    "order": 5,
+    "orders_list": 4,
+    "cashflow_daily": 5,
+    "cashflow_monthly": 5,
+    "cashflow_report": 3,
+    "today_summary": 10,
+}
+
+
+def parse_mix(text, base=DEFAULT_MIX):
+    mix = dict(base)
+    for part in filter(None, (text or "").split(",")):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Cenário desconhecido: {name} (use {', '.join(SCENARIOS)})")
+        mix[name] = float(weight)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+# ----- Execução -----
+
+class Context:
+    def __init__(self, fixtures, password, tokens=32):
+        from utils import generate_token
+        self.fixtures = fixtures
+        self.password = password
+        # Tokens gerados localmente (mesmo JWT_SECRET do .env) para não pagar bcrypt fora do cenário de login
+        self.tokens = [generate_token({"email": email}) for email in fixtures.emails[:tokens]]
+
+    def token(self, rnd):
+        return rnd.choice(self.tokens)
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}
+
+    def add(self, route, elapsed, status, error=None):
+        with self.lock:
+            entry = self.routes.setdefault(route, {"samples": [], "status": {}, "errors": 0})
+            entry["samples"].append(elapsed)
+            key = str(status) if error is None else type(error).__name__
+            entry["status"][key] = entry["status"].get(key, 0) + 1
+            if error is not None or status >= 500:
+                entry["errors"] += 1
+
+
+def _percentile(ordered, p):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))]
+
+
+def _summary(samples, seconds, status, errors):
+    ordered = sorted(samples)
+    ms = lambda v: round(v * 1000, 3)  # noqa: E731
+    return {
+        "count": len(ordered),
+        "errors": errors,
+        "status": status,
+        "rps": round(len(ordered) / seconds, 2) if seconds else 0,
+        "mean_ms": ms(sum(ordered) / len(ordered)) if ordered else 0,
+        "p50_ms": ms(_percentile(ordered, 50)),
+        "p90_ms": ms(_percentile(ordered, 90)),
+        "p95_ms": ms(_percentile(ordered, 95)),
+        "p99_ms": ms(_percentile(ordered, 99)),
+        "max_ms": ms(ordered[-1]) if ordered else 0,
+    }
+
+
+def run(target, ctx, mix, concurrency=8, duration=None, requests=None, warmup=0.0, seed=1, storm=0):
+    # storm: clientes extras só com login, para ver se o bcrypt atrasa as outras rotas
+    mixes = [tuple(zip(*mix.items()))] * concurrency + [(("login",), (1,))] * storm
+    recorder = Recorder()
+    budget = {"left": requests}
+    budget_lock = threading.Lock()
+    start_event = threading.Event()
+    timing = {}
+
+    def take():
+        if budget["left"] is None:
+            return time.monotonic() < timing["end"]
+        with budget_lock:
+            if budget["left"] <= 0:
+                return False
+            budget["left"] -= 1
+            return True
+
+    def worker(index, names, weights):
+        rnd = random.Random(seed * 1000 + index)
+        send = target.session()
+        headers_cache = {}
+        start_event.wait()
+        while True:
+            warming = time.monotonic() < timing["warm_until"]
+            if not warming and not take():
+                return
+            flow = SCENARIOS[rnd.choices(names, weights)[0]](ctx, rnd)
+            response = None
+            while True:
+                try:
+                    route, method, path, body = flow.send(response) if response is not None else next(flow)
+                except StopIteration:
+                    break
+                token = ctx.token(rnd)
+                headers = headers_cache.get(token) or headers_cache.setdefault(
+                    token, {"Authorization": f"Bearer {token}"})
+                t0 = time.perf_counter()
+                try:
+                    response = send(method, path, headers, body)
+                except Exception as e:
+                    if not warming:
+                        recorder.add(route, time.perf_counter() - t0, 0, e)
+                    break
+                if not warming:
+                    recorder.add(route, time.perf_counter() - t0, response.status)
+                if response.status == 503 and response.retry_after:
+                    # Como um cliente de verdade: respeita o Retry-After em vez de martelar
+                    time.sleep(min(float(response.retry_after), 5))
+                    break
+
+    threads = [threading.Thread(target=worker, args=(i, *m), daemon=True) for i, m in enumerate(mixes)]
+    for t in threads:
+        t.start()
+
+    now = time.monotonic()
+    timing["warm_until"] = now + warmup
+    timing["end"] = now + warmup + (duration or 0)
+    start_event.set()
+    for t in threads:
+        t.join()
+    measured = time.monotonic() - timing["warm_until"]
+
+    routes = {
+        route: _summary(e["samples"], measured, e["status"], e["errors"])
+        for route, e in sorted(recorder.routes.items())
+    }
+    all_samples = [s for e in recorder.routes.values() for s in e["samples"]]
+    total = _summary(all_samples, measured, {}, sum(e["errors"] for e in recorder.routes.values()))
+    total["seconds"] = round(measured, 3)
+    return {"routes": routes, "total": total}
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _db_size(path):
+    counts = {}
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        for table in ("barbers", "users", "clients", "appointments", "orders", "cashflow"):
+            try:
+                counts[table] = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            except sqlite3.Error:
+                pass
+    finally:
+        conn.close()
+    return counts
+
+
+def print_report(result):
+    print(f"\n{'rota':<36} {'req':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'erros':>6}")
+    for route, r in list(result["routes"].items()) + [("TOTAL", result["total"])]:
+        print(f"{route:<36} {r['count']:>7} {r['rps']:>8.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+              f"{r['p99_ms']:>8.2f} {r['max_ms']:>8.2f} {r['errors']:>6}")
+    print("(latências em ms)")
+
+
+def print_comparison(result, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    def delta(new, old):
+        return f"{(new - old) / old * 100:+7.1f}%" if old else "      -"
+
+    print(f"\nComparação com {baseline_path} ({baseline.get('meta', {}).get('git', '?')})")
+    print(f"{'rota':<36} {'rps':>9} {'p50':>9} {'p99':>9}")
+    rows = list(result["routes"].items()) + [("TOTAL", result["total"])]
+    for route, r in rows:
+        old = baseline["total"] if route == "TOTAL" else baseline["routes"].get(route)
+        if not old:
+            continue
+        print(f"{route:<36} {delta(r['rps'], old['rps']):>9} {delta(r['p50_ms'], old['p50_ms']):>9} "
+              f"{delta(r['p99_ms'], old['p99_ms']):>9}")
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Benchmark HTTP de ponta a ponta")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--url", help="mede um servidor já em execução")
+    mode.add_argument("--serve", nargs="?", const="dev", choices=sorted(SERVERS),
+                      help="sobe o servidor local (dev = flask run, gunicorn = serve.py) e mede por HTTP")
+    parser.add_argument("--server-cmd", help="comando alternativo para --serve; use {port} para a porta")
+    parser.add_argument("--db", default=None, help="base usada pelo app e para escolher ids (padrão: DB_PATH)")
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="segundos medidos")
+    parser.add_argument("-n", "--requests", type=int, default=None, help="total de requisições (ignora -d)")
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--mix", default="", help="pesos, ex.: availability=50,login=0")
+    parser.add_argument("--login-storm", type=int, default=0, metavar="N",
+                        help="N clientes extras fazendo só login durante a medição")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="senha dos usuários para o cenário de login")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--label", default=None, help="nome do resultado (padrão: modo)")
+    parser.add_argument("--out", default=None, help="arquivo JSON (padrão: benchmarks/results/<data>-<label>.json)")
+    parser.add_argument("--compare", default=None, help="JSON anterior para comparar")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        os.environ["DB_PATH"] = os.path.abspath(args.db)
+    # Todos os clientes do benchmark saem do mesmo IP; RATE_LIMIT_ENABLED=1 mede o limitador
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+    import config
+    db_path = config.DB_PATH
+
+    mix = parse_mix(args.mix)
+    fixtures = Fixtures(db_path)
+    ctx = Context(fixtures, args.password)
+
+    if args.url:
+        target = HttpTarget(args.url)
+    elif args.serve:
+        target = start_server(os.path.abspath(db_path),
+                              args.server_cmd.split() if args.server_cmd else SERVERS[args.serve])
+    else:
+        target = InProcessTarget()
+    mode_name = "url" if args.url else f"serve-{args.serve}" if args.serve else target.name
+
+    print(f"{mode_name}: {args.concurrency} clientes"
+          f"{f' + {args.login_storm} em login' if args.login_storm else ''}, "
+          f"{f'{args.requests} requisições' if args.requests else f'{args.duration}s'}, base {db_path}")
+    try:
+        result = run(target, ctx, mix, args.concurrency, args.duration, args.requests, args.warmup, args.seed,
+                     args.login_storm)
+    finally:
+        target.close()
+
+    result["meta"] = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "git": _git_revision(),
+        "mode": mode_name,
+        "url": args.url,
+        "server_cmd": args.server_cmd,
+        "concurrency": args.concurrency,
+        "login_storm": args.login_storm,
+        "duration": args.duration,
+        "requests": args.requests,
+        "mix": mix,
+        "seed": args.seed,
+        "db": db_path,
+        "dataset": _db_size(db_path),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+    }
+
+    print_report(result)
+
+    out = args.out
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        out = os.path.join(RESULTS_DIR, f"{stamp}-{args.label or mode_name}.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    print(f"\nResultado salvo em {out}")
+
+    if args.compare:
+        print_comparison(result, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
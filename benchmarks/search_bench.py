@@ -0,0 +1,93 @@
+"""
+Busca de clientes por nome: o LIKE '%termo%' de antes contra search.search no
+clients_fts (migração 0006), com N clientes de nomes brasileiros.
+
+    python benchmarks/search_bench.py [clientes ...] [--queries 500] [--per-page 20]
+
+Mostra a latência por busca e quantos termos sem acento ("joao") o LIKE deixa
+de achar.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import search  # noqa: E402
+from migrate import MIGRATIONS_DIR, split_statements  # noqa: E402
+
+FIRST = ["João", "José", "Antônio", "Márcio", "Luís", "Júlia", "Mônica", "Fábio", "Sérgio", "Cláudia",
+         "Maria", "Ana", "Pedro", "Lucas", "Rafael", "Bruna", "Letícia", "Vinícius", "Caio", "Inês"]
+LAST = ["Silva", "Conceição", "Araújo", "Gonçalves", "Simões", "Magalhães", "Souza", "Lima", "Pereira",
+        "Brandão", "Falcão", "Assunção", "Romão", "Costa", "Ribeiro", "Gomes", "Melo", "Patrício"]
+TERMS = ["joao", "jo", "maria sil", "conceicao", "gon", "ines falcao", "vinicius", "ma", "araujo", "leticia s"]
+
+
+def make_db(count, seed=1):
+    rnd = random.Random(seed)
+    conn = sqlite3.connect(":memory:")
+    conn.executescript("""
+        CREATE TABLE barbers (id INTEGER PRIMARY KEY, name TEXT, avatar TEXT, stars REAL, lat REAL, lng REAL, loc TEXT);
+        CREATE TABLE clients (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, phone TEXT, email TEXT,
+                              created_at TEXT);
+        CREATE TABLE services (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT);
+        CREATE TABLE products (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, price REAL, cost REAL,
+                               unit TEXT, description TEXT);
+    """)
+    rows = []
+    for i in range(count):
+        name = f"{rnd.choice(FIRST)} {rnd.choice(LAST)} {rnd.choice(LAST)}"
+        rows.append((name, f"11 9{rnd.randint(1000, 9999)}-{rnd.randint(1000, 9999)}", f"cliente{i}@exemplo.com"))
+    conn.executemany("INSERT INTO clients (name, phone, email) VALUES (?, ?, ?)", rows)
+    with open(os.path.join(MIGRATIONS_DIR, "0006_fts_search.sql"), encoding="utf-8") as f:
+        for statement in split_statements(f.read()):
+            conn.execute(statement)
+    conn.commit()
+    return conn
+
+
+def like(conn, term, per_page):
+    return conn.execute("SELECT * FROM clients WHERE name LIKE ? LIMIT ?", (f"%{term}%", per_page)).fetchall()
+
+
+def fts(conn, term, per_page):
+    return search.search(conn, "clients", term, 1, per_page)[0]
+
+
+def timed(conn, fn, queries, per_page):
+    samples, empty = [], 0
+    for term in queries:
+        start = time.perf_counter()
+        rows = fn(conn, term, per_page)
+        samples.append(time.perf_counter() - start)
+        empty += not rows
+    samples.sort()
+    return samples[len(samples) // 2] * 1000, samples[int(len(samples) * 0.99)] * 1000, empty
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Busca de clientes: LIKE x FTS5")
+    parser.add_argument("clients", nargs="*", type=int, default=[1000, 20000, 100000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    print(f"{'clientes':>9} {'like p50':>9} {'like p99':>9} {'fts p50':>8} {'fts p99':>8} "
+          f"{'like vazias':>12} {'fts vazias':>11}   (ms por busca)")
+    for count in args.clients:
+        conn = make_db(count, args.seed)
+        rnd = random.Random(args.seed + count)
+        queries = [rnd.choice(TERMS) for _ in range(args.queries)]
+        like_p50, like_p99, like_empty = timed(conn, like, queries, args.per_page)
+        fts_p50, fts_p99, fts_empty = timed(conn, fts, queries, args.per_page)
+        print(f"{count:>9} {like_p50:>9.3f} {like_p99:>9.3f} {fts_p50:>8.3f} {fts_p99:>8.3f} "
+              f"{like_empty:>12} {fts_empty:>11}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,154 @@
+"""
+Tempo de partida a frio do app: o que cada worker do gunicorn (ou cada teste)
+paga antes de atender a primeira requisição.
+
+    python benchmarks/startup_bench.py                  # 5 rodadas, orçamento padrão
+    python benchmarks/startup_bench.py -n 10 --budget-ms 600
+    python benchmarks/startup_bench.py --compare benchmarks/results/anterior.json
+
+Cada rodada é um processo novo com "python -X importtime" medindo três fases:
+"import app" (só o módulo), create_app() e o total. A primeira rodada só aquece
+os .pyc e não entra na conta. Sai com código 1 se a mediana do total passar do
+orçamento (STARTUP_BUDGET_MS ou --budget-ms), para rodar em CI.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+DEFAULT_BUDGET_MS = 1500
+
+# Roda no processo filho: imprime as fases em JSON na última linha do stdout
+CHILD = """
+import json, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+app.create_app()
+t2 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "create_app_ms": (t2 - t1) * 1000, "total_ms": (t2 - t0) * 1000}))
+"""
+
+
+def parse_importtime(stderr):
+    """Linhas "import time: self | cumulative | nome" -> {módulo de topo: cumulativo em ms}."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nível zero = importado direto (pelo script ou pelo create_app); os filhos já estão no cumulativo
+        if not name.startswith("  "):
+            modules[name.strip()] = int(cumulative) / 1000
+    return modules
+
+
+def run_once(env):
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise SystemExit(f"Falha ao iniciar o app:\n{proc.stderr[-2000:]}")
+    phases = json.loads(proc.stdout.strip().splitlines()[-1])
+    phases["modules"] = parse_importtime(proc.stderr)
+    return phases
+
+
+def summarize(runs):
+    result = {}
+    for key in ("import_ms", "create_app_ms", "total_ms"):
+        values = [r[key] for r in runs]
+        result[key] = {"median": round(statistics.median(values), 2),
+                       "min": round(min(values), 2), "max": round(max(values), 2)}
+    names = set().union(*(r["modules"] for r in runs))
+    modules = {name: round(statistics.median(r["modules"].get(name, 0.0) for r in runs), 2) for name in names}
+    result["modules"] = dict(sorted(modules.items(), key=lambda item: item[1], reverse=True))
+    return result
+
+
+def print_report(result, budget, top):
+    print(f"\n{'fase':<16} {'mediana':>9} {'min':>9} {'max':>9}")
+    for key, label in (("import_ms", "import app"), ("create_app_ms", "create_app()"), ("total_ms", "total")):
+        r = result[key]
+        print(f"{label:<16} {r['median']:>9.1f} {r['min']:>9.1f} {r['max']:>9.1f}")
+    print("\nMódulos mais caros (importados direto, cumulativo em ms):")
+    for name, ms in list(result["modules"].items())[:top]:
+        print(f"  {name:<32} {ms:>8.1f}")
+    status = "OK" if result["total_ms"]["median"] <= budget else "ESTOUROU"
+    print(f"\nOrçamento: {budget} ms -> {status}")
+
+
+def print_comparison(result, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\nComparação com {baseline_path} ({baseline.get('meta', {}).get('git', '?')})")
+    for key in ("import_ms", "create_app_ms", "total_ms"):
+        old, new = baseline[key]["median"], result[key]["median"]
+        delta = f"{(new - old) / old * 100:+.1f}%" if old else "-"
+        print(f"  {key:<16} {old:>9.1f} -> {new:>9.1f}  {delta}")
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Tempo de partida a frio do app (python -X importtime)")
+    parser.add_argument("-n", "--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float,
+                        default=float(os.getenv("STARTUP_BUDGET_MS") or DEFAULT_BUDGET_MS))
+    parser.add_argument("--db", default=None, help="base usada pelo app (padrão: DB_PATH)")
+    parser.add_argument("--migrate", action="store_true", help="inclui as migrações do boot (DB_AUTO_MIGRATE)")
+    parser.add_argument("--top", type=int, default=12)
+    parser.add_argument("--out", default=None, help="arquivo JSON (padrão: benchmarks/results/<data>-startup.json)")
+    parser.add_argument("--compare", default=None, help="JSON anterior para comparar")
+    args = parser.parse_args(argv)
+
+    # Sem backup agendado nem migração por padrão: mede o custo de importar e montar o app
+    env = dict(os.environ, BACKUP_INTERVAL="0", PYTHONDONTWRITEBYTECODE="")
+    if not args.migrate:
+        env["DB_AUTO_MIGRATE"] = "0"
+    if args.db:
+        env["DB_PATH"] = os.path.abspath(args.db)
+
+    run_once(env)  # aquecimento: gera os .pyc
+    runs = [run_once(env) for _ in range(args.runs)]
+    result = summarize(runs)
+    result["meta"] = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "git": _git_revision(),
+        "runs": args.runs,
+        "budget_ms": args.budget_ms,
+        "migrate": args.migrate,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+    print_report(result, args.budget_ms, args.top)
+
+    out = args.out
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out = os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-startup.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    print(f"\nResultado salvo em {out}")
+
+    if args.compare:
+        print_comparison(result, args.compare)
+
+    return 0 if result["total_ms"]["median"] <= args.budget_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,28 +1,27 @@
 from flask import Blueprint, jsonify
-import sqlite3
-from datetime import datetime
+from datetime import datetime, timedelta
 from flask import request
 
 from database import get_db
+from writequeue import write
 
 cashflow = Blueprint("cashflow", __name__)
 
-def get_conn():
-    return sqlite3.connect("database.db", check_same_thread=False)
-
 @cashflow.route("/cashflow/daily", methods=["GET"])
 def fluxo_diario():
-    conn = get_conn()
+    conn = get_db(readonly=True)
     cursor = conn.cursor()
 
     hoje = datetime.now().strftime("%Y-%m-%d")
+    amanha = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
 
+    # Intervalo em vez de DATE(datetime) para usar idx_cashflow_datetime
     cursor.execute("""
         SELECT id, description, amount, type
         FROM cashflow
-        WHERE DATE(datetime) = ?
+        WHERE datetime >= ? AND datetime < ?
         ORDER BY datetime DESC
-    """, (hoje,))
+    """, (hoje, amanha))
 
     rows = cursor.fetchall()
 
@@ -48,7 +47,7 @@ def fluxo_diario():
 
 @cashflow.route("/cashflow/monthly", methods=["GET"])
 def fluxo_mensal():
-    conn = get_conn()
+    conn = get_db(readonly=True)
     cursor = conn.cursor()
 
     # Recebe ?month=2025-11
@@ -56,6 +55,12 @@ def fluxo_mensal():
     if not mes:
         mes = datetime.now().strftime("%Y-%m")
 
+    try:
+        inicio = datetime.strptime(mes, "%Y-%m")
+    except ValueError:
+        return jsonify({"error": "Parâmetro 'month' deve ser YYYY-MM"}), 400
+    fim = (inicio + timedelta(days=32)).replace(day=1)
+
     cursor.execute("""
         SELECT 
             strftime('%d', datetime) AS dia,
@@ -64,10 +69,10 @@ def fluxo_mensal():
             IFNULL(SUM(CASE WHEN type = 'entrada' THEN amount
                             ELSE -amount END), 0) AS liquido
         FROM cashflow
-        WHERE strftime('%Y-%m', datetime) = ?
+        WHERE datetime >= ? AND datetime < ?
         GROUP BY dia
         ORDER BY dia
-    """, (mes,))
+    """, (inicio.strftime("%Y-%m-%d"), fim.strftime("%Y-%m-%d")))
 
     dias = []
     total_entradas = 0
@@ -100,6 +105,14 @@ def fluxo_mensal():
 
 
 
+def _insert_cashflow(conn, tipo, descricao, valor, date):
+    cursor = conn.execute("""
+        INSERT INTO cashflow (type, description, amount, datetime)
+        VALUES (?, ?, ?, ?)
+    """, (tipo, descricao, valor, date))
+    return cursor.lastrowid
+
+
 @cashflow.route("/cashflow/add", methods=["POST"])
 def add_cashflow():
     data = request.json
@@ -108,23 +121,14 @@ def add_cashflow():
     tipo = data.get("tipo")  
     date = data.get("date")
 
-    conn = get_conn()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        INSERT INTO cashflow (type, description, amount, datetime)
-        VALUES (?, ?, ?, ?)
-    """, (tipo, descricao, valor, date))
-
-    conn.commit()
-    conn.close()
+    write(_insert_cashflow, tipo, descricao, valor, date)
 
     return jsonify({"message": "Lançamento salvo com sucesso!"})
 
 
 @cashflow.route("/weekly", methods=["GET"])
 def fluxo_semanal():
-    db = get_db()
+    db = get_db(readonly=True)
     cursor = db.cursor()
 
     cursor.execute("""
@@ -154,7 +158,7 @@ def fluxo_semanal():
 
 @cashflow.route("/payment-method", methods=["GET"])
 def fluxo_pagamento():
-    db = get_db()
+    db = get_db(readonly=True)
     cursor = db.cursor()
 
     cursor.execute("""
@@ -169,7 +173,7 @@ def fluxo_pagamento():
 
 @cashflow.route("/cashflow/report", methods=["GET"])
 def relatorio_financeiro():
-    conn = get_conn()
+    conn = get_db(readonly=True)
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -1,9 +1,10 @@
 from flask import Blueprint, request, jsonify
-from utils import verify_token
-from users import get_user
+from middleware import login_required
 from datetime import datetime, timedelta
 import sqlite3
 from consulta import create_clients, delete_client_from_db, fetch_all_clients, fetch_search_clients, get_client_by_id, update_client
+from search import page_args
+import pagination
 
 
 
@@ -12,20 +13,8 @@ clients = Blueprint('clients', __name__, url_prefix='/clients')
 
 
 @clients.route('/clients', methods=['POST'])  # <- Use POST se estiver usando JSON no body
+@login_required(data=[])
 def create_cliente():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({"error": "Token inválido ou expirado", "data": [] }), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({ "error": "Usuário não encontrado", "data": [] }), 404
-
     data = request.get_json()
     name = data.get("name")
     phone = data.get("phone")
@@ -40,64 +29,26 @@ def create_cliente():
 
 
 @clients.route('/all', methods=['GET'])
+@login_required(data=[])
 def get_all_cliente():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({ "error": "Token inválido ou expirado", "data": [] }), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({ "error": "Usuário não encontrado", "data": [] }), 404
-
-
-    
-    return fetch_all_clients()
+    return fetch_all_clients(pagination.from_request())
 
 
 @clients.route('/name', methods=['POST'])  # <- Use POST se estiver usando JSON no body
+@login_required(data=[])
 def get_search_cliente():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({"error": "Token inválido ou expirado", "data": [] }), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({ "error": "Usuário não encontrado", "data": [] }), 404
-
     data = request.get_json()
     name = data.get("name")
 
     if not name:
         return jsonify({ "error": "Nome não fornecido", "data": [] }), 400
 
-    return fetch_search_clients(name)
+    return fetch_search_clients(name, *page_args(data))
 
 
 @clients.route('/update', methods=['PUT'])  # <- Use POST se estiver usando JSON no body
+@login_required(data=[])
 def update_cliente():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({"error": "Token inválido ou expirado", "data": [] }), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({ "error": "Usuário não encontrado", "data": [] }), 404
-
     data = request.get_json()
     id = data.get("id")
     name = data.get("name")
@@ -112,21 +63,8 @@ def update_cliente():
 
 
 @clients.route('/delete/<int:client_id>', methods=['DELETE'])  # Corrige rota e nome do parâmetro
+@login_required
 def delete_client_route(client_id):
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-
-    if not decoded:
-        return jsonify({"error": "Token inválido"}), 401
-
-    user = get_user(decoded["email"])
-    if not user:
-        return jsonify({"error": "Usuário não encontrado"}), 404
-
     client = get_client_by_id(client_id)
     if not client:
         return jsonify({"error": "Cliente não encontrado"}), 404
@@ -139,24 +77,12 @@ def delete_client_route(client_id):
 
 
 @clients.route('<int:client_id>', methods=['POST'])  # <- Use POST se estiver usando JSON no body
+@login_required(data=[])
 def get_search_cliente_id(client_id):
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({"error": "Token inválido ou expirado", "data": [] }), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({ "error": "Usuário não encontrado", "data": [] }), 404
-
     data = request.get_json()
     id = data.get("name")
 
     if not id:
         return jsonify({ "error": "Nome não fornecido", "data": [] }), 400
 
-    return fetch_search_clients(id)
\ No newline at end of file
+    return fetch_search_clients(id, *page_args(data))
\ No newline at end of file
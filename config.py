@@ -0,0 +1,179 @@
+import os
+from dotenv import load_dotenv
+
+# Único lugar que lê o .env: os outros módulos pegam os valores daqui
+load_dotenv()
+
+
+def env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def env_float(name, default):
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def env_bool(name, default=False):
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# ----- Armazenamento (SQLite) -----
+DB_PATH = os.getenv("DB_PATH", "database.db")
+
+DB_JOURNAL_MODE = os.getenv("DB_JOURNAL_MODE", "WAL").upper()
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL").upper()
+DB_CACHE_SIZE = env_int("DB_CACHE_SIZE", -20000)        # negativo = KiB (20 MB)
+DB_MMAP_SIZE = env_int("DB_MMAP_SIZE", 128 * 1024 * 1024)
+DB_TEMP_STORE = os.getenv("DB_TEMP_STORE", "MEMORY").upper()
+DB_BUSY_TIMEOUT = env_float("DB_BUSY_TIMEOUT", 10)
+
+# Conexões somente leitura; a escrita passa sempre por um único writer
+DB_READERS = env_int("DB_READERS", 8)
+DB_HEALTH_CHECK_INTERVAL = env_int("DB_HEALTH_CHECK_INTERVAL", 30)
+# Statements preparados mantidos por conexão (o padrão do sqlite3 é 128)
+DB_STATEMENT_CACHE = env_int("DB_STATEMENT_CACHE", 512)
+
+# Aplica as migrações pendentes ao subir a aplicação
+DB_AUTO_MIGRATE = env_bool("DB_AUTO_MIGRATE", True)
+
+# ----- Instrumentação de consultas -----
+QUERY_STATS = env_bool("QUERY_STATS", True)
+QUERY_STATS_SAMPLES = env_int("QUERY_STATS_SAMPLES", 1024)   # amostras por comando p/ percentis
+SLOW_QUERY_MS = env_float("SLOW_QUERY_MS", 100)
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", "slow_queries.log")
+
+# ----- Administração -----
+# Sem ADMIN_TOKEN os endpoints /admin ficam desativados
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# ----- Backup -----
+BACKUP_DIR = os.getenv("BACKUP_DIR", "backups")
+BACKUP_INTERVAL = env_int("BACKUP_INTERVAL", 0)          # segundos entre snapshots; 0 = desligado
+BACKUP_KEEP = env_int("BACKUP_KEEP", 7)                  # snapshots mantidos
+BACKUP_PAGES = env_int("BACKUP_PAGES", 256)              # páginas copiadas por passo
+BACKUP_PAUSE = env_float("BACKUP_PAUSE", 0.005)          # pausa entre passos (s)
+BACKUP_MAX_RESTARTS = env_int("BACKUP_MAX_RESTARTS", 3)
+
+# ----- Multi-barbearia -----
+# Cada barbearia em um arquivo próprio: TENANT_DIR/<shop>.db. O tenant padrão usa DB_PATH.
+TENANTS_ENABLED = env_bool("TENANTS_ENABLED", False)
+TENANT_DIR = os.getenv("TENANT_DIR", "tenants")
+TENANT_HEADER = os.getenv("TENANT_HEADER", "X-Shop")
+DEFAULT_TENANT = os.getenv("DEFAULT_TENANT", "default")
+TENANT_POOL_LIMIT = env_int("TENANT_POOL_LIMIT", 64)     # pares de pools abertos ao mesmo tempo
+
+# ----- Fila de escrita (group commit) -----
+WRITE_QUEUE = env_bool("WRITE_QUEUE", False)
+WRITE_QUEUE_WINDOW_MS = env_float("WRITE_QUEUE_WINDOW_MS", 5)    # espera máxima para juntar um lote
+WRITE_QUEUE_MAX_BATCH = env_int("WRITE_QUEUE_MAX_BATCH", 64)
+WRITE_QUEUE_MAX_PENDING = env_int("WRITE_QUEUE_MAX_PENDING", 1024)
+WRITE_QUEUE_TIMEOUT = env_float("WRITE_QUEUE_TIMEOUT", 30)       # espera pelo commit (s)
+
+# ----- Cache de usuários -----
+# Usuários do token ficam em memória por USER_CACHE_TTL segundos; 0 desliga o cache.
+# Alterações feitas por este processo invalidam na hora; as de outros workers valem após o TTL.
+USER_CACHE_SIZE = env_int("USER_CACHE_SIZE", 1024)
+USER_CACHE_TTL = env_float("USER_CACHE_TTL", 60)
+
+# ----- Senhas (bcrypt) -----
+# Custo do bcrypt; hashes com outro custo são regravados no próximo login
+BCRYPT_ROUNDS = env_int("BCRYPT_ROUNDS", 12)
+# Processos dedicados ao hash; 0 faz o hash na própria thread da requisição
+HASH_WORKERS = env_int("HASH_WORKERS", 2)
+# Quantas operações podem esperar além das que estão rodando antes de responder 503
+HASH_MAX_PENDING = env_int("HASH_MAX_PENDING", 16)
+HASH_TIMEOUT = env_float("HASH_TIMEOUT", 10)
+HASH_RETRY_AFTER = env_int("HASH_RETRY_AFTER", 1)
+
+# ----- Cache de tokens -----
+# Payloads de JWT já verificados, guardados até o exp de cada token; 0 desliga
+TOKEN_CACHE_SIZE = env_int("TOKEN_CACHE_SIZE", 4096)
+
+# ----- Revogação de tokens -----
+# Intervalo (s) entre as conferências do PRAGMA data_version para ver revogações de outros processos
+REVOCATION_SYNC_INTERVAL = env_float("REVOCATION_SYNC_INTERVAL", 1.0)
+# Intervalo (s) entre as limpezas das revogações de tokens já expirados
+REVOCATION_GC_INTERVAL = env_float("REVOCATION_GC_INTERVAL", 3600)
+
+# ----- Limite de tentativas de login -----
+RATE_LIMIT_ENABLED = env_bool("RATE_LIMIT_ENABLED", True)
+# "quantidade/segundos": todas as tentativas por IP e as senhas erradas por email
+RATE_LIMIT_LOGIN_IP = os.getenv("RATE_LIMIT_LOGIN_IP", "30/60")
+RATE_LIMIT_LOGIN_EMAIL = os.getenv("RATE_LIMIT_LOGIN_EMAIL", "5/300")
+# Guarda os contadores num SQLite à parte para valerem entre os workers do gunicorn
+RATE_LIMIT_SHARED = env_bool("RATE_LIMIT_SHARED", False)
+RATE_LIMIT_DB = os.getenv("RATE_LIMIT_DB", "ratelimit.db")
+RATE_LIMIT_MAX_KEYS = env_int("RATE_LIMIT_MAX_KEYS", 100000)
+# Atrás de um proxy reverso o IP do cliente vem no X-Forwarded-For
+RATE_LIMIT_TRUST_PROXY = env_bool("RATE_LIMIT_TRUST_PROXY", False)
+# Quantos proxies nossos há na frente do app: o IP usado é o que o mais externo anotou
+RATE_LIMIT_PROXY_HOPS = env_int("RATE_LIMIT_PROXY_HOPS", 1)
+
+# ----- Sessão -----
+JWT_SECRET = os.getenv("JWT_SECRET")
+# Access token (JWT) curto; a sessão continua pelo refresh token, que gira a cada uso
+ACCESS_TOKEN_TTL = env_int("ACCESS_TOKEN_TTL", 15 * 60)
+REFRESH_TOKEN_TTL = env_int("REFRESH_TOKEN_TTL", 30 * 24 * 3600)
+
+# ----- Profiler -----
+# Requisições com este cabeçalho (e o X-Admin-Token) são perfiladas com cProfile
+PROFILE_HEADER = os.getenv("PROFILE_HEADER", "X-Profile")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_KEEP = env_int("PROFILE_KEEP", 200)
+
+# ----- Métricas -----
+METRICS_ENABLED = env_bool("METRICS_ENABLED", True)
+# Se definido, o /metrics exige "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+# Limites (s) dos buckets dos histogramas de latência das rotas e dos comandos SQL
+METRICS_BUCKETS = [float(b) for b in os.getenv(
+    "METRICS_BUCKETS", "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10").split(",")]
+METRICS_DB_BUCKETS = [float(b) for b in os.getenv(
+    "METRICS_DB_BUCKETS", "0.0005,0.001,0.0025,0.005,0.01,0.025,0.05,0.1,0.5,1").split(",")]
+# Com vários workers (gunicorn): diretório onde cada processo grava suas métricas para o /metrics somar
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+METRICS_FLUSH_INTERVAL = env_float("METRICS_FLUSH_INTERVAL", 5)
+
+# ----- Servidor de produção (gunicorn, ver gunicorn.conf.py e serve.py) -----
+SERVER_BIND = os.getenv("SERVER_BIND", "0.0.0.0:5000")
+# 0 = automático: um por CPU, no máximo SERVER_MAX_WORKERS (o SQLite tem um writer só,
+# mais processos só disputam o lock de escrita)
+SERVER_WORKERS = env_int("SERVER_WORKERS", 0)
+SERVER_MAX_WORKERS = env_int("SERVER_MAX_WORKERS", 4)
+# Threads por worker; limitado a DB_READERS para nenhuma esperar conexão de leitura
+SERVER_THREADS = env_int("SERVER_THREADS", 4)
+# Recicla o worker depois de N requisições (+ até JITTER, para não reiniciarem juntos); 0 desliga
+SERVER_MAX_REQUESTS = env_int("SERVER_MAX_REQUESTS", 2000)
+SERVER_MAX_REQUESTS_JITTER = env_int("SERVER_MAX_REQUESTS_JITTER", 200)
+SERVER_TIMEOUT = env_int("SERVER_TIMEOUT", 30)
+SERVER_GRACEFUL_TIMEOUT = env_int("SERVER_GRACEFUL_TIMEOUT", 30)
+SERVER_KEEPALIVE = env_int("SERVER_KEEPALIVE", 5)
+# Carrega o app (e roda as migrações) uma vez no master e só então faz o fork dos workers
+SERVER_PRELOAD = env_bool("SERVER_PRELOAD", True)
+SERVER_PIDFILE = os.getenv("SERVER_PIDFILE", "gunicorn.pid")
+
+# ----- Busca por proximidade (/barbers/nearby) -----
+# "kdtree": árvore em memória refeita quando os barbeiros mudam; "rtree": R*Tree do SQLite a cada busca
+GEO_INDEX = os.getenv("GEO_INDEX", "kdtree").lower()
+GEO_DEFAULT_RADIUS_KM = env_float("GEO_DEFAULT_RADIUS_KM", 5)
+GEO_MAX_RADIUS_KM = env_float("GEO_MAX_RADIUS_KM", 100)
+GEO_DEFAULT_LIMIT = env_int("GEO_DEFAULT_LIMIT", 20)
+GEO_MAX_LIMIT = env_int("GEO_MAX_LIMIT", 100)
+
+# ----- Busca textual (FTS5, ver search.py) -----
+SEARCH_PAGE_SIZE = env_int("SEARCH_PAGE_SIZE", 20)
+SEARCH_MAX_PAGE_SIZE = env_int("SEARCH_MAX_PAGE_SIZE", 100)
+# Palavras além disso são ignoradas: cada uma é mais um prefixo para o FTS5 resolver
+SEARCH_MAX_TERMS = env_int("SEARCH_MAX_TERMS", 8)
+
+# ----- Paginação das listagens (ver pagination.py) -----
+PAGE_DEFAULT_LIMIT = env_int("PAGE_DEFAULT_LIMIT", 50)
+PAGE_MAX_LIMIT = env_int("PAGE_MAX_LIMIT", 200)
+
+# ----- ETag / GET condicional (ver etag.py) -----
+ETAG_ENABLED = env_bool("ETAG_ENABLED", True)
@@ -1,13 +1,20 @@
+import json
 import sqlite3
+import config
 from flask import jsonify
 from datetime import datetime as dt, timedelta
+from database import get_db
+from records import User, USER_COLUMNS, Barber, BARBER_COLUMNS, fetch_one, fetch_all, fetch_rows
+from pagination import PageError, fetch_page
+from search import match_query, page_info, search
+from writequeue import write
 
 
 
 def add_user(email, name, hashed_password):
     try:
         avatar = f'https://i.pravatar.cc/150?u={email}'
-        conn = sqlite3.connect("database.db")
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -16,7 +23,6 @@ def add_user(email, name, hashed_password):
         ''', (email, name, hashed_password, avatar))
 
         conn.commit()
-        conn.close()
         return True, "Usuário cadastrado com sucesso"
     except sqlite3.IntegrityError:
         return False, "Usuário já existe"
@@ -25,123 +31,135 @@ def add_user(email, name, hashed_password):
 
     
 def get_user_by_email(email):
-    conn = sqlite3.connect("database.db")
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
-    row = cursor.fetchone()
-    conn.close()
-
-    if row:
-        return dict(row)
-    return None
+    return fetch_one(
+        get_db(readonly=True), User,
+        f"SELECT {USER_COLUMNS} FROM users WHERE email = ?", (email,)
+    )
 
     
 
-def fetch_all_barbers():
-    conn = sqlite3.connect("database.db")
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+# ----- Perfis de barbeiros (carregados em lote) -----
+# Uma consulta por tabela filha para qualquer quantidade de barbeiros: os ids vão
+# como um array JSON (json_each), então o SQL é sempre o mesmo e não esbarra no
+# limite de parâmetros do SQLite.
 
-    # Busca todos os barbeiros
-    cursor.execute("SELECT * FROM barbers")
-    barber_rows = cursor.fetchall()
+_IDS = "(SELECT value FROM json_each(?))"
 
-    barbers = []
 
-    for barber in barber_rows:
-        barber_id = barber["id"]
+def _group(rows, make):
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(row[0], []).append(make(row))
+    return grouped
 
-        # Fotos
-        cursor.execute("SELECT url FROM photos WHERE barber_id = ?", (barber_id,))
-        photos = [row["url"] for row in cursor.fetchall()]
 
-
-        # Testemunhos
-        cursor.execute("SELECT name, rate, body FROM testimonials WHERE barber_id = ?", (barber_id,))
-        testimonials = [dict(row) for row in cursor.fetchall()]
-
-        # Disponibilidade (dias e horas)
-        cursor.execute("SELECT id, date FROM availability WHERE barber_id = ?", (barber_id,))
-        availability = []
-        for avail in cursor.fetchall():
-            avail_id = avail["id"]
-            cursor.execute("SELECT hour FROM availability_hours WHERE id = ?", (avail_id,))
-            hours = [h["hour"] for h in cursor.fetchall()]
-            availability.append({
-                "date": avail["date"],
-                "hours": hours
-            })
-
-        # Monta o dicionário final
-        barbers.append({
-            "id": str(barber["id"]),
-            "name": barber["name"],
-            "avatar": barber["avatar"],
-            "stars": barber["stars"],
-            "lat": barber["lat"],
-            "lng": barber["lng"],
-            "loc": barber["loc"],
-            "photos": photos,
-            "testimonials": testimonials,
-            "available": availability,
-            "appointments": []  # futuramente pode ser preenchido
+def load_barber_profiles(conn, barbers, services=False, free_only=False):
+    """
+    barbers: records.Barber. Retorna {id: {"photos", "testimonials", "available"
+    [, "services"]}}. free_only: só horários livres e só datas que ainda têm algum.
+    """
+    ids = json.dumps([b.id for b in barbers])
+
+    photos = _group(
+        fetch_rows(conn, f"SELECT barber_id, url FROM photos WHERE barber_id IN {_IDS} ORDER BY barber_id, id", (ids,)),
+        lambda r: r[1],
+    )
+    testimonials = _group(
+        fetch_rows(conn, f"""
+            SELECT barber_id, name, rate, body FROM testimonials
+            WHERE barber_id IN {_IDS} ORDER BY barber_id, id
+        """, (ids,)),
+        lambda r: {"name": r[1], "rate": r[2], "body": r[3]},
+    )
+
+    # Um dia por linha, com as horas já juntadas pelo SQLite (group_concat na ordem
+    # do índice de availability_hours): bem menos tuplas do que um JOIN por hora
+    available = {}
+    rows = fetch_rows(conn, f"""
+        SELECT a.barber_id, a.date, (
+            SELECT group_concat(h.hour) FROM availability_hours h
+            WHERE h.availability_id = a.id {"AND h.is_booked = 0" if free_only else ""}
+        )
+        FROM availability a
+        WHERE a.barber_id IN {_IDS}
+        ORDER BY a.barber_id, a.date, a.id
+    """, (ids,))
+    for barber_id, date, hours in rows:
+        if free_only and not hours:
+            continue
+        available.setdefault(barber_id, []).append({
+            "date": date,
+            "hours": sorted(hours.split(",")) if hours else [],
         })
 
-    conn.close()
+    if services:
+        offered = _group(
+            fetch_rows(conn, f"""
+                SELECT bs.barber_id, s.name, bs.price
+                FROM barber_services bs
+                JOIN services s ON s.id = bs.service_id
+                WHERE bs.barber_id IN {_IDS}
+                ORDER BY bs.barber_id, s.name
+            """, (ids,)),
+            lambda r: {"name": r[1], "price": r[2]},
+        )
+
+    profiles = {}
+    for b in barbers:
+        profile = {
+            "photos": photos.get(b.id, []),
+            "testimonials": testimonials.get(b.id, []),
+            "available": available.get(b.id, []),
+        }
+        if services:
+            profile["services"] = offered.get(b.id, [])
+        profiles[b.id] = profile
+    return profiles
+
+
+def fetch_all_barbers(page):
+    conn = get_db(readonly=True)
+    barbers, next_cursor = fetch_page(
+        conn, f"SELECT {BARBER_COLUMNS} FROM barbers", page,
+        fetch=lambda conn, sql, params: fetch_all(conn, Barber, sql, params),
+    )
+    # Fotos, depoimentos e horários só são carregados se algum deles foi pedido em fields=
+    if page.wants("photos", "testimonials", "available"):
+        profiles = load_barber_profiles(conn, barbers)
+    else:
+        profiles = dict.fromkeys((b.id for b in barbers), {"photos": [], "testimonials": [], "available": []})
+
+    data = []
+    for barber in barbers:
+        profile = profiles[barber.id]
+        data.append(page.pick({
+            "id": str(barber.id),
+            "name": barber.name,
+            "avatar": barber.avatar,
+            "stars": barber.stars,
+            "lat": barber.lat,
+            "lng": barber.lng,
+            "loc": barber.loc,
+            "photos": profile["photos"],
+            "testimonials": profile["testimonials"],
+            "available": profile["available"],
+            "appointments": []  # futuramente pode ser preenchido
+        }))
 
-    return jsonify({"error": "", "data": barbers})
+    return jsonify({"error": "", "data": data, **page.info(next_cursor)})
 
 
 
 def get_full_barber(barber_id):
-    conn = sqlite3.connect('database.db')
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
-    
-    # Dados principais
-    cur.execute("SELECT * FROM barbers WHERE id = ?", (barber_id,))
-    barber = cur.fetchone()
+    conn = get_db(readonly=True)
+
+    barber = fetch_one(conn, Barber, f"SELECT {BARBER_COLUMNS} FROM barbers WHERE id = ?", (barber_id,))
     if not barber:
         return None
 
-    barber_data = dict(barber)
-
-    # Fotos
-    cur.execute("SELECT url FROM photos WHERE barber_id = ?", (barber_id,))
-    barber_data["photos"] = [row["url"] for row in cur.fetchall()]
-
-    # Serviços
-    cur.execute("SELECT name, price FROM services WHERE barber_id = ?", (barber_id,))
-    barber_data["services"] = [dict(row) for row in cur.fetchall()]
-
-    # Depoimentos
-    cur.execute("SELECT name, rate, body FROM testimonials WHERE barber_id = ?", (barber_id,))
-    barber_data["testimonials"] = [dict(row) for row in cur.fetchall()]
-
-    # Disponibilidade (somente horários disponíveis: is_booked = 0)
-    cur.execute("SELECT id, date FROM availability WHERE barber_id = ?", (barber_id,))
-    availability_rows = cur.fetchall()
-    available = []
-
-    for row in availability_rows:
-        availability_id = row["id"]
-        cur.execute("""
-            SELECT hour FROM availability_hours 
-            WHERE availability_id = ? AND is_booked = 0
-        """, (availability_id,))
-        
-        hours = [h["hour"] for h in cur.fetchall()]
-        
-        # Só adiciona a data se houver horários disponíveis
-        if hours:
-            available.append({
-                "date": row["date"],
-                "hours": hours
-            })
-
-    barber_data["available"] = available
-
+    # Disponibilidade: somente horários livres (is_booked = 0)
+    barber_data = barber._asdict()
+    barber_data.update(load_barber_profiles(conn, [barber], services=True, free_only=True)[barber.id])
     return barber_data
 
 
@@ -158,8 +176,7 @@ def create_appointments(client_id, barber_id, service_id, datetime_str, user_ema
     date_only = dq.strftime("%Y-%m-%d")
     time_only = dq.strftime("%H:%M")
 
-    conn = sqlite3.connect("database.db")
-    conn.row_factory = sqlite3.Row
+    conn = get_db()
     cur = conn.cursor()
     
     # 1) pega duração do serviço
@@ -183,7 +200,6 @@ def create_appointments(client_id, barber_id, service_id, datetime_str, user_ema
     row = cur.fetchone()
 
     if not row:
-        conn.close()
         return jsonify({"success": False, "error": "Barbeiro não tem disponibilidade neste dia"}), 400
 
     availability_id = row["id"]
@@ -202,18 +218,15 @@ def create_appointments(client_id, barber_id, service_id, datetime_str, user_ema
     index = next((i for i, h in enumerate(hours) if h["time"] == time_only), None)
     
     if index is None:
-        conn.close()
         return jsonify({"success": False, "error": "Horário não encontrado nas disponibilidades"}), 400
 
     # slots suficientes?
     if index + slots_needed > len(hours):
-        conn.close()
         return jsonify({"success": False, "error": "Não há slots suficientes neste horário"}), 400
 
     # verifica se já está reservado
     for i in range(index, index + slots_needed):
         if hours[i]["active"]:
-            conn.close()
             return jsonify({"success": False, "error": f"Horário {hours[i]['time']} já reservado"}), 409
 
     # 5) transação
@@ -245,13 +258,11 @@ def create_appointments(client_id, barber_id, service_id, datetime_str, user_ema
         conn.rollback()
         return jsonify({"success": False, "error": str(e)}), 500
 
-    finally:
-        conn.close()
 
 
 
 def get_appointments_by_user(email):
-    conn = sqlite3.connect("database.db")
+    conn = get_db(readonly=True)
     cursor = conn.cursor()
 
     cursor.execute('''
@@ -274,7 +285,6 @@ def get_appointments_by_user(email):
     ''', (email,))
     
     results = cursor.fetchall()
-    conn.close()
 
     appointments = []
     for row in results:
@@ -295,7 +305,7 @@ def get_appointments_by_user(email):
 
 
 def get_appointment_by_id(appointment_id):
-    conn = sqlite3.connect("database.db")
+    conn = get_db(readonly=True)
     cursor = conn.cursor()
     print(appointment_id)
     cursor.execute('''
@@ -305,7 +315,6 @@ def get_appointment_by_id(appointment_id):
     ''', (appointment_id,))
     
     result = cursor.fetchone()
-    conn.close()
 
     if result:
         return {
@@ -320,7 +329,7 @@ def get_appointment_by_id(appointment_id):
 
 def delete_appointment_by_id(appointment_id):
     try:
-        conn = sqlite3.connect("database.db")
+        conn = get_db()
         cursor = conn.cursor()
 
         # Buscar datetime original
@@ -328,7 +337,6 @@ def delete_appointment_by_id(appointment_id):
         result = cursor.fetchone()
 
         if not result:
-            conn.close()
             return False, "Agendamento não encontrado"
 
         barber_id, datetime_value = result
@@ -350,7 +358,6 @@ def delete_appointment_by_id(appointment_id):
         ''', (barber_id, date_part, time_part, time_part))
 
         conn.commit()
-        conn.close()
         return True, "Agendamento removido com sucesso"
 
     except Exception as e:
@@ -360,7 +367,7 @@ def delete_appointment_by_id(appointment_id):
 
 
 def toggle_favorite(user_email, barber_id):
-    conn = sqlite3.connect('database.db')
+    conn = get_db()
     cursor = conn.cursor()
 
     # Verifica se já existe
@@ -371,66 +378,62 @@ def toggle_favorite(user_email, barber_id):
         # Já está favoritado: remove
         cursor.execute('DELETE FROM favorites WHERE id=?', (result[0],))
         conn.commit()
-        conn.close()
         return False  # desfavoritado
     else:
         # Adiciona como favorito
         cursor.execute('INSERT INTO favorites (user_email, barber_id) VALUES (?, ?)', (user_email, barber_id))
         conn.commit()
-        conn.close()
         return True  # favoritado
     
 
 
 def get_favorites(user_email):
-    conn = sqlite3.connect('database.db')
+    conn = get_db(readonly=True)
     cursor = conn.cursor()
-    try:
-        cursor.execute('''
-            SELECT b.id, b.name, b.avatar, b.stars, b.lat, b.lng, b.loc
-            FROM favorites f
-            JOIN barbers b ON f.barber_id = b.id
-            WHERE f.user_email = ?
-        ''', (user_email,))
-        results = cursor.fetchall()
-        return [
-            {
-                "id": row[0],
-                "name": row[1],
-                "avatar": row[2],
-                "stars": row[3],
-                "lat": row[4],
-                "lng": row[5],
-                "loc": row[6]
-            }
-            for row in results
-        ]
-    finally:
-        conn.close()
+    cursor.execute('''
+        SELECT b.id, b.name, b.avatar, b.stars, b.lat, b.lng, b.loc
+        FROM favorites f
+        JOIN barbers b ON f.barber_id = b.id
+        WHERE f.user_email = ?
+    ''', (user_email,))
+    results = cursor.fetchall()
+    return [
+        {
+            "id": row[0],
+            "name": row[1],
+            "avatar": row[2],
+            "stars": row[3],
+            "lat": row[4],
+            "lng": row[5],
+            "loc": row[6]
+        }
+        for row in results
+    ]
 
 
 
 def is_favorited(user_email, barber_id):
-    conn = sqlite3.connect('database.db')
+    conn = get_db(readonly=True)
     cursor = conn.cursor()
     cursor.execute('SELECT id FROM favorites WHERE user_email=? AND barber_id=?', (user_email, barber_id))
     result = cursor.fetchone()
-    conn.close()
     return True if result else False
 
 
 def get_today_summary():
     from datetime import datetime
-    conn = sqlite3.connect('database.db')
+    conn = get_db(readonly=True)
     cursor = conn.cursor()
 
     today = datetime.now().strftime("%Y-%m-%d")
+    tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
 
+    # Intervalo em vez de DATE(a.datetime) para usar idx_appointments_datetime
     cursor.execute('''
         SELECT a.service_id, a.barber_id
         FROM appointments a
-        WHERE DATE(a.datetime) = ?
-    ''', (today,))
+        WHERE a.datetime >= ? AND a.datetime < ?
+    ''', (today, tomorrow))
     
     appointments = cursor.fetchall()
     total_clients = len(appointments)
@@ -445,7 +448,6 @@ def get_today_summary():
         if service:
             total_revenue += service[0]
 
-    conn.close()
     return [{
         "date": today,
         "total_clients": total_clients,
@@ -453,14 +455,11 @@ def get_today_summary():
     }]
 
 
-def fetch_all_clients():
-    conn = sqlite3.connect("database.db")
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+def fetch_all_clients(page):
+    conn = get_db(readonly=True)
 
-    # Busca todos os barbeiros
-    cursor.execute("SELECT * FROM clients")
-    client_rows = cursor.fetchall()
+    # Uma página de clientes por vez, na ordem do id
+    client_rows, next_cursor = fetch_page(conn, "SELECT * FROM clients", page)
 
     clients = []
 
@@ -470,36 +469,30 @@ def fetch_all_clients():
         
 
         # Monta o dicionário final
-        clients.append({
+        clients.append(page.pick({
             "id": str(client["id"]),
             "name": client["name"],
             "phone": client["phone"],
             "email": client["email"],
             "created_at": client["created_at"],
           
-        })
-
-    conn.close()
-    return jsonify({"error": "", "client": clients})
+        }))
 
+    return jsonify({"error": "", "client": clients, **page.info(next_cursor)})
 
-def fetch_search_clients(name):
-    conn = sqlite3.connect("database.db")
-    conn.row_factory = sqlite3.Row  
-    cursor = conn.cursor()
 
-    cursor.execute("SELECT * FROM clients WHERE name LIKE ?", (f"%{name}%",))
-    clients = cursor.fetchall()
-    conn.close()
+def fetch_search_clients(name, page=1, per_page=None):
+    conn = get_db(readonly=True)
+    clients, has_more = search(conn, "clients", name, page, per_page)
 
-    client_list = [dict(row) for row in clients]  
-    return jsonify({"error": "","data": client_list})
+    client_list = [dict(row) for row in clients]
+    return jsonify({"error": "", "data": client_list, **page_info(page, per_page, has_more)})
 
 
 
 def create_clients(nome, phone, email, created_at):
     try:
-        with sqlite3.connect("database.db", timeout=10) as conn:
+        with get_db() as conn:
             cursor = conn.cursor()
 
             cursor.execute('''
@@ -527,7 +520,7 @@ def create_clients(nome, phone, email, created_at):
 
 def update_client(id, nome, phone, email, created_at):
     try:
-        with sqlite3.connect("database.db", timeout=10) as conn:
+        with get_db() as conn:
             cursor = conn.cursor()
 
             cursor.execute('''
@@ -556,7 +549,7 @@ def update_client(id, nome, phone, email, created_at):
 
 
 def get_client_by_id(client_id):
-    conn = sqlite3.connect("database.db")
+    conn = get_db(readonly=True)
     cursor = conn.cursor()
 
     cursor.execute('''
@@ -566,7 +559,6 @@ def get_client_by_id(client_id):
     ''', (client_id,))
     
     result = cursor.fetchone()
-    conn.close()
 
     if result:
         return {
@@ -580,19 +572,17 @@ def get_client_by_id(client_id):
 
 def delete_client_from_db(client_id):
     try:
-        conn = sqlite3.connect("database.db")
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute('SELECT id FROM clients WHERE id = ?', (client_id,))
         result = cursor.fetchone()
 
         if not result:
-            conn.close()
             return False, "Cliente não encontrado"
 
         cursor.execute('DELETE FROM clients WHERE id = ?', (client_id,))
         conn.commit()
-        conn.close()
 
         return True, "Cliente removido com sucesso"
 
@@ -600,30 +590,26 @@ def delete_client_from_db(client_id):
         return False, str(e)
     
 
-def fetch_all_services():
-    conn = sqlite3.connect("database.db")
-    conn.row_factory = sqlite3.Row  # <- isso é essencial
-    cursor = conn.cursor()
+def fetch_all_services(page):
+    conn = get_db(readonly=True)
 
-    cursor.execute("SELECT * FROM services")
-    services_rows = cursor.fetchall()
+    services_rows, next_cursor = fetch_page(conn, "SELECT * FROM services", page)
 
     services = []
 
     for service in services_rows:
-        services.append({
+        services.append(page.pick({
             "id": service["id"],
             "name": service["name"],
-        })
+        }))
 
-    conn.close()
-    return jsonify({"error": "", "service": services})
+    return jsonify({"error": "", "service": services, **page.info(next_cursor)})
 
 
 
 def insert_service(name):
     try:
-        with sqlite3.connect("database.db", timeout=10) as conn:
+        with get_db() as conn:
             cursor = conn.cursor()
 
             cursor.execute('''
@@ -650,22 +636,17 @@ def insert_service(name):
 
 
 
-def fetch_search_service(name):
-    conn = sqlite3.connect("database.db")
-    conn.row_factory = sqlite3.Row  
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT * FROM services WHERE name LIKE ?", (f"%{name}%",))
-    services = cursor.fetchall()
-    conn.close()
+def fetch_search_service(name, page=1, per_page=None):
+    conn = get_db(readonly=True)
+    services, has_more = search(conn, "services", name, page, per_page)
 
-    service_list = [dict(row) for row in services]  
-    return jsonify({"error": "","data": service_list})
+    service_list = [dict(row) for row in services]
+    return jsonify({"error": "", "data": service_list, **page_info(page, per_page, has_more)})
 
 
 def update_service(id, name):
     try:
-        with sqlite3.connect("database.db", timeout=10) as conn:
+        with get_db() as conn:
             cursor = conn.cursor()
 
             cursor.execute('''
@@ -690,19 +671,17 @@ def update_service(id, name):
 
 def delete_service(service_id):
     try:
-        conn = sqlite3.connect("database.db")
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute('SELECT id FROM services WHERE id = ?', (service_id,))
         result = cursor.fetchone()
 
         if not result:
-            conn.close()
             return False, "Service não encontrado"
 
         cursor.execute('DELETE FROM services WHERE id = ?', (service_id,))
         conn.commit()
-        conn.close()
 
         return True, "Service removido com sucesso"
 
@@ -711,7 +690,7 @@ def delete_service(service_id):
     
 
 def get_service_by_id(service_id):
-    conn = sqlite3.connect("database.db")
+    conn = get_db(readonly=True)
     cursor = conn.cursor()
 
     cursor.execute('''
@@ -721,7 +700,6 @@ def get_service_by_id(service_id):
     ''', (service_id,))
     
     result = cursor.fetchone()
-    conn.close()
 
     if result:
         return {
@@ -736,7 +714,7 @@ def get_service_by_id(service_id):
 
 def create_barber_service(barber_id, service_id, price, duration):
     try:
-        with sqlite3.connect("database.db", timeout=10) as conn:
+        with get_db() as conn:
             cursor = conn.cursor()
 
             cursor.execute('''
@@ -763,7 +741,7 @@ def create_barber_service(barber_id, service_id, price, duration):
 
 def update_barber_service(barber_id, service_id, price, duration):
     try:
-        with sqlite3.connect("database.db") as conn:
+        with get_db() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE barber_services
@@ -780,9 +758,7 @@ def update_barber_service(barber_id, service_id, price, duration):
 
 
 def search_service_with_barber(service_name):
-    import sqlite3
-    conn = sqlite3.connect("database.db")
-    conn.row_factory = sqlite3.Row
+    conn = get_db(readonly=True)
     cursor = conn.cursor()
 
     cursor.execute('''
@@ -798,7 +774,6 @@ def search_service_with_barber(service_name):
     ''', (f'%{service_name}%',))
 
     results = cursor.fetchall()
-    conn.close()
 
     services = [dict(row) for row in results]
 
@@ -808,33 +783,28 @@ def search_service_with_barber(service_name):
     }
 
 
-def fetch_all_products():
-    conn = sqlite3.connect("database.db")
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+def fetch_all_products(page):
+    conn = get_db(readonly=True)
 
-    cursor.execute("SELECT * FROM products")
-    products_rows = cursor.fetchall()
+    products_rows, next_cursor = fetch_page(conn, "SELECT * FROM products", page)
 
     products = [
-        {
+        page.pick({
             "id": product["id"],
             "name": product["name"],
             "cost": product["cost"],
             "unit": product["unit"],
             "description": product["description"],
-        }
+        })
         for product in products_rows
     ]
 
-    conn.close()
-    return jsonify({"error": "", "data": products})  # <- aqui define "data"
+    return jsonify({"error": "", "data": products, **page.info(next_cursor)})  # <- aqui define "data"
 
 
 def fetch_full_services():
     try:
-        conn = sqlite3.connect("database.db")
-        conn.row_factory = sqlite3.Row
+        conn = get_db(readonly=True)
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -853,7 +823,6 @@ def fetch_full_services():
         """)
 
         rows = cursor.fetchall()
-        conn.close()
 
         result = []
         for r in rows:
@@ -876,7 +845,7 @@ def fetch_full_services():
 
 def insert_products(name, price, cost, unit, description):
     try:
-        with sqlite3.connect("database.db", timeout=10) as conn:
+        with get_db() as conn:
             cursor = conn.cursor()
 
             cursor.execute('''
@@ -906,21 +875,16 @@ def insert_products(name, price, cost, unit, description):
         return jsonify({"success": False, "error": str(e)}), 500
     
 
-def fetch_search_products(name):
-    conn = sqlite3.connect("database.db")
-    conn.row_factory = sqlite3.Row  
-    cursor = conn.cursor()
+def fetch_search_products(name, page=1, per_page=None):
+    conn = get_db(readonly=True)
+    pruducts, has_more = search(conn, "products", name, page, per_page)
 
-    cursor.execute("SELECT * FROM products WHERE name LIKE ?", (f"%{name}%",))
-    pruducts = cursor.fetchall()
-    conn.close()
-
-    pruducts_list = [dict(row) for row in pruducts]  
-    return jsonify({"error": "","data": pruducts_list})
+    pruducts_list = [dict(row) for row in pruducts]
+    return jsonify({"error": "", "data": pruducts_list, **page_info(page, per_page, has_more)})
 
 
 def get_products_by_id(products_id):
-    conn = sqlite3.connect("database.db")
+    conn = get_db(readonly=True)
     cursor = conn.cursor()
 
     cursor.execute('''
@@ -930,7 +894,6 @@ def get_products_by_id(products_id):
     ''', (products_id,))
     
     result = cursor.fetchone()
-    conn.close()
 
     if result:
         return {
@@ -946,19 +909,17 @@ def get_products_by_id(products_id):
 
 def delete_products(products_id):
     try:
-        conn = sqlite3.connect("database.db")
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute('SELECT id FROM products WHERE id = ?', (products_id,))
         result = cursor.fetchone()
 
         if not result:
-            conn.close()
             return False, "Produto não encontrado"
 
         cursor.execute('DELETE FROM products WHERE id = ?', (products_id,))
         conn.commit()
-        conn.close()
 
         return True, "Produto removido com sucesso"
 
@@ -968,7 +929,7 @@ def delete_products(products_id):
 
 def update_products(id, name, price, cost, unit, description):
     try:
-        with sqlite3.connect("database.db", timeout=10) as conn:
+        with get_db() as conn:
             cursor = conn.cursor()
 
             cursor.execute('''
@@ -997,19 +958,17 @@ def update_products(id, name, price, cost, unit, description):
 
 def delete_stock(stock_id):
     try:
-        conn = sqlite3.connect("database.db")
+        conn = get_db()
         cursor = conn.cursor()
 
         cursor.execute('SELECT id FROM stock_control WHERE id = ?', (stock_id,))
         result = cursor.fetchone()
 
         if not result:
-            conn.close()
             return False, "Produto não encontrado"
 
         cursor.execute('DELETE FROM stock_control WHERE id = ?', (stock_id,))
         conn.commit()
-        conn.close()
 
         return True, "Produto removido com sucesso"
 
@@ -1017,47 +976,55 @@ def delete_stock(stock_id):
         return False, str(e)  
     
 
-def fetch_all_stock():
-    conn = sqlite3.connect("database.db")
-    conn.row_factory = sqlite3.Row  # <- isso é essencial
-    cursor = conn.cursor()
+def fetch_all_stock(page):
+    conn = get_db(readonly=True)
 
-    cursor.execute("SELECT * FROM stock_control")
-    stock_control_rows = cursor.fetchall()
+    # Da movimentação mais recente para a mais antiga (idx_stock_control_datetime);
+    # datetime pode ser NULL, e NULL não entra na comparação do cursor
+    stock_control_rows, next_cursor = fetch_page(
+        conn, "SELECT *, COALESCE(datetime, '') AS sort_datetime FROM stock_control", page,
+        key=("sort_datetime", "id"), descending=True
+    )
 
     stock_control = []
 
     for stock in stock_control_rows:
-        stock_control.append({
+        stock_control.append(page.pick({
             "id": stock["id"],
             "product_id": stock["product_id"],
             "type": stock["type"],
             "quantity": stock["quantity"],
             "description": stock["description"],
             "datetime": stock["datetime"],
-        })
+        }))
 
-    conn.close()
-    return jsonify({"error": "", "stock": stock_control})
+    return jsonify({"error": "", "stock": stock_control, **page.info(next_cursor)})
 
 
 
-def fetch_all_stock_movements(name):
-    conn = sqlite3.connect("database.db")
+def fetch_all_stock_movements(name, page=1, per_page=None):
+    conn = get_db(readonly=True)
     cursor = conn.cursor()
+    per_page = per_page or config.SEARCH_PAGE_SIZE
 
-    query = '''
+    # Os produtos saem do products_fts (só pelo nome, como antes); as movimentações
+    # seguem da mais recente à mais antiga
+    match = match_query(name)
+    where = "WHERE sc.product_id IN (SELECT rowid FROM products_fts WHERE products_fts MATCH ?)" if match else ""
+    query = f'''
         SELECT sc.id, p.name AS product_name, sc.type, sc.quantity, sc.description, sc.datetime
         FROM stock_control sc
         JOIN products p ON sc.product_id = p.id
-        WHERE p.name LIKE ?
-        ORDER BY sc.datetime DESC
+        {where}
+        ORDER BY COALESCE(sc.datetime, '') DESC, sc.id DESC
+        LIMIT ? OFFSET ?
     '''
 
-    name_param = f"%{name}%"
-    cursor.execute(query, (name_param,))
+    params = (match,) if match else ()
+    cursor.execute(query, params + (per_page + 1, (page - 1) * per_page))
     results = cursor.fetchall()
-    conn.close()
+    has_more = len(results) > per_page
+    results = results[:per_page]
 
     stock_list = [
         {
@@ -1071,13 +1038,13 @@ def fetch_all_stock_movements(name):
         for row in results
     ]
 
-    return jsonify({"success": True, "data": stock_list})
+    return jsonify({"success": True, "data": stock_list, **page_info(page, per_page, has_more)})
 
 
 
 
 def get_stock_by_id(id):
-    conn = sqlite3.connect("database.db")
+    conn = get_db(readonly=True)
     cursor = conn.cursor()
 
     cursor.execute('''
@@ -1087,7 +1054,6 @@ def get_stock_by_id(id):
     ''', (id,))
     
     result = cursor.fetchone()
-    conn.close()
 
     if result:
         return {
@@ -1102,18 +1068,17 @@ def get_stock_by_id(id):
     return None
 
 
-def insert_stock(product_id, quantity, movement_type, movement_description, movement_date,):
-    try:
-        with sqlite3.connect("database.db", timeout=10) as conn:
-            cursor = conn.cursor()
+def _insert_stock_row(conn, product_id, quantity, movement_type, movement_description, movement_date):
+    cursor = conn.execute('''
+        INSERT INTO stock_control (product_id, type, quantity, description, datetime)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (product_id, movement_type, quantity, movement_description, movement_date))
+    return cursor.lastrowid
 
-            cursor.execute('''
-            INSERT INTO stock_control (product_id, type, quantity, description, datetime)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (product_id, movement_type, quantity, movement_description, movement_date))
-  
 
-            id = cursor.lastrowid
+def insert_stock(product_id, quantity, movement_type, movement_description, movement_date,):
+    try:
+        id = write(_insert_stock_row, product_id, quantity, movement_type, movement_description, movement_date)
 
         return {
             "success": True,
@@ -1138,7 +1103,7 @@ def insert_stock(product_id, quantity, movement_type, movement_description, move
 
 def update_stock(id, product_id, type, quantity, description, datetime,):
     try:
-        with sqlite3.connect("database.db", timeout=10) as conn:
+        with get_db() as conn:
             cursor = conn.cursor()
 
             cursor.execute('''
@@ -1168,7 +1133,7 @@ def update_stock(id, product_id, type, quantity, description, datetime,):
 
 def delete_package(package_id: int):
     try:
-        conn = sqlite3.connect("database.db")
+        conn = get_db()
         cursor = conn.cursor()
 
         # Verifica se o pacote existe
@@ -1176,7 +1141,6 @@ def delete_package(package_id: int):
         result = cursor.fetchone()
 
         if not result:
-            conn.close()
             return False, "Pacote não encontrado"
 
         # Remove serviços relacionados primeiro
@@ -1186,7 +1150,6 @@ def delete_package(package_id: int):
         cursor.execute('DELETE FROM packages WHERE id = ?', (package_id,))
 
         conn.commit()
-        conn.close()
 
         return True, "Pacote removido com sucesso"
 
@@ -1195,7 +1158,7 @@ def delete_package(package_id: int):
 
 
 def get_package_by_id(package_id: int):
-    conn = sqlite3.connect("database.db")
+    conn = get_db(readonly=True)
     cursor = conn.cursor()
 
     # Busca os dados do pacote
@@ -1208,7 +1171,6 @@ def get_package_by_id(package_id: int):
     package = cursor.fetchone()
 
     if not package:
-        conn.close()
         return None
 
     # Busca os serviços relacionados ao pacote
@@ -1220,7 +1182,6 @@ def get_package_by_id(package_id: int):
     ''', (package_id,))
     
     services = cursor.fetchall()
-    conn.close()
 
     return {
         "id": package[0],
@@ -1239,50 +1200,48 @@ def get_package_by_id(package_id: int):
     }
 
 
-def fetch_all_package():
-    conn = sqlite3.connect("database.db")
-    conn.row_factory = sqlite3.Row
+def fetch_all_package(page):
+    conn = get_db(readonly=True)
     cursor = conn.cursor()
 
-    # Buscar todos os pacotes
-    cursor.execute("SELECT * FROM packages")
-    package_rows = cursor.fetchall()
+    # Buscar uma página de pacotes
+    package_rows, next_cursor = fetch_page(conn, "SELECT * FROM packages", page)
 
     packages = []
     for pkg in package_rows:
-        # Buscar serviços relacionados a cada pacote
-        cursor.execute('''
-            SELECT s.id, s.name, s.price, s.duration
-            FROM package_services ps
-            JOIN services s ON ps.service_id = s.id
-            WHERE ps.package_id = ?
-        ''', (pkg["id"],))
-        
-        services = cursor.fetchall()
-
-        packages.append({
+        item = {
             "id": pkg["id"],
             "name": pkg["name"],
             "price": pkg["price"],
             "duration": pkg["duration"],
             "expiration_date": pkg["expiration_date"],
-            "services": [
+        }
+
+        # Buscar serviços relacionados a cada pacote (só se vão na resposta)
+        if page.wants("services"):
+            cursor.execute('''
+                SELECT s.id, s.name, s.price, s.duration
+                FROM package_services ps
+                JOIN services s ON ps.service_id = s.id
+                WHERE ps.package_id = ?
+            ''', (pkg["id"],))
+
+            item["services"] = [
                 {
                     "id": s["id"],
                     "name": s["name"],
                     "price": s["price"],
                     "duration": s["duration"]
-                } for s in services
+                } for s in cursor.fetchall()
             ]
-        })
 
-    conn.close()
-    return jsonify({"error": "", "packages": packages})
+        packages.append(page.pick(item))
+
+    return jsonify({"error": "", "packages": packages, **page.info(next_cursor)})
 
 
 def fetch_all_package_movements(name):
-    conn = sqlite3.connect("database.db")
-    conn.row_factory = sqlite3.Row
+    conn = get_db(readonly=True)
     cursor = conn.cursor()
 
     query = '''
@@ -1323,14 +1282,13 @@ def fetch_all_package_movements(name):
             ]
         })
 
-    conn.close()
     return jsonify({"success": True, "data": packages})
 
 
 
 
 def add_availability_for_date(barber_id, date, slots):
-    conn = sqlite3.connect("database.db", timeout=10, check_same_thread=False)
+    conn = get_db()
     cur = conn.cursor()
 
     try:
@@ -1372,8 +1330,6 @@ def add_availability_for_date(barber_id, date, slots):
     except Exception as e:
         return {"error": str(e)}, 500
 
-    finally:
-        conn.close()
 
 
 def get_availability_for_date(barber_id: int, date_str: str):
@@ -1393,8 +1349,7 @@ def get_availability_for_date(barber_id: int, date_str: str):
     if not date_str:
         return {"success": False, "error": "date required"}, 400
 
-    conn = sqlite3.connect("database.db", timeout=10, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
+    conn = get_db(readonly=True)
     cur = conn.cursor()
 
     try:
@@ -1435,14 +1390,11 @@ def get_availability_for_date(barber_id: int, date_str: str):
     except Exception as e:
         return {"success": False, "error": str(e)}, 500
 
-    finally:
-        conn.close()
 
 
 
 def generate_week_availability(barber_id):
-    conn = sqlite3.connect("database.db")
-    conn.row_factory = sqlite3.Row
+    conn = get_db()
     cur = conn.cursor()
 
     today = dt.now().date()
@@ -1456,7 +1408,6 @@ def generate_week_availability(barber_id):
     schedule = [dict(s) for s in cur.fetchall()]
 
     if not schedule:
-        conn.close()
         return False, "Barbeiro não tem horários configurados"
 
     # Gera 7 dias
@@ -1492,16 +1443,14 @@ def generate_week_availability(barber_id):
             h += timedelta(minutes=slot)
 
     conn.commit()
-    conn.close()
     return True, "Disponibilidades da semana geradas"
 
 
-def fetch_all_orders():
+def fetch_all_orders(page):
     try:
-        conn = sqlite3.connect("database.db")
-        cursor = conn.cursor()
+        conn = get_db(readonly=True)
 
-        cursor.execute("""
+        rows, next_cursor = fetch_page(conn, """
             SELECT 
     orders.id,
     clients.name,
@@ -1510,30 +1459,27 @@ def fetch_all_orders():
     orders.order_number
 FROM orders 
 JOIN clients ON clients.id = orders.client_id
-WHERE orders.status = 'aberta'
-ORDER BY orders.id;
-
-        """)
-
-        rows = cursor.fetchall()
-        conn.close()
+        """, page, key=("orders.id",), where="orders.status = 'aberta'")
 
         data = [
-            {
+            page.pick({
                 "id": r[0],
                 "cliente": r[1],
                 "status": r[2],
                 "aberta_em": r[3],
                 "order_number": r[4]
-            }
+            })
             for r in rows
         ]
 
         return jsonify({
             "error": "",
-            "data": data
+            "data": data,
+            **page.info(next_cursor)
         }), 200
 
+    except PageError:
+        raise
     except Exception as e:
         return jsonify({
             "error": "Erro ao buscar comandas",
@@ -1544,7 +1490,7 @@ ORDER BY orders.id;
 
 def delete_order_by_id(id):
     try:
-        conn = sqlite3.connect("database.db")
+        conn = get_db()
         cursor = conn.cursor()
 
         # Buscar datetime original
@@ -1552,7 +1498,6 @@ def delete_order_by_id(id):
         result = cursor.fetchone()
 
         if not result:
-            conn.close()
             return False, "Comanda não encontrado"
 
         
@@ -1561,7 +1506,6 @@ def delete_order_by_id(id):
 
 
         conn.commit()
-        conn.close()
         return True, "Comanda cancelada com sucesso"
 
     except Exception as e:
@@ -1570,7 +1514,7 @@ def delete_order_by_id(id):
 
 
 def get_order_by_id(id):
-    conn = sqlite3.connect("database.db")
+    conn = get_db(readonly=True)
     cursor = conn.cursor()
     
     cursor.execute('''
@@ -1579,7 +1523,6 @@ def get_order_by_id(id):
     ''', (id,))
     
     result = cursor.fetchone()
-    conn.close()
 
     if result:
         return {
@@ -1594,7 +1537,7 @@ def get_order_by_id(id):
 
 
 def item_order_by_id(id):
-    conn = sqlite3.connect("database.db")
+    conn = get_db(readonly=True)
     cursor = conn.cursor()
     
     cursor.execute('''
@@ -1604,7 +1547,6 @@ def item_order_by_id(id):
     ''', (id,))
     
     result = cursor.fetchone()
-    conn.close()
 
     if result:
         return {
@@ -1616,7 +1558,7 @@ def item_order_by_id(id):
 
 
 def insert_item_ordrs(order_id, item_id, name, qtd, price, total):
-    conn = sqlite3.connect("database.db")
+    conn = get_db()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -1625,7 +1567,6 @@ def insert_item_ordrs(order_id, item_id, name, qtd, price, total):
     """, (order_id, item_id, item["name"], qtd, price, total))
     
     result = cursor.fetchone()
-    conn.close()
 
     if result:
         return {
@@ -1638,7 +1579,7 @@ def insert_item_ordrs(order_id, item_id, name, qtd, price, total):
 
 def delete_order_item_by_id(id):
     try:
-        conn = sqlite3.connect("database.db")
+        conn = get_db()
         cursor = conn.cursor()
 
         # Buscar datetime original
@@ -1646,7 +1587,6 @@ def delete_order_item_by_id(id):
         result = cursor.fetchone()
 
         if not result:
-            conn.close()
             return False, "Item não encontrado"
 
         
@@ -1655,7 +1595,6 @@ def delete_order_item_by_id(id):
 
 
         conn.commit()
-        conn.close()
         return True, "Item removido com sucesso"
 
     except Exception as e:
@@ -1,20 +1,349 @@
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from flask import g
 
-DB_PATH = "database.db"
+import config
+from querylog import InstrumentedConnection
 
-def get_db():
-    if "db" not in g:
+DB_PATH = config.DB_PATH
+
+POOL_SIZE = config.DB_READERS
+POOL_TIMEOUT = config.DB_BUSY_TIMEOUT
+# Conexões ociosas há mais tempo que isso passam por um "SELECT 1" antes de voltar ao uso
+HEALTH_CHECK_INTERVAL = config.DB_HEALTH_CHECK_INTERVAL
+
+# PRAGMAs não aceitam parâmetros, então só valores conhecidos passam
+JOURNAL_MODES = {"WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF"}
+SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+TEMP_STORES = {"DEFAULT", "FILE", "MEMORY"}
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+def _choice(name, value, allowed):
+    if value not in allowed:
+        raise ValueError(f"{name} inválido: {value!r} (use {', '.join(sorted(allowed))})")
+    return value
+
+
+def apply_pragmas(conn, readonly=False):
+    conn.execute(f"PRAGMA synchronous = {_choice('DB_SYNCHRONOUS', config.DB_SYNCHRONOUS, SYNCHRONOUS_MODES)}")
+    conn.execute(f"PRAGMA cache_size = {int(config.DB_CACHE_SIZE)}")
+    conn.execute(f"PRAGMA mmap_size = {int(config.DB_MMAP_SIZE)}")
+    conn.execute(f"PRAGMA temp_store = {_choice('DB_TEMP_STORE', config.DB_TEMP_STORE, TEMP_STORES)}")
+    conn.execute(f"PRAGMA busy_timeout = {int(config.DB_BUSY_TIMEOUT * 1000)}")
+    if readonly:
+        conn.execute("PRAGMA query_only = ON")
+
+
+def set_journal_mode(conn):
+    # journal_mode é persistente no arquivo; quando já está no modo pedido é um no-op
+    mode = _choice("DB_JOURNAL_MODE", config.DB_JOURNAL_MODE, JOURNAL_MODES)
+    return conn.execute(f"PRAGMA journal_mode = {mode}").fetchone()[0]
+
+
+class ConnectionPool:
+    def __init__(self, path, max_size=POOL_SIZE, timeout=POOL_TIMEOUT,
+                 health_check_interval=HEALTH_CHECK_INTERVAL, readonly=False):
+        self.path = path
+        self.max_size = max_size
+        self.readonly = readonly
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._idle = []  # [(conn, last_used)]
+        self._local = threading.local()
+        self._stats = {
+            "created": 0,
+            "reused": 0,
+            "discarded": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time": 0.0,
+            "timeouts": 0,
+            "health_check_failures": 0,
+        }
+        self._in_use = 0
+
+    def _connect(self):
+        factory = InstrumentedConnection if config.QUERY_STATS else sqlite3.Connection
         conn = sqlite3.connect(
-            DB_PATH,
-            timeout=10,
+            self.path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            factory=factory,
+            cached_statements=config.DB_STATEMENT_CACHE,
         )
         conn.row_factory = sqlite3.Row
-        g.db = conn
+        set_journal_mode(conn)
+        apply_pragmas(conn, readonly=self.readonly)
+        return conn
+
+    def _is_healthy(self, conn):
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._stats["discarded"] += 1
+
+    def _checkout(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn, last_used = self._idle.pop()
+
+            if time.monotonic() - last_used < self.health_check_interval or self._is_healthy(conn):
+                with self._lock:
+                    self._stats["reused"] += 1
+                return conn
+
+            with self._lock:
+                self._stats["health_check_failures"] += 1
+            self._discard(conn)
+
+        conn = self._connect()
+        with self._lock:
+            self._stats["created"] += 1
+        return conn
+
+    def acquire(self):
+        # Checkout por thread: a mesma thread recebe sempre a mesma conexão até devolvê-la
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            self._local.depth += 1
+            return held
+
+        start = time.monotonic()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["waits"] += 1
+            if not self._slots.acquire(timeout=self.timeout):
+                with self._lock:
+                    self._stats["timeouts"] += 1
+                raise PoolTimeout(f"Nenhuma conexão livre em {self.timeout}s ({self.path})")
+
+        try:
+            conn = self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["wait_time"] += time.monotonic() - start
+            self._in_use += 1
+
+        self._local.conn = conn
+        self._local.depth = 1
+        return conn
+
+    def release(self, conn):
+        if getattr(self._local, "conn", None) is conn:
+            self._local.depth -= 1
+            if self._local.depth > 0:
+                return
+            self._local.conn = None
+
+        # Nunca devolve uma transação aberta para o pool
+        healthy = True
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            healthy = False
+
+        with self._lock:
+            self._in_use -= 1
+            if healthy:
+                self._idle.append((conn, time.monotonic()))
+        if not healthy:
+            self._discard(conn)
+        self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_use"] = self._in_use
+            stats["idle"] = len(self._idle)
+        stats["max_size"] = self.max_size
+        stats["readonly"] = self.readonly
+        stats["open"] = stats["created"] - stats["discarded"]
+        return stats
+
+
+# Várias conexões de leitura e um único writer serializado: com WAL as leituras
+# de disponibilidade não esperam por um agendamento sendo gravado.
+readers = ConnectionPool(DB_PATH, max_size=POOL_SIZE, readonly=True)
+writer = ConnectionPool(DB_PATH, max_size=1)
+
+# Um par (readers, writer) por arquivo: cada barbearia tem o próprio lock de escrita.
+# Os pools menos usados são fechados quando passam de TENANT_POOL_LIMIT.
+_pools = OrderedDict({DB_PATH: (readers, writer)})
+_pools_lock = threading.Lock()
+# path -> quantos usuários (requisições, connection()) seguram o par agora
+_refs = {}
+
+
+def pools_for(path=None):
+    """
+    Par (readers, writer) do arquivo, já reservado: enquanto não houver o
+    release_pools correspondente ele não é fechado pela remoção dos ociosos.
+    """
+    path = path or DB_PATH
+    with _pools_lock:
+        pools = _pools.get(path)
+        if pools is not None:
+            _pools.move_to_end(path)
+            _refs[path] = _refs.get(path, 0) + 1
+            return pools
+
+        pools = (ConnectionPool(path, max_size=POOL_SIZE, readonly=True), ConnectionPool(path, max_size=1))
+        _pools[path] = pools
+        _refs[path] = 1
+        evicted = _evict_idle_pools()
+
+    for pool in evicted:
+        pool.close_all()
+    return pools
+
+
+def release_pools(path, pools):
+    path = path or DB_PATH
+    with _pools_lock:
+        # Depois de um reset_pools o par não é mais o registrado: nada a devolver
+        if _pools.get(path) is pools and _refs.get(path):
+            _refs[path] -= 1
+
+
+_abandoned = []
+
+
+def reset_pools(close=True):
+    """
+    Recomeça os pools do processo (gunicorn: no master antes do fork e em cada
+    worker depois dele). Conexões SQLite não podem cruzar um fork: no filho use
+    close=False, para não fechar (e fazer checkpoint) conexões que são do pai.
+    """
+    global readers, writer, _pools, _pools_lock, _refs
+    # Lock novo: o antigo pode ter sido copiado travado por outra thread no fork
+    _pools_lock = threading.Lock()
+    _refs = {}
+    old = _pools
+    readers = ConnectionPool(DB_PATH, max_size=POOL_SIZE, readonly=True)
+    writer = ConnectionPool(DB_PATH, max_size=1)
+    _pools = OrderedDict({DB_PATH: (readers, writer)})
+    if not close:
+        # Guarda a referência: o coletor de lixo também fecharia as conexões herdadas
+        _abandoned.append(old)
+        return
+    for pool_readers, pool_writer in old.values():
+        pool_readers.close_all()
+        pool_writer.close_all()
+
+
+def _evict_idle_pools():
+    evicted = []
+    for path in list(_pools):
+        if len(_pools) <= config.TENANT_POOL_LIMIT:
+            break
+        if path == DB_PATH:
+            continue
+        # Reservado por alguém que ainda pode pegar uma conexão (in_use ainda é 0)
+        if _refs.get(path):
+            continue
+        pool_readers, pool_writer = _pools[path]
+        if pool_readers.stats()["in_use"] or pool_writer.stats()["in_use"]:
+            continue
+        del _pools[path]
+        _refs.pop(path, None)
+        evicted.extend((pool_readers, pool_writer))
+    return evicted
+
+
+def get_db(readonly=False):
+    # g.db_path é definido por tenants.bind_tenant; sem ele usa o banco padrão
+    if "db_pools" not in g:
+        g.db_pools_path = g.get("db_path")
+        g.db_pools = pools_for(g.db_pools_path)
+    pool_readers, pool_writer = g.db_pools
+
+    if readonly:
+        # Se a requisição já tem o writer, lê por ele para enxergar as próprias escritas
+        if "db" in g:
+            return g.db
+        if "db_ro" not in g:
+            g.db_ro = pool_readers.acquire()
+        return g.db_ro
+
+    if "db" not in g:
+        g.db = pool_writer.acquire()
     return g.db
 
 
 def close_connection(exception=None):
+    pools = g.pop("db_pools", None)
+    if pools is None:
+        return
+    pool_readers, pool_writer = pools
+
     db = g.pop("db", None)
     if db is not None:
-        db.close()
+        pool_writer.release(db)
+
+    db_ro = g.pop("db_ro", None)
+    if db_ro is not None:
+        pool_readers.release(db_ro)
+
+    release_pools(g.pop("db_pools_path", None), pools)
+
+
+@contextmanager
+def connection(readonly=False, path=None):
+    # Para uso fora de uma requisição (scripts, threads de background)
+    pools = pools_for(path)
+    try:
+        with pools[0 if readonly else 1].connection() as conn:
+            yield conn
+    finally:
+        release_pools(path, pools)
+
+
+def pool_stats():
+    stats = {"readers": readers.stats(), "writer": writer.stats()}
+    with _pools_lock:
+        others = [(path, pools) for path, pools in _pools.items() if path != DB_PATH]
+    if others:
+        stats["tenants"] = {
+            path: {"readers": r.stats(), "writer": w.stats()} for path, (r, w) in others
+        }
+    return stats
@@ -0,0 +1,336 @@
+"""
+Gera uma base sintética e reprodutível para testes de carga e regressão.
+
+    python datagen.py [small|medium|prod] [--seed N] [--db caminho.db] [--force]
+
+O arquivo é criado do zero (mesmo schema do init_db.py + migrações) e
+carregado com executemany em uma transação por tabela. A mesma semente com o
+mesmo --today gera o mesmo arquivo, byte a byte (inclusive os hashes de senha).
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+
+from passlib.hash import bcrypt
+from passlib.utils.binary import BCRYPT_CHARS
+
+import config
+from init_db import create_schema
+from migrate import upgrade
+
+PRESETS = {
+    "small": {
+        "barbers": 50, "users": 500, "clients": 2_000, "appointments": 10_000,
+        "years": 1, "products": 30, "orders": 5_000, "availability_days": 7,
+    },
+    "medium": {
+        "barbers": 500, "users": 5_000, "clients": 20_000, "appointments": 100_000,
+        "years": 2, "products": 100, "orders": 50_000, "availability_days": 14,
+    },
+    "prod": {
+        "barbers": 5_000, "users": 50_000, "clients": 200_000, "appointments": 500_000,
+        "years": 3, "products": 300, "orders": 300_000, "availability_days": 14,
+    },
+}
+
+# (cidade, lat, lng): os barbeiros ficam espalhados em volta delas
+CITIES = [
+    ("São Paulo", -23.5505, -46.6333),
+    ("Rio de Janeiro", -22.9068, -43.1729),
+    ("Belo Horizonte", -19.9167, -43.9345),
+    ("Curitiba", -25.4284, -49.2733),
+    ("Porto Alegre", -30.0346, -51.2177),
+    ("Salvador", -12.9777, -38.5016),
+    ("Recife", -8.0476, -34.8770),
+    ("Fortaleza", -3.7319, -38.5267),
+    ("Brasília", -15.7939, -47.8828),
+    ("Campinas", -22.9099, -47.0626),
+]
+
+FIRST_NAMES = [
+    "João", "Maria", "José", "Ana", "Pedro", "Lucas", "Gabriel", "Rafael", "Juliana", "Fernanda",
+    "Mateus", "Bruno", "Camila", "Larissa", "Thiago", "Felipe", "Rodrigo", "Tatiane", "Carlos", "Paulo",
+]
+LAST_NAMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Costa", "Ferreira", "Almeida", "Ribeiro",
+    "Carvalho", "Gomes", "Martins", "Rocha", "Araújo", "Azevedo", "Barbosa", "Cardoso", "Teixeira", "Moura",
+]
+
+SERVICES = [
+    ("Corte", 30, 60, 30), ("Barba", 20, 40, 20), ("Corte + Barba", 50, 90, 45), ("Corte Social", 30, 50, 30),
+    ("Degradê", 35, 60, 40), ("Sobrancelha", 10, 25, 15), ("Pigmentação", 40, 80, 40),
+    ("Hidratação", 30, 60, 30), ("Luzes", 80, 150, 90), ("Corte Infantil", 25, 45, 30),
+    ("Platinado", 120, 250, 120), ("Relaxamento", 50, 100, 60),
+]
+
+PRODUCTS = ["Pomada", "Shampoo", "Condicionador", "Óleo para Barba", "Creme de Barbear", "Gel", "Cera", "Tônico"]
+EXPENSES = [("Aluguel", 1500, 4000), ("Água", 50, 200), ("Luz", 150, 600), ("Internet", 100, 200),
+            ("Produtos", 200, 1500), ("Limpeza", 50, 300)]
+PAYMENT_METHODS = ["dinheiro", "cartao", "pix"]
+HOURS = [f"{h:02d}:{m:02d}" for h in range(9, 19) for m in (0, 30)]
+
+# Todos os usuários sintéticos entram com esta senha
+PASSWORD = "123456"
+
+
+def _name(rnd, i):
+    return f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)} {i}"
+
+
+def _pick(rnd, seq):
+    # rnd.choice/randint custam ~3x mais e dominam o tempo nas tabelas grandes
+    return seq[int(rnd.random() * len(seq))]
+
+
+def _days(start, count):
+    return [(start + timedelta(days=d)).strftime("%Y-%m-%d") for d in range(count)]
+
+
+def _password_hash(seed):
+    # Sal tirado da semente (num Random à parte, para não mudar as outras linhas):
+    # a mesma semente gera o mesmo hash e a base sai igual byte a byte.
+    # O último caractere do sal bcrypt só tem 2 bits úteis, daí o ".Oeu"
+    rnd = random.Random(f"senha-{seed}")
+    salt = "".join(_pick(rnd, BCRYPT_CHARS) for _ in range(21)) + _pick(rnd, ".Oeu")
+    return bcrypt.using(rounds=config.BCRYPT_ROUNDS, salt=salt).hash(PASSWORD)
+
+
+def _moment(rnd, days):
+    return f"{_pick(rnd, days)} {_pick(rnd, HOURS)}:00"
+
+
+def _load(conn, label, sql, rows):
+    start = time.perf_counter()
+    with conn:
+        cursor = conn.executemany(sql, rows)
+    count = cursor.rowcount
+    print(f"  {label:<20} {count:>10,} linhas  {time.perf_counter() - start:6.2f}s")
+    return count
+
+
+def generate(conn, preset, seed=42, today=None):
+    p = PRESETS[preset] if isinstance(preset, str) else preset
+    rnd = random.Random(seed)
+    today = (today or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    history_days = 365 * p["years"]
+    history_start = today - timedelta(days=history_days)
+    history = _days(history_start, history_days)
+    today_str = today.strftime("%Y-%m-%d")
+    barber_ids = range(1, p["barbers"] + 1)
+    client_ids = range(1, p["clients"] + 1)
+
+    # Barbeiros com coordenadas em volta de cidades reais
+    barbers = []
+    for i in range(1, p["barbers"] + 1):
+        city, lat, lng = rnd.choice(CITIES)
+        barbers.append((
+            i, f"Barbeiro {_name(rnd, i)}", f"https://i.pravatar.cc/150?img={i % 70}",
+            round(rnd.uniform(3.0, 5.0), 1),
+            round(lat + rnd.uniform(-0.15, 0.15), 6), round(lng + rnd.uniform(-0.15, 0.15), 6), city,
+        ))
+    _load(conn, "barbers", """
+        INSERT INTO barbers (id, name, avatar, stars, lat, lng, loc) VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, barbers)
+
+    _load(conn, "photos", "INSERT INTO photos (barber_id, url) VALUES (?, ?)", (
+        (b, f"https://i.pravatar.cc/300?img={rnd.randrange(70)}")
+        for b in range(1, p["barbers"] + 1) for _ in range(3)
+    ))
+
+    _load(conn, "services", "INSERT INTO services (id, name) VALUES (?, ?)",
+          [(i, name) for i, (name, *_) in enumerate(SERVICES, 1)])
+
+    # Cada barbeiro oferece de 3 a 6 serviços com preço próprio
+    prices = {}
+    barber_services = []
+    for b in range(1, p["barbers"] + 1):
+        for s in rnd.sample(range(1, len(SERVICES) + 1), rnd.randint(3, 6)):
+            _, low, high, duration = SERVICES[s - 1]
+            price = float(rnd.randrange(low, high + 1, 5))
+            prices.setdefault(b, []).append((s, price))
+            barber_services.append((b, s, price, duration))
+    _load(conn, "barber_services", """
+        INSERT INTO barber_services (barber_id, service_id, price, duration) VALUES (?, ?, ?, ?)
+    """, barber_services)
+
+    _load(conn, "testimonials", "INSERT INTO testimonials (barber_id, name, rate, body) VALUES (?, ?, ?, ?)", (
+        (b, rnd.choice(FIRST_NAMES), rnd.randint(3, 5), "Ótimo atendimento!")
+        for b in range(1, p["barbers"] + 1) for _ in range(rnd.randint(0, 5))
+    ))
+
+    _load(conn, "barber_schedule", """
+        INSERT INTO barber_schedule (barber_id, weekday, start_time, end_time, slot_minutes) VALUES (?, ?, ?, ?, ?)
+    """, ((b, d, "09:00", "19:00", 30) for b in range(1, p["barbers"] + 1) for d in range(6)))
+
+    # Disponibilidade dos próximos dias: ids explícitos para ligar as horas sem lastrowid
+    availability, availability_hours = [], []
+    for b in range(1, p["barbers"] + 1):
+        for d in range(p["availability_days"]):
+            availability_id = len(availability) + 1
+            availability.append((availability_id, b, (today + timedelta(days=d)).strftime("%Y-%m-%d")))
+            for hour in HOURS:
+                availability_hours.append((availability_id, hour, int(rnd.random() < 0.3)))
+    _load(conn, "availability", "INSERT INTO availability (id, barber_id, date) VALUES (?, ?, ?)", availability)
+    _load(conn, "availability_hours", """
+        INSERT INTO availability_hours (availability_id, hour, is_booked) VALUES (?, ?, ?)
+    """, availability_hours)
+    del availability, availability_hours
+
+    # Um único hash bcrypt para todos: calcular um por linha levaria horas
+    password_hash = _password_hash(seed)
+    emails = [f"user{i}@example.com" for i in range(1, p["users"] + 1)]
+    _load(conn, "users", "INSERT INTO users (name, email, password, avatar) VALUES (?, ?, ?, ?)", (
+        (_name(rnd, i), email, password_hash, f"https://i.pravatar.cc/150?u={email}")
+        for i, email in enumerate(emails, 1)
+    ))
+
+    favorites = {(rnd.choice(emails), rnd.randint(1, p["barbers"])) for _ in range(p["users"] * 2)}
+    _load(conn, "favorites", "INSERT INTO favorites (user_email, barber_id) VALUES (?, ?)", sorted(favorites))
+
+    _load(conn, "clients", "INSERT INTO clients (id, name, phone, email, created_at) VALUES (?, ?, ?, ?, ?)", (
+        (i, _name(rnd, i), f"119{rnd.randrange(10**7, 10**8)}", f"client{i}@example.com",
+         _moment(rnd, history))
+        for i in range(1, p["clients"] + 1)
+    ))
+
+    appointment_days = history + _days(today, p["availability_days"])
+
+    def appointment():
+        b = _pick(rnd, barber_ids)
+        s, _ = _pick(rnd, prices[b])
+        return (_pick(rnd, client_ids), b, s, _moment(rnd, appointment_days), _pick(rnd, emails))
+
+    _load(conn, "appointments", """
+        INSERT INTO appointments (client_id, barber_id, service_id, datetime, user_email) VALUES (?, ?, ?, ?, ?)
+    """, (appointment() for _ in range(p["appointments"])))
+
+    # Fluxo de caixa: entradas todo dia e despesas fixas uma vez por mês
+    def cashflow():
+        for d in range(history_days):
+            day = history_start + timedelta(days=d)
+            for _ in range(rnd.randint(5, 20)):
+                when = day.replace(hour=rnd.randint(9, 18), minute=rnd.randrange(60))
+                yield (rnd.randint(1, p["barbers"]), "entrada", "Atendimento",
+                       float(rnd.randrange(20, 150, 5)), when.strftime("%Y-%m-%d %H:%M:%S"))
+            if day.day == 5:
+                for description, low, high in EXPENSES:
+                    yield (None, "saida", description, float(rnd.randrange(low, high)),
+                           day.replace(hour=10).strftime("%Y-%m-%d %H:%M:%S"))
+
+    _load(conn, "cashflow", """
+        INSERT INTO cashflow (barber_id, type, description, amount, datetime) VALUES (?, ?, ?, ?, ?)
+    """, cashflow())
+
+    _load(conn, "products", "INSERT INTO products (id, name, price, cost, unit, description) VALUES (?, ?, ?, ?, ?, ?)", (
+        (i, f"{rnd.choice(PRODUCTS)} {i}", float(price), float(price) * 0.4, "unidade", "Produto sintético")
+        for i, price in ((i, rnd.randrange(15, 120)) for i in range(1, p["products"] + 1))
+    ))
+
+    def stock():
+        for product in range(1, p["products"] + 1):
+            for _ in range(history_days // 15):
+                when = _moment(rnd, history)
+                if rnd.random() < 0.4:
+                    yield (product, "entrada", float(rnd.randint(10, 50)), "Compra", when)
+                else:
+                    yield (product, "saida", float(rnd.randint(1, 5)), "Venda", when)
+
+    _load(conn, "stock_control", """
+        INSERT INTO stock_control (product_id, type, quantity, description, datetime) VALUES (?, ?, ?, ?, ?)
+    """, stock())
+
+    # Comandas: as recentes ficam abertas, o resto finalizada ou cancelada
+    order_days = history + [today_str]
+    orders, order_items = [], []
+    for order_id in range(1, p["orders"] + 1):
+        b = _pick(rnd, barber_ids)
+        opened = _moment(rnd, order_days)
+        items = rnd.sample(prices[b], rnd.randint(1, min(3, len(prices[b]))))
+        total = 0.0
+        for s, price in items:
+            qtd = 1 if rnd.random() < 0.9 else 2
+            total += price * qtd
+            order_items.append((order_id, s, qtd, price))
+        if opened >= today_str:
+            status, discount, method, final = "aberta", 0.0, None, None
+        else:
+            status = "cancelada" if rnd.random() < 0.05 else "finalizada"
+            discount = float(rnd.choice([0, 0, 0, 5, 10]))
+            method = rnd.choice(PAYMENT_METHODS)
+            final = max(total - discount, 0.0)
+        orders.append((order_id, _pick(rnd, client_ids), b, opened,
+                       str(order_id), status, total, discount, method, final))
+    _load(conn, "orders", """
+        INSERT INTO orders (id, client_id, barber_id, opened_at, order_number, status, total, discount,
+                            payment_method, total_final)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, orders)
+    _load(conn, "order_items", "INSERT INTO order_items (order_id, service_id, qtd, price) VALUES (?, ?, ?, ?)",
+          order_items)
+
+
+def build(path, preset="small", seed=42, force=False, today=None):
+    if os.path.exists(path):
+        if not force:
+            raise FileExistsError(f"{path} já existe (use --force para recriar)")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    conn = sqlite3.connect(path)
+    try:
+        # Arquivo novo e descartável: sem journal nem fsync durante a carga
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA cache_size = -200000")
+
+        create_schema(conn)
+        generate(conn, preset, seed, today)
+
+        # Os índices das migrações são criados depois da carga, de uma vez
+        start = time.perf_counter()
+        upgrade(conn)
+        # applied_at (hora da geração) e o epoch aleatório da 0008 saem do preset,
+        # da semente e de --today: o arquivo só depende deles. O epoch continua
+        # mudando quando o conteúdo gerado muda, então os ETags não se confundem
+        day = (today or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+        conn.execute("UPDATE schema_migrations SET applied_at = ?", (day.isoformat(timespec="seconds"),))
+        epoch = random.Random(f"epoch-{preset!r}-{seed}-{day.date()}").randrange(1_000_000_000_000)
+        conn.execute("UPDATE table_versions SET version = ? WHERE name = 'epoch'", (epoch,))
+        conn.commit()
+        conn.execute("ANALYZE")
+        print(f"  {'migrações + ANALYZE':<20} {'':>10}        {time.perf_counter() - start:6.2f}s")
+
+        conn.execute("PRAGMA journal_mode = WAL")
+    finally:
+        conn.close()
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Gera uma base sintética para testes de carga")
+    parser.add_argument("preset", nargs="?", default="small", choices=sorted(PRESETS))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", default=None, help="arquivo de saída (padrão: synthetic_<preset>.db)")
+    parser.add_argument("--today", type=datetime.fromisoformat, default=None,
+                        help="data base YYYY-MM-DD (padrão: hoje); fixe para repetir a mesma base")
+    parser.add_argument("--force", action="store_true", help="apaga o arquivo se já existir")
+    args = parser.parse_args(argv)
+
+    path = args.db or f"synthetic_{args.preset}.db"
+    print(f"Gerando {path} (preset {args.preset}, seed {args.seed})")
+    start = time.perf_counter()
+    try:
+        build(path, args.preset, args.seed, args.force, args.today)
+    except FileExistsError as e:
+        print(e)
+        return 1
+    print(f"Pronto em {time.perf_counter() - start:.1f}s ({os.path.getsize(path) / 1024 / 1024:.1f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
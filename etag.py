@@ -0,0 +1,78 @@
+"""
+ETag fraco e GET condicional para dados que mudam pouco (serviços, produtos,
+perfis de barbeiros).
+
+table_versions tem um contador por tabela que os triggers das migrações 0005
+e 0008 incrementam a cada escrita. O ETag é um hash das versões das tabelas
+que a rota lê, do banco e da URL com query string. Se o If-None-Match bate, a
+resposta é 304 sem chamar a view, então nenhuma consulta dela roda.
+
+    @service.route('/all', methods=['GET'])
+    @login_required(data=[])
+    @etag("services")
+    def get_all_service(): ...
+
+Fica abaixo do login_required: o token continua sendo conferido antes do 304.
+"""
+import hashlib
+import json
+import sqlite3
+from functools import wraps
+
+from flask import g, make_response, request
+
+import config
+from database import DB_PATH, get_db
+from records import fetch_rows
+
+
+def versions(conn, tables):
+    """{tabela: versão} mais o 'epoch' do banco; None se alguma não tem contador."""
+    names = ["epoch", *tables]
+    try:
+        rows = dict(fetch_rows(
+            conn, "SELECT name, version FROM table_versions WHERE name IN (SELECT value FROM json_each(?))",
+            (json.dumps(names),),
+        ))
+    except sqlite3.OperationalError:
+        # Banco ainda sem a migração 0005
+        return None
+    return rows if len(rows) == len(names) else None
+
+
+def current(tables):
+    """ETag (sem aspas) da requisição atual, ou None se não dá para calcular."""
+    found = versions(get_db(readonly=True), tables)
+    if found is None:
+        return None
+    key = "|".join([g.get("db_path") or DB_PATH, request.full_path] + [f"{n}={found[n]}" for n in sorted(found)])
+    return hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+
+
+def etag(*tables):
+    """GET condicional para uma rota cuja resposta depende só de tables."""
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            if not config.ETAG_ENABLED or request.method not in ("GET", "HEAD"):
+                return f(*args, **kwargs)
+
+            # As versões são lidas antes da view: uma escrita no meio do caminho
+            # deixa o ETag mais velho que os dados, nunca o contrário
+            tag = current(tables)
+            if tag is None:
+                return f(*args, **kwargs)
+
+            if request.if_none_match.contains_weak(tag):
+                response = make_response("", 304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(tag, weak=True)
+            # O cliente guarda, mas revalida sempre (dados por usuário/barbearia)
+            response.headers["Cache-Control"] = "private, no-cache"
+            return response
+        return wrapper
+    return decorator
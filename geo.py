@@ -0,0 +1,206 @@
+"""
+Busca de barbeiros por proximidade.
+
+Os pontos viram vetores na esfera unitária: a distância em linha reta (corda)
+cresce junto com a distância pela superfície, então uma KD-tree euclidiana em
+3D dá o k-NN exato sem se preocupar com a longitude. A árvore fica em memória,
+uma por arquivo de banco, e é refeita quando table_versions['barbers'] muda
+(triggers da migração 0005). GEO_INDEX=rtree consulta o R*Tree do SQLite.
+"""
+import heapq
+import math
+import threading
+
+import config
+from records import fetch_rows
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def _to_xyz(lat, lng):
+    lat, lng = math.radians(lat), math.radians(lng)
+    cos_lat = math.cos(lat)
+    return (cos_lat * math.cos(lng), cos_lat * math.sin(lng), math.sin(lat))
+
+
+def _chord2(km):
+    # Quadrado da corda (esfera unitária) correspondente a km pela superfície
+    angle = min(km / EARTH_RADIUS_KM, math.pi)
+    return (2 * math.sin(angle / 2)) ** 2
+
+
+def _km(chord2):
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(chord2) / 2))
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    dlat, dlng = math.radians(lat2 - lat1), math.radians(lng2 - lng1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class KDTree:
+    """
+    KD-tree implícita: cada faixa [lo, hi) tem o pivô no meio, dividido no eixo
+    profundidade % 3; faixas pequenas são folhas varridas direto.
+    """
+
+    LEAF_SIZE = 8
+
+    def __init__(self, points):
+        # points: (id, lat, lng)
+        ids, coords = [], []
+        for point_id, lat, lng in points:
+            ids.append(point_id)
+            coords.append(_to_xyz(lat, lng))
+        order = list(range(len(coords)))
+        self._build(order, coords, 0, len(order), 0)
+        self._ids = [ids[i] for i in order]
+        self._pts = [coords[i] for i in order]
+
+    def __len__(self):
+        return len(self._pts)
+
+    def _build(self, order, coords, lo, hi, depth):
+        stack = [(lo, hi, depth)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            if hi - lo <= self.LEAF_SIZE:
+                continue
+            axis = depth % 3
+            order[lo:hi] = sorted(order[lo:hi], key=lambda i: coords[i][axis])
+            mid = (lo + hi) // 2
+            stack.append((lo, mid, depth + 1))
+            stack.append((mid + 1, hi, depth + 1))
+
+    def nearest(self, lat, lng, k, radius_km=None):
+        """Até k pontos a no máximo radius_km, do mais perto ao mais longe: [(km, id)]."""
+        if k <= 0 or not self._pts:
+            return []
+        q = _to_xyz(lat, lng)
+        qx, qy, qz = q
+        pts = self._pts
+        bound = _chord2(radius_km) if radius_km is not None else math.inf
+        best = []  # heap de (-dist², posição): o pior dos k fica no topo
+
+        def consider(i):
+            nonlocal bound
+            px, py, pz = pts[i]
+            d2 = (px - qx) ** 2 + (py - qy) ** 2 + (pz - qz) ** 2
+            if d2 > bound:
+                return
+            if len(best) < k:
+                heapq.heappush(best, (-d2, i))
+            else:
+                heapq.heapreplace(best, (-d2, i))
+            if len(best) == k:
+                bound = -best[0][0]
+
+        # (lo, hi, profundidade, distância² mínima até a faixa pelo plano de corte)
+        stack = [(0, len(pts), 0, 0.0)]
+        while stack:
+            lo, hi, depth, plane2 = stack.pop()
+            if plane2 > bound:
+                continue
+            if hi - lo <= self.LEAF_SIZE:
+                for i in range(lo, hi):
+                    consider(i)
+                continue
+            mid = (lo + hi) // 2
+            consider(mid)
+            diff = q[depth % 3] - pts[mid][depth % 3]
+            if diff < 0:
+                near, far = (lo, mid), (mid + 1, hi)
+            else:
+                near, far = (mid + 1, hi), (lo, mid)
+            # O lado de lá entra primeiro na pilha: só é visitado depois do lado de cá
+            stack.append((far[0], far[1], depth + 1, diff * diff))
+            stack.append((near[0], near[1], depth + 1, 0.0))
+
+        return [(_km(-d2), self._ids[i]) for d2, i in sorted(best, reverse=True)]
+
+
+# ----- Índice em memória por banco -----
+
+class _GeoIndex:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.version = None
+        self.tree = None
+        self.stats = {"builds": 0, "queries": 0}
+
+    def current(self, conn):
+        row = fetch_rows(conn, "SELECT version FROM table_versions WHERE name = 'barbers'")
+        version = row[0][0] if row else 0
+        if version == self.version:
+            return self.tree
+
+        # Uma thread refaz a árvore; as outras seguem com a anterior enquanto isso
+        if not self.lock.acquire(blocking=self.tree is None):
+            return self.tree
+        try:
+            if version != self.version:
+                points = fetch_rows(conn, "SELECT id, lat, lng FROM barbers WHERE lat IS NOT NULL AND lng IS NOT NULL")
+                self.tree = KDTree(points)
+                self.version = version
+                self.stats["builds"] += 1
+            return self.tree
+        finally:
+            self.lock.release()
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def index_for(path):
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = _GeoIndex(path)
+        return index
+
+
+def nearby_rtree(conn, lat, lng, radius_km, limit):
+    # Caixa em graus em volta do ponto pelo R*Tree, distância exata em Python
+    dlat = radius_km / KM_PER_DEGREE
+    dlng = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+    rows = fetch_rows(conn, """
+        SELECT b.id, b.lat, b.lng
+        FROM barbers_geo g
+        JOIN barbers b ON b.id = g.id
+        WHERE g.max_lat >= ? AND g.min_lat <= ? AND g.max_lng >= ? AND g.min_lng <= ?
+    """, (lat - dlat, lat + dlat, lng - dlng, lng + dlng))
+    found = []
+    for barber_id, b_lat, b_lng in rows:
+        distance = haversine_km(lat, lng, b_lat, b_lng)
+        if distance <= radius_km:
+            found.append((distance, barber_id))
+    found.sort()
+    return found[:limit]
+
+
+def nearby(conn, path, lat, lng, radius_km, limit):
+    """[(km, barber_id)] dos barbeiros a até radius_km, do mais perto ao mais longe."""
+    if config.GEO_INDEX == "rtree":
+        return nearby_rtree(conn, lat, lng, radius_km, limit)
+    index = index_for(path)
+    tree = index.current(conn)
+    index.stats["queries"] += 1
+    return tree.nearest(lat, lng, limit, radius_km)
+
+
+def stats():
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    return {
+        i.path: dict(i.stats, version=i.version, size=len(i.tree) if i.tree is not None else 0)
+        for i in indexes
+    }
+
+
+def reset():
+    with _indexes_lock:
+        _indexes.clear()
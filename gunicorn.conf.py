@@ -0,0 +1,86 @@
+"""
+Configuração do gunicorn para produção (valores em config.py / .env).
+
+    gunicorn -c gunicorn.conf.py wsgi:app        # ou: python serve.py
+
+Com preload o app é montado uma vez no master (migrações incluídas) e os
+workers nascem por fork, já com tudo importado. Os hooks abaixo garantem que
+nada que não sobrevive a um fork (conexões SQLite, threads, pool do bcrypt)
+passe do master para os workers.
+
+Recarregar sem derrubar conexões: kill -HUP <master> (python serve.py --reload).
+Com preload o HUP recria os workers a partir do código já carregado no master;
+para publicar código novo use USR2 + QUIT no master antigo ou SERVER_PRELOAD=0.
+"""
+import glob
+import os
+import tempfile
+
+# Com vários processos as métricas são somadas por arquivos (ver metrics.py)
+os.environ.setdefault("METRICS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "apiAppGestao-metrics"))
+
+# "config" é uma opção do próprio gunicorn: o módulo entra com outro nome
+import config as app_config  # noqa: E402
+
+
+def _workers():
+    if app_config.SERVER_WORKERS > 0:
+        return app_config.SERVER_WORKERS
+    return max(1, min(os.cpu_count() or 1, app_config.SERVER_MAX_WORKERS))
+
+
+bind = app_config.SERVER_BIND
+workers = _workers()
+# gthread: as threads dividem o pool de leitores e o writer do processo
+worker_class = "gthread"
+threads = max(1, min(app_config.SERVER_THREADS, app_config.DB_READERS))
+max_requests = app_config.SERVER_MAX_REQUESTS
+max_requests_jitter = app_config.SERVER_MAX_REQUESTS_JITTER if app_config.SERVER_MAX_REQUESTS else 0
+timeout = app_config.SERVER_TIMEOUT
+graceful_timeout = app_config.SERVER_GRACEFUL_TIMEOUT
+keepalive = app_config.SERVER_KEEPALIVE
+preload_app = app_config.SERVER_PRELOAD
+pidfile = app_config.SERVER_PIDFILE or None
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    # Arquivos de workers de uma execução anterior somariam contadores velhos
+    for path in glob.glob(os.path.join(app_config.METRICS_MULTIPROC_DIR, "metrics-*.json")):
+        os.remove(path)
+
+
+def pre_fork(server, worker):
+    # No master: fecha as conexões abertas pelo preload (migrações) antes de copiar o processo
+    import database
+    import revocation
+    database.reset_pools()
+    revocation.reset()
+
+
+def post_fork(server, worker):
+    import database
+    import hashing
+    import metrics
+    import writequeue
+    database.reset_pools(close=False)
+    writequeue.reset()
+    hashing.reset()
+    metrics.reset()
+    server.log.info("Worker %s pronto (%d threads)", worker.pid, threads)
+
+
+def worker_exit(server, worker):
+    # Entrega as escritas que ainda estão na fila antes do worker sair
+    import metrics
+    import writequeue
+    writequeue.flush(timeout=app_config.WRITE_QUEUE_TIMEOUT)
+    if app_config.METRICS_ENABLED:
+        metrics.flush()
+
+
+def child_exit(server, worker):
+    # No master: o arquivo de métricas do worker que saiu vai para metrics-dead.json
+    import metrics
+    metrics.compact([worker.pid])
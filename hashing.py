@@ -0,0 +1,159 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+import config
+
+
+class HashPoolBusy(Exception):
+    """Fila de hash cheia (ou lenta demais): a rota responde 503 com Retry-After."""
+    pass
+
+
+# ----- Trabalho feito nos processos do pool -----
+
+_contexts = {}
+
+
+def _context(rounds):
+    # min = max = rounds: qualquer hash com outro custo volta de verify_and_update com um hash novo
+    ctx = _contexts.get(rounds)
+    if ctx is None:
+        # passlib só é importado quando alguém faz hash (login/cadastro), não no boot do worker
+        from passlib.context import CryptContext
+        ctx = _contexts[rounds] = CryptContext(
+            schemes=["bcrypt"],
+            bcrypt__rounds=rounds, bcrypt__min_rounds=rounds, bcrypt__max_rounds=rounds,
+        )
+    return ctx
+
+
+def _hash(password, rounds):
+    return _context(rounds).hash(password)
+
+
+def _verify_and_update(password, hashed, rounds):
+    return _context(rounds).verify_and_update(password, hashed)
+
+
+# ----- Pool -----
+
+_lock = threading.Lock()
+_pool = None
+_pool_pid = None
+_slots = None
+_stats = {"submitted": 0, "rejected": 0, "timeouts": 0, "broken": 0, "inline": 0, "in_flight": 0}
+
+
+def _executor():
+    global _pool, _pool_pid, _slots
+    with _lock:
+        # O pid evita reaproveitar no worker do gunicorn um pool criado antes do fork
+        if _pool is None or _pool_pid != os.getpid():
+            # Nunca "fork": o pool nasce de uma requisição, com as threads da fila de
+            # escrita, das métricas e do backup rodando, e o filho poderia herdar um
+            # lock travado. O forkserver é um processo novo, de uma thread só, de onde
+            # saem os filhos; eles só importam hashing (e config) para rodar o bcrypt.
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(
+                max_workers=config.HASH_WORKERS,
+                mp_context=multiprocessing.get_context(method),
+            )
+            _pool_pid = os.getpid()
+            _slots = threading.BoundedSemaphore(config.HASH_WORKERS + config.HASH_MAX_PENDING)
+        return _pool, _slots
+
+
+def _discard(pool):
+    global _pool
+    with _lock:
+        if _pool is pool:
+            _pool = None
+            _stats["broken"] += 1
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _track(delta):
+    with _lock:
+        _stats["in_flight"] += delta
+
+
+def _done(slots):
+    _track(-1)
+    slots.release()
+
+
+def _run(fn, *args):
+    if config.HASH_WORKERS <= 0:
+        with _lock:
+            _stats["inline"] += 1
+        return fn(*args)
+
+    pool, slots = _executor()
+    # Em vez de empilhar logins sem limite, recusa logo e deixa o cliente tentar de novo
+    if not slots.acquire(blocking=False):
+        with _lock:
+            _stats["rejected"] += 1
+        raise HashPoolBusy("Fila de hash de senhas cheia")
+    _track(1)
+
+    try:
+        future = pool.submit(fn, *args)
+    except BrokenProcessPool:
+        _done(slots)
+        _discard(pool)
+        raise HashPoolBusy("Pool de hash reiniciando") from None
+    except BaseException:
+        _done(slots)
+        raise
+    future.add_done_callback(lambda f: _done(slots))
+    with _lock:
+        _stats["submitted"] += 1
+
+    try:
+        return future.result(timeout=config.HASH_TIMEOUT)
+    except FutureTimeout:
+        with _lock:
+            _stats["timeouts"] += 1
+        raise HashPoolBusy("Hash de senha demorou demais") from None
+    except BrokenProcessPool:
+        _discard(pool)
+        raise HashPoolBusy("Pool de hash reiniciando") from None
+
+
+def hash_password(password):
+    return _run(_hash, password, config.BCRYPT_ROUNDS)
+
+
+def verify_and_update(password, hashed):
+    """
+    Retorna (ok, novo_hash). novo_hash vem preenchido quando a senha confere mas
+    foi gerada com outro BCRYPT_ROUNDS; quem chama deve gravá-lo.
+    """
+    return _run(_verify_and_update, password, hashed, config.BCRYPT_ROUNDS)
+
+
+def verify_password(password, hashed):
+    return verify_and_update(password, hashed)[0]
+
+
+def stats():
+    with _lock:
+        return dict(_stats, workers=config.HASH_WORKERS, max_pending=config.HASH_MAX_PENDING,
+                    rounds=config.BCRYPT_ROUNDS)
+
+
+def reset():
+    """Descarta o pool deste processo (ex.: depois de um fork)."""
+    global _pool, _pool_pid, _slots
+    with _lock:
+        pool, mine = _pool, _pool_pid == os.getpid()
+        _pool = _pool_pid = _slots = None
+    if pool is not None and mine:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(reset)
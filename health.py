@@ -0,0 +1,31 @@
+import os
+
+from flask import Blueprint, jsonify
+
+from database import get_db
+from migrate import pending_migrations_readonly
+
+health = Blueprint("health", __name__)
+
+
+@health.route("/health", methods=["GET"])
+def liveness():
+    # Só diz que o processo responde: o balanceador reinicia o worker se falhar
+    return jsonify({"status": "ok", "pid": os.getpid()})
+
+
+@health.route("/ready", methods=["GET"])
+def readiness():
+    # Pronto para receber tráfego: banco abre, responde e está na última migração.
+    # A conexão é de leitura, então a checagem das migrações não cria nem grava nada
+    try:
+        conn = get_db(readonly=True)
+        conn.execute("SELECT 1").fetchone()
+        pending = [f"{version:04d}_{name}" for version, name, _ in pending_migrations_readonly(conn)]
+    except Exception as e:
+        print("Readiness falhou:", e)
+        return jsonify({"status": "unavailable", "error": str(e)}), 503
+
+    if pending:
+        return jsonify({"status": "unavailable", "error": "Migrações pendentes", "pending": pending}), 503
+    return jsonify({"status": "ready", "pid": os.getpid()})
@@ -1,11 +1,9 @@
 import sqlite3
+from database import DB_PATH
+from migrate import upgrade
 
-# Conexão e criação do banco
-conn = sqlite3.connect("database.db")
-cursor = conn.cursor()
-
-# Drop e criação das tabelas
-cursor.executescript('''
+# Schema completo (destrutivo: apaga as tabelas existentes)
+SCHEMA = '''
 DROP TABLE IF EXISTS barbers;
 DROP TABLE IF EXISTS photos;
 DROP TABLE IF EXISTS services;
@@ -26,6 +24,18 @@ DROP TABLE IF EXISTS package_services;
 DROP TABLE IF EXISTS barber_schedule;
 DROP TABLE IF EXISTS orders;
 DROP TABLE IF EXISTS order_items;
+DROP TABLE IF EXISTS schema_migrations;
+DROP TABLE IF EXISTS barber_custom_hours;
+DROP TABLE IF EXISTS products;
+DROP TABLE IF EXISTS sale_products;
+DROP TABLE IF EXISTS revoked_tokens;
+DROP TABLE IF EXISTS refresh_tokens;
+DROP TABLE IF EXISTS barbers_geo;
+DROP TABLE IF EXISTS table_versions;
+DROP TABLE IF EXISTS barbers_fts;
+DROP TABLE IF EXISTS clients_fts;
+DROP TABLE IF EXISTS services_fts;
+DROP TABLE IF EXISTS products_fts;
 
 
 CREATE TABLE favorites (
@@ -163,6 +173,7 @@ CREATE TABLE cashflow (
     description TEXT,
     amount REAL,
     datetime TEXT,
+    payment_method TEXT,
     FOREIGN KEY(barber_id) REFERENCES barbers(id)
 );
 
@@ -252,116 +263,138 @@ CREATE TABLE order_items (
 
 
 
-''')
-
-# Inserir barbeiros
-barbers = [
-    (1, "Barbeiro 1", "https://i.pravatar.cc/150?img=5", 4.8, -23.5505, -46.6333, "São Paulo"),
-    (2, "Barbeiro 2", "https://i.pravatar.cc/150?img=6", 4.6, -23.5595, -46.6350, "São Paulo"),
-    (3, "Barbeiro 3", "https://i.pravatar.cc/150?img=7", 3.8, -22.9068, -43.1729, "Rio de Janeiro")
-]
-cursor.executemany('''
-    INSERT INTO barbers (id, name, avatar, stars, lat, lng, loc)
-    VALUES (?, ?, ?, ?, ?, ?, ?)
-''', barbers)
-
-# Inserir fotos
-photos = [
-    (1, "https://i.pravatar.cc/300?img=15"),
-    (1, "https://i.pravatar.cc/300?img=16"),
-    (1, "https://i.pravatar.cc/300?img=9"),
-    (2, "https://i.pravatar.cc/300?img=12"),
-    (2, "https://i.pravatar.cc/300?img=13"),
-    (2, "https://i.pravatar.cc/300?img=14"),
-    (3, "https://i.pravatar.cc/300?img=14"),
-    (3, "https://i.pravatar.cc/300?img=15"),
-    (3, "https://i.pravatar.cc/300?img=17")
-]
-cursor.executemany('INSERT INTO photos (barber_id, url) VALUES (?, ?)', photos)
-
-# Inserir serviços genéricos
-services = [("Corte",), ("Barba",), ("Corte + Barba",), ("Corte Social",)]
-cursor.executemany('INSERT INTO services (name) VALUES (?)', services)
-
-# Relacionar barbeiros com serviços (barber_services)
-barber_services = [
-    (1, 1, 50, 30),  # barbeiro 1 -> Corte
-    (1, 2, 30, 20),  # barbeiro 1 -> Barba
-    (2, 1, 40, 30),  # barbeiro 2 -> Corte
-    (2, 2, 20, 20),  # barbeiro 2 -> Barba
-    (2, 3, 60, 45),  # barbeiro 2 -> Corte + Barba
-    (3, 4, 35, 30)   # barbeiro 3 -> Corte Social
-]
-cursor.executemany('''
-    INSERT INTO barber_services (barber_id, service_id, price, duration)
-    VALUES (?, ?, ?, ?)
-''', barber_services)
-
-# Depoimentos
-testimonials = [
-    (1, "João", 5, "Ótimo corte!"),
-    (1, "Rodrigo", 4, "Ótimo corte!"),
-    (2, "Lucas", 5, "Trabalho incrível!"),
-    (2, "João", 5, "Trabalho incrível!"),
-    (3, "Pedro", 4, "Bom atendimento, mas poderia melhorar no tempo.")
-]
-cursor.executemany('INSERT INTO testimonials (barber_id, name, rate, body) VALUES (?, ?, ?, ?)', testimonials)
-
-# Disponibilidade
-availability_raw = [
-    (1, "2025-06-02", ["09:00", "10:00", "11:00", "12:00", "15:00", "16:00"]),
-    (1, "2025-06-03", ["09:00", "10:00", "11:00", "12:00"]),
-    (2, "2025-06-02", ["09:00", "10:00", "11:00", "12:00", "15:00"]),
-    (2, "2025-06-03", ["09:00", "10:00", "11:00", "12:00"]),
-    (2, "2025-06-04", ["09:00", "10:00", "11:00", "12:00", "13:00", "14:00", "15:00", "16:00", "17:00", "18:00"]),
-    (3, "2025-06-02", ["09:00", "10:00", "11:00", "12:00", "13:00", "14:00", "15:00", "16:00", "17:00", "18:00"]),
-    (3, "2025-06-03", ["09:00", "10:00", "11:00", "12:00"]),
-    (3, "2025-06-04", ["09:00", "10:00", "11:00", "12:00"]),
-    (3, "2025-06-05", ["09:00", "10:00", "11:00", "12:00", "13:00", "14:00", "15:00", "16:00", "17:00", "18:00"])
-]
-for barber_id, date, hours in availability_raw:
-    cursor.execute('INSERT INTO availability (barber_id, date) VALUES (?, ?)', (barber_id, date))
-    availability_id = cursor.lastrowid
-    for hour in hours:
-        cursor.execute('INSERT INTO availability_hours (availability_id, hour) VALUES (?, ?)', (availability_id, hour))
-
-# Clientes
-clients = [
-    (1, "João", "1900112233", 'joao@email.com', '2025-06-04 14:32:10'),
-    (2, "Maria", "1900112233", 'maria@email.com', '2025-06-03 14:32:10'),
-    (3, "Tati", "1900112233", 'tati@email.com', '2025-06-03 14:32:10')
-]
-cursor.executemany('''
-    INSERT INTO clients (id, name, phone, email, created_at)
-    VALUES (?, ?, ?, ?, ?)
-''', clients)
-
-
-# Inserindo produtos
-products = [
-    ("Pomada Modeladora", 30.0, 12.0, "unidade", "Pomada para cabelo fixação forte"),
-    ("Shampoo Anticaspa", 45.0, 20.0, "ml", "Shampoo para tratamento de caspa"),
-    ("Creme de Barbear", 25.0, 10.0, "unidade", "Creme para barbear")
-]
-cursor.executemany('''
-    INSERT INTO products (name, price, cost, unit, description)
-    VALUES (?, ?, ?, ?, ?)
-''', products)
-
-# Entrada de estoque
-stock_entries = [
-    (1, 'entrada', 10, 'Compra inicial de pomadas'),
-    (2, 'entrada', 5, 'Compra de shampoos'),
-    (3, 'entrada', 7, 'Compra de cremes de barbear')
-]
-cursor.executemany('''
-    INSERT INTO stock_control (product_id, type, quantity, description)
-    VALUES (?, ?, ?, ?)
-''', stock_entries)
-
-
-# Finaliza
-conn.commit()
-conn.close()
-
-print("Banco de dados com relacionamento barbeiro-serviço normalizado com sucesso.")
+'''
+
+
+def create_schema(conn):
+    conn.executescript(SCHEMA)
+
+
+def seed(conn):
+    cursor = conn.cursor()
+
+    # Inserir barbeiros
+    barbers = [
+        (1, "Barbeiro 1", "https://i.pravatar.cc/150?img=5", 4.8, -23.5505, -46.6333, "São Paulo"),
+        (2, "Barbeiro 2", "https://i.pravatar.cc/150?img=6", 4.6, -23.5595, -46.6350, "São Paulo"),
+        (3, "Barbeiro 3", "https://i.pravatar.cc/150?img=7", 3.8, -22.9068, -43.1729, "Rio de Janeiro")
+    ]
+    cursor.executemany('''
+        INSERT INTO barbers (id, name, avatar, stars, lat, lng, loc)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', barbers)
+
+    # Inserir fotos
+    photos = [
+        (1, "https://i.pravatar.cc/300?img=15"),
+        (1, "https://i.pravatar.cc/300?img=16"),
+        (1, "https://i.pravatar.cc/300?img=9"),
+        (2, "https://i.pravatar.cc/300?img=12"),
+        (2, "https://i.pravatar.cc/300?img=13"),
+        (2, "https://i.pravatar.cc/300?img=14"),
+        (3, "https://i.pravatar.cc/300?img=14"),
+        (3, "https://i.pravatar.cc/300?img=15"),
+        (3, "https://i.pravatar.cc/300?img=17")
+    ]
+    cursor.executemany('INSERT INTO photos (barber_id, url) VALUES (?, ?)', photos)
+
+    # Inserir serviços genéricos
+    services = [("Corte",), ("Barba",), ("Corte + Barba",), ("Corte Social",)]
+    cursor.executemany('INSERT INTO services (name) VALUES (?)', services)
+
+    # Relacionar barbeiros com serviços (barber_services)
+    barber_services = [
+        (1, 1, 50, 30),  # barbeiro 1 -> Corte
+        (1, 2, 30, 20),  # barbeiro 1 -> Barba
+        (2, 1, 40, 30),  # barbeiro 2 -> Corte
+        (2, 2, 20, 20),  # barbeiro 2 -> Barba
+        (2, 3, 60, 45),  # barbeiro 2 -> Corte + Barba
+        (3, 4, 35, 30)   # barbeiro 3 -> Corte Social
+    ]
+    cursor.executemany('''
+        INSERT INTO barber_services (barber_id, service_id, price, duration)
+        VALUES (?, ?, ?, ?)
+    ''', barber_services)
+
+    # Depoimentos
+    testimonials = [
+        (1, "João", 5, "Ótimo corte!"),
+        (1, "Rodrigo", 4, "Ótimo corte!"),
+        (2, "Lucas", 5, "Trabalho incrível!"),
+        (2, "João", 5, "Trabalho incrível!"),
+        (3, "Pedro", 4, "Bom atendimento, mas poderia melhorar no tempo.")
+    ]
+    cursor.executemany('INSERT INTO testimonials (barber_id, name, rate, body) VALUES (?, ?, ?, ?)', testimonials)
+
+    # Disponibilidade
+    availability_raw = [
+        (1, "2025-06-02", ["09:00", "10:00", "11:00", "12:00", "15:00", "16:00"]),
+        (1, "2025-06-03", ["09:00", "10:00", "11:00", "12:00"]),
+        (2, "2025-06-02", ["09:00", "10:00", "11:00", "12:00", "15:00"]),
+        (2, "2025-06-03", ["09:00", "10:00", "11:00", "12:00"]),
+        (2, "2025-06-04", ["09:00", "10:00", "11:00", "12:00", "13:00", "14:00", "15:00", "16:00", "17:00", "18:00"]),
+        (3, "2025-06-02", ["09:00", "10:00", "11:00", "12:00", "13:00", "14:00", "15:00", "16:00", "17:00", "18:00"]),
+        (3, "2025-06-03", ["09:00", "10:00", "11:00", "12:00"]),
+        (3, "2025-06-04", ["09:00", "10:00", "11:00", "12:00"]),
+        (3, "2025-06-05", ["09:00", "10:00", "11:00", "12:00", "13:00", "14:00", "15:00", "16:00", "17:00", "18:00"])
+    ]
+    for barber_id, date, hours in availability_raw:
+        cursor.execute('INSERT INTO availability (barber_id, date) VALUES (?, ?)', (barber_id, date))
+        availability_id = cursor.lastrowid
+        for hour in hours:
+            cursor.execute('INSERT INTO availability_hours (availability_id, hour) VALUES (?, ?)', (availability_id, hour))
+
+    # Clientes
+    clients = [
+        (1, "João", "1900112233", 'joao@email.com', '2025-06-04 14:32:10'),
+        (2, "Maria", "1900112233", 'maria@email.com', '2025-06-03 14:32:10'),
+        (3, "Tati", "1900112233", 'tati@email.com', '2025-06-03 14:32:10')
+    ]
+    cursor.executemany('''
+        INSERT INTO clients (id, name, phone, email, created_at)
+        VALUES (?, ?, ?, ?, ?)
+    ''', clients)
+
+
+    # Inserindo produtos
+    products = [
+        ("Pomada Modeladora", 30.0, 12.0, "unidade", "Pomada para cabelo fixação forte"),
+        ("Shampoo Anticaspa", 45.0, 20.0, "ml", "Shampoo para tratamento de caspa"),
+        ("Creme de Barbear", 25.0, 10.0, "unidade", "Creme para barbear")
+    ]
+    cursor.executemany('''
+        INSERT INTO products (name, price, cost, unit, description)
+        VALUES (?, ?, ?, ?, ?)
+    ''', products)
+
+    # Entrada de estoque
+    stock_entries = [
+        (1, 'entrada', 10, 'Compra inicial de pomadas'),
+        (2, 'entrada', 5, 'Compra de shampoos'),
+        (3, 'entrada', 7, 'Compra de cremes de barbear')
+    ]
+    cursor.executemany('''
+        INSERT INTO stock_control (product_id, type, quantity, description)
+        VALUES (?, ?, ?, ?)
+    ''', stock_entries)
+
+
+def main():
+    # Conexão e criação do banco
+    conn = sqlite3.connect(DB_PATH)
+
+    create_schema(conn)
+    seed(conn)
+
+    # Finaliza
+    conn.commit()
+
+    # Índices e demais mudanças de schema ficam nas migrações
+    upgrade(conn)
+    conn.close()
+
+    print("Banco de dados com relacionamento barbeiro-serviço normalizado com sucesso.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,426 @@
+"""
+Métricas no formato texto do Prometheus em GET /metrics.
+
+Com METRICS_MULTIPROC_DIR cada worker grava um retrato JSON das suas métricas
+nesse diretório (a cada METRICS_FLUSH_INTERVAL segundos) e o /metrics de
+qualquer worker soma todos os arquivos. Contadores e histogramas de workers
+que já morreram continuam somando; gauges só entram de processos vivos.
+Quando um worker sai (ex.: max_requests), o master junta o arquivo dele em
+metrics-dead.json (compact), para o diretório não crescer sem limite.
+"""
+import hmac
+import json
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+
+from flask import Blueprint, Response, g, jsonify, request
+
+import config
+import querylog
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos
+    fcntl = None
+
+metrics = Blueprint("metrics", __name__)
+
+# nome -> (tipo, ajuda)
+METRICS = {
+    "http_requests_total": ("counter", "Requisições atendidas"),
+    "http_request_duration_seconds": ("histogram", "Latência das requisições por rota"),
+    "http_requests_in_flight": ("gauge", "Requisições em andamento"),
+    "sqlite_query_duration_seconds": ("histogram", "Duração dos comandos SQL por tipo"),
+    "sqlite_errors_total": ("counter", "Erros do SQLite (busy/locked/outros)"),
+    "db_pool_connections": ("gauge", "Conexões do pool por estado"),
+    "db_pool_checkouts_total": ("counter", "Conexões entregues pelo pool"),
+    "db_pool_waits_total": ("counter", "Checkouts que esperaram conexão livre"),
+    "db_pool_wait_seconds_total": ("counter", "Tempo total esperando conexão"),
+    "db_pool_timeouts_total": ("counter", "Checkouts que desistiram por timeout"),
+    "cache_hits_total": ("counter", "Acertos de cache"),
+    "cache_misses_total": ("counter", "Faltas de cache"),
+    "cache_entries": ("gauge", "Entradas em cache"),
+    "cache_hit_ratio": ("gauge", "Acertos / (acertos + faltas)"),
+    "write_queue_writes_total": ("counter", "Escritas confirmadas pela fila"),
+    "write_queue_batches_total": ("counter", "Lotes (transações) da fila de escrita"),
+    "write_queue_failed_total": ("counter", "Escritas que falharam na fila"),
+    "write_queue_pending": ("gauge", "Escritas esperando na fila"),
+    "hash_pool_in_flight": ("gauge", "Operações de bcrypt no pool"),
+    "hash_pool_rejected_total": ("counter", "Operações de bcrypt recusadas (503)"),
+    "token_revocation_rejected_total": ("counter", "Tokens recusados por revogação"),
+}
+
+
+def _labels(**labels):
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _statement(sql):
+    word = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else "?"
+    return word if word in {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "BEGIN", "COMMIT", "PRAGMA"} else "OTHER"
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.counters = defaultdict(lambda: defaultdict(float))
+            # nome -> labels -> [contagem por bucket..., soma, total]
+            self.histograms = defaultdict(dict)
+            self.in_flight = defaultdict(int)
+
+    def inc(self, name, labels, value=1):
+        with self.lock:
+            self.counters[name][labels] += value
+
+    def observe(self, name, labels, value, buckets):
+        with self.lock:
+            series = self.histograms[name].get(labels)
+            if series is None:
+                series = self.histograms[name][labels] = [0] * len(buckets) + [0.0, 0]
+            index = bisect_left(buckets, value)
+            if index < len(buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def track(self, labels, delta):
+        with self.lock:
+            self.in_flight[labels] += delta
+
+    def snapshot(self):
+        with self.lock:
+            counters = {name: dict(series) for name, series in self.counters.items()}
+            histograms = {name: {k: list(v) for k, v in series.items()} for name, series in self.histograms.items()}
+            in_flight = dict(self.in_flight)
+        gauges = defaultdict(dict)
+        gauges["http_requests_in_flight"] = in_flight
+        _collect(counters, gauges)
+        return {"pid": os.getpid(), "time": time.time(), "counters": counters,
+                "histograms": histograms, "gauges": dict(gauges)}
+
+
+registry = Registry()
+
+
+# ----- Coleta dos módulos que já mantêm estatísticas -----
+
+def _collect(counters, gauges):
+    from database import pool_stats
+    import hashing
+    import revocation
+    import users
+    import utils
+    import writequeue
+
+    def counter(name, labels, value):
+        counters.setdefault(name, {})[labels] = value
+
+    stats = pool_stats()
+    pools = [(config.DB_PATH, stats)] + list(stats.get("tenants", {}).items())
+    for path, pair in pools:
+        for role in ("readers", "writer"):
+            s = pair[role]
+            base = dict(db=os.path.basename(path), pool=role)
+            for state in ("in_use", "idle"):
+                gauges["db_pool_connections"][_labels(**base, state=state)] = s[state]
+            gauges["db_pool_connections"][_labels(**base, state="max")] = s["max_size"]
+            counter("db_pool_checkouts_total", _labels(**base), s["checkouts"])
+            counter("db_pool_waits_total", _labels(**base), s["waits"])
+            counter("db_pool_wait_seconds_total", _labels(**base), s["wait_time"])
+            counter("db_pool_timeouts_total", _labels(**base), s["timeouts"])
+
+    for cache, s in (("user", users.user_cache_stats()), ("token", utils.token_cache_stats())):
+        counter("cache_hits_total", _labels(cache=cache), s["hits"])
+        counter("cache_misses_total", _labels(cache=cache), s["misses"])
+        gauges["cache_entries"][_labels(cache=cache)] = s["size"]
+
+    for path, s in writequeue.stats().items():
+        labels = _labels(db=os.path.basename(path))
+        counter("write_queue_writes_total", labels, s["writes"])
+        counter("write_queue_batches_total", labels, s["batches"])
+        counter("write_queue_failed_total", labels, s["failed"])
+        gauges["write_queue_pending"][labels] = s["pending"]
+
+    s = hashing.stats()
+    gauges["hash_pool_in_flight"][""] = s["in_flight"]
+    counter("hash_pool_rejected_total", "", s["rejected"])
+
+    for path, s in revocation.stats().items():
+        counter("token_revocation_rejected_total", _labels(db=os.path.basename(path)), s["rejected"])
+
+
+# ----- Hooks do Flask e do querylog -----
+
+def _route_labels():
+    rule = request.url_rule.rule if request.url_rule is not None else "<sem rota>"
+    return request.blueprint or "app", rule
+
+
+def before_request():
+    blueprint, rule = _route_labels()
+    g._metrics = (time.perf_counter(), blueprint, rule)
+    registry.track(_labels(blueprint=blueprint), 1)
+
+
+def after_request(response):
+    if "_metrics" in g:
+        g._metrics_status = response.status_code
+    return response
+
+
+def teardown_request(exc=None):
+    state = g.pop("_metrics", None)
+    if state is None:
+        return
+    t0, blueprint, rule = state
+    status = g.pop("_metrics_status", 500)
+    registry.track(_labels(blueprint=blueprint), -1)
+    registry.inc("http_requests_total", _labels(blueprint=blueprint, route=rule, method=request.method, status=status))
+    registry.observe(
+        "http_request_duration_seconds",
+        _labels(blueprint=blueprint, route=rule, method=request.method),
+        time.perf_counter() - t0, config.METRICS_BUCKETS,
+    )
+
+
+def on_query(sql, elapsed, error):
+    registry.observe("sqlite_query_duration_seconds", _labels(statement=_statement(sql)),
+                     elapsed, config.METRICS_DB_BUCKETS)
+    if error is not None:
+        # Pelo código e não pela mensagem: "database is locked" é SQLITE_BUSY (outra
+        # conexão segura o banco); SQLITE_LOCKED é conflito dentro da mesma conexão.
+        # & 0xff reduz os códigos estendidos (SQLITE_BUSY_SNAPSHOT, ...) ao primário
+        code = getattr(error, "sqlite_errorcode", None)
+        code = code & 0xff if code is not None else None
+        kind = {sqlite3.SQLITE_BUSY: "busy", sqlite3.SQLITE_LOCKED: "locked"}.get(code, "other")
+        registry.inc("sqlite_errors_total", _labels(kind=kind))
+
+
+# ----- Modo multiprocesso (arquivos compartilhados) -----
+
+_flusher = {"thread": None, "pid": None}
+_flusher_lock = threading.Lock()
+
+
+def _snapshot_path(pid=None):
+    return os.path.join(config.METRICS_MULTIPROC_DIR, f"metrics-{pid or os.getpid()}.json")
+
+
+def flush():
+    os.makedirs(config.METRICS_MULTIPROC_DIR, exist_ok=True)
+    path = _snapshot_path()
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(registry.snapshot(), f)
+    os.replace(tmp, path)
+
+
+def _flush_loop():
+    while True:
+        time.sleep(config.METRICS_FLUSH_INTERVAL)
+        try:
+            flush()
+        except Exception as e:
+            print("Erro ao gravar métricas:", e)
+
+
+def _start_flusher():
+    with _flusher_lock:
+        # Por pid: cada worker do gunicorn tem a própria thread e o próprio arquivo
+        if _flusher["pid"] != os.getpid():
+            thread = threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True)
+            thread.start()
+            _flusher.update(thread=thread, pid=os.getpid())
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+DEAD_FILE = "metrics-dead.json"
+
+
+@contextmanager
+def _dir_lock(exclusive):
+    # Leitores compartilham; compact é exclusivo, senão um /metrics no meio da
+    # troca veria o worker morto duas vezes (ou nenhuma) e o contador pularia
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(config.METRICS_MULTIPROC_DIR, exist_ok=True)
+    with open(os.path.join(config.METRICS_MULTIPROC_DIR, ".lock"), "w") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+
+
+def _snapshots():
+    for name in os.listdir(config.METRICS_MULTIPROC_DIR):
+        if not (name.startswith("metrics-") and name.endswith(".json")):
+            continue
+        path = os.path.join(config.METRICS_MULTIPROC_DIR, name)
+        try:
+            with open(path, encoding="utf-8") as f:
+                yield path, json.load(f)
+        except (OSError, ValueError):
+            continue
+
+
+def _add(merged, snap):
+    for metric, series in snap["counters"].items():
+        for labels, value in series.items():
+            merged["counters"][metric][labels] += value
+    for metric, series in snap["histograms"].items():
+        for labels, values in series.items():
+            current = merged["histograms"][metric].get(labels)
+            merged["histograms"][metric][labels] = (
+                values if current is None else [a + b for a, b in zip(current, values)]
+            )
+
+
+def _empty():
+    return {"counters": defaultdict(lambda: defaultdict(float)),
+            "histograms": defaultdict(dict), "gauges": defaultdict(lambda: defaultdict(float))}
+
+
+def _merged():
+    if not config.METRICS_MULTIPROC_DIR:
+        return registry.snapshot()
+
+    flush()
+    merged = _empty()
+    with _dir_lock(exclusive=False):
+        for _, snap in _snapshots():
+            _add(merged, snap)
+            if snap.get("pid") and _alive(snap["pid"]):
+                for metric, series in snap["gauges"].items():
+                    for labels, value in series.items():
+                        merged["gauges"][metric][labels] += value
+    return merged
+
+
+def compact(pids=None):
+    """
+    Junta os arquivos de workers mortos (ou só dos pids dados) em metrics-dead.json
+    e apaga os originais. O gunicorn chama no child_exit do master.
+    """
+    if not config.METRICS_MULTIPROC_DIR or not os.path.isdir(config.METRICS_MULTIPROC_DIR):
+        return []
+    with _dir_lock(exclusive=True):
+        dead = _empty()
+        done = []
+        for path, snap in _snapshots():
+            pid = snap.get("pid")
+            if pid is None:
+                _add(dead, snap)
+            elif (pids is None or pid in pids) and not _alive(pid):
+                _add(dead, snap)
+                done.append(path)
+        if not done:
+            return []
+
+        path = os.path.join(config.METRICS_MULTIPROC_DIR, DEAD_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"pid": None, "time": time.time(), "counters": dead["counters"],
+                       "histograms": dead["histograms"], "gauges": {}}, f)
+        os.replace(tmp, path)
+        for done_path in done:
+            os.remove(done_path)
+        return done
+
+
+# ----- Formato texto -----
+
+def _format(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _series(name, labels, value, extra=""):
+    inner = ",".join(filter(None, (labels, extra)))
+    return f"{name}{{{inner}}} {_format(value)}" if inner else f"{name} {_format(value)}"
+
+
+def render(snapshot=None):
+    snap = snapshot or _merged()
+    counters, histograms, gauges = snap["counters"], snap["histograms"], snap["gauges"]
+
+    # Razão de acerto calculada depois da soma entre processos (não se soma razões)
+    hits, misses = counters.get("cache_hits_total", {}), counters.get("cache_misses_total", {})
+    gauges = {k: dict(v) for k, v in gauges.items()}
+    gauges["cache_hit_ratio"] = {
+        labels: round(hits[labels] / (hits[labels] + misses.get(labels, 0)), 6)
+        for labels in hits if hits[labels] + misses.get(labels, 0)
+    }
+
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        source = {"counter": counters, "gauge": gauges, "histogram": histograms}[kind].get(name)
+        if not source:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in sorted(source.items()):
+            if kind != "histogram":
+                lines.append(_series(name, labels, value))
+                continue
+            buckets = config.METRICS_DB_BUCKETS if name.startswith("sqlite_") else config.METRICS_BUCKETS
+            cumulative = 0
+            for bound, count in zip(buckets, value):
+                cumulative += count
+                lines.append(_series(f"{name}_bucket", labels, cumulative, f'le="{_format(bound)}"'))
+            lines.append(_series(f"{name}_bucket", labels, value[-1], 'le="+Inf"'))
+            lines.append(_series(f"{name}_sum", labels, value[-2]))
+            lines.append(_series(f"{name}_count", labels, value[-1]))
+    return "\n".join(lines) + "\n"
+
+
+@metrics.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    if config.METRICS_TOKEN:
+        auth_header = request.headers.get("Authorization", "")
+        token = auth_header.split(" ")[1] if auth_header.startswith("Bearer ") else ""
+        if not hmac.compare_digest(token, config.METRICS_TOKEN):
+            return jsonify({"error": "Acesso negado"}), 403
+    return Response(render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def reset():
+    # Depois de um fork: o worker começa do zero e com o próprio arquivo
+    registry.reset()
+    with _flusher_lock:
+        _flusher.update(thread=None, pid=None)
+    if config.METRICS_ENABLED and config.METRICS_MULTIPROC_DIR:
+        _start_flusher()
+
+
+def init_app(app):
+    if not config.METRICS_ENABLED:
+        return
+    app.before_request(before_request)
+    app.after_request(after_request)
+    app.teardown_request(teardown_request)
+    querylog.add_listener(on_query)
+    app.register_blueprint(metrics)
+    if config.METRICS_MULTIPROC_DIR:
+        _start_flusher()
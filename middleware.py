@@ -0,0 +1,47 @@
+from functools import wraps
+from flask import g, request, jsonify
+
+from utils import verify_token
+from users import get_user
+
+
+def bearer_token(query_token=False):
+    auth_header = request.headers.get("Authorization", "")
+    if auth_header.startswith("Bearer "):
+        return auth_header.split(" ")[1]
+    # Só as rotas de busca de barbeiros aceitam o token na query (?token=);
+    # nas demais ele iria parar em URLs e logs
+    return request.args.get("token") if query_token else None
+
+
+def login_required(view=None, *, load_user=True, query_token=False, **extra):
+    """
+    Decodifica o token uma vez por requisição e guarda o payload em g.claims
+    e o usuário (do cache de users.get_user) em g.user.
+
+    `extra` entra nas respostas de erro para manter o formato de cada rota,
+    ex.: @login_required(data=[]). Com load_user=False só o token é validado;
+    com query_token=True o ?token= também vale.
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            token = bearer_token(query_token)
+            if not token:
+                return jsonify({"error": "Token não fornecido", **extra}), 401
+
+            decoded = verify_token(token)
+            if not decoded:
+                return jsonify({"error": "Token inválido ou expirado", **extra}), 401
+            g.claims = decoded
+
+            if load_user:
+                user = get_user(decoded.get("email"))
+                if not user:
+                    return jsonify({"error": "Usuário não encontrado", **extra}), 404
+                g.user = user
+
+            return f(*args, **kwargs)
+        return wrapper
+
+    return decorator(view) if view is not None else decorator
@@ -0,0 +1,218 @@
+import os
+import re
+import sqlite3
+import sys
+from datetime import datetime
+
+import config
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+# Arquivos no formato 0001_descricao.sql, aplicados em ordem e nunca revertidos
+MIGRATION_FILE = re.compile(r"^(\d{4})_(\w+)\.sql$")
+
+
+# Consultas quentes e o índice que cada uma deve usar (conferido com EXPLAIN QUERY PLAN)
+HOT_QUERIES = [
+    (
+        "agendamentos do dia",
+        "SELECT service_id, barber_id FROM appointments WHERE datetime >= ? AND datetime < ?",
+        ("2025-01-01", "2025-01-02"),
+        "idx_appointments_datetime",
+    ),
+    (
+        "agendamentos do usuário",
+        "SELECT id FROM appointments WHERE user_email = ? ORDER BY datetime DESC",
+        ("a@a.com",),
+        "idx_appointments_user_datetime",
+    ),
+    (
+        "disponibilidade por barbeiro e data",
+        "SELECT id FROM availability WHERE barber_id = ? AND date = ?",
+        (1, "2025-01-01"),
+        "idx_availability_barber_date",
+    ),
+    (
+        "horários de uma disponibilidade",
+        "SELECT id, hour, is_booked FROM availability_hours WHERE availability_id = ? ORDER BY hour",
+        (1,),
+        "idx_availability_hours_availability",
+    ),
+    (
+        "horários personalizados do barbeiro",
+        "SELECT id, time, active FROM barber_custom_hours WHERE barber_id = ? AND date = ? ORDER BY time",
+        (1, "2025-01-01"),
+        "idx_barber_custom_hours_barber_date_time",
+    ),
+    (
+        "comanda aberta por número",
+        "SELECT id, barber_id, status FROM orders WHERE order_number = ? AND status = 'aberta' "
+        "ORDER BY opened_at DESC LIMIT 1",
+        ("1",),
+        "idx_orders_order_number",
+    ),
+    (
+        "itens da comanda",
+        "SELECT price, qtd FROM order_items WHERE order_id = ?",
+        (1,),
+        "idx_order_items_order",
+    ),
+    (
+        "movimentações do produto",
+        "SELECT id FROM stock_control WHERE product_id = ?",
+        (1,),
+        "idx_stock_control_product",
+    ),
+    (
+        "fluxo de caixa do período",
+        "SELECT id, description, amount, type FROM cashflow WHERE datetime >= ? AND datetime < ? "
+        "ORDER BY datetime DESC",
+        ("2025-01-01", "2025-01-02"),
+        "idx_cashflow_datetime",
+    ),
+]
+
+
+def list_migrations(directory=MIGRATIONS_DIR):
+    migrations = []
+    for name in sorted(os.listdir(directory)):
+        match = MIGRATION_FILE.match(name)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(directory, name)))
+    return migrations
+
+
+def split_statements(sql):
+    # Separa o script em comandos completos (respeitando triggers com BEGIN ... END)
+    statements, buffer = [], ""
+    for line in sql.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            if buffer.strip():
+                statements.append(buffer.strip())
+            buffer = ""
+    if buffer.strip() and not all(l.strip().startswith("--") for l in buffer.strip().splitlines()):
+        raise ValueError("Comando SQL incompleto no final da migração")
+    return statements
+
+
+def ensure_version_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+    """)
+    conn.commit()
+
+
+def current_version(conn):
+    ensure_version_table(conn)
+    return applied_version(conn)
+
+
+def applied_version(conn):
+    # Só lê: serve em conexões query_only (ex.: /ready); sem schema_migrations é 0
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_migrations'"
+    ).fetchone()
+    if not exists:
+        return 0
+    row = conn.execute("SELECT MAX(version) FROM schema_migrations").fetchone()
+    return row[0] or 0
+
+
+def pending_migrations(conn, directory=MIGRATIONS_DIR):
+    version = current_version(conn)
+    return [m for m in list_migrations(directory) if m[0] > version]
+
+
+def pending_migrations_readonly(conn, directory=MIGRATIONS_DIR):
+    version = applied_version(conn)
+    return [m for m in list_migrations(directory) if m[0] > version]
+
+
+def apply_migration(conn, version, name, path):
+    with open(path, encoding="utf-8") as f:
+        statements = split_statements(f.read())
+
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None
+    try:
+        # BEGIN IMMEDIATE serializa workers que sobem ao mesmo tempo
+        conn.execute("BEGIN IMMEDIATE")
+        already = conn.execute("SELECT 1 FROM schema_migrations WHERE version = ?", (version,)).fetchone()
+        if already:
+            conn.execute("ROLLBACK")
+            return False
+
+        for statement in statements:
+            conn.execute(statement)
+
+        conn.execute(
+            "INSERT INTO schema_migrations (version, name, applied_at) VALUES (?, ?, ?)",
+            (version, name, datetime.now().isoformat(timespec="seconds"))
+        )
+        conn.execute("COMMIT")
+        return True
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.isolation_level = isolation_level
+
+
+def upgrade(conn, directory=MIGRATIONS_DIR):
+    applied = []
+    for version, name, path in pending_migrations(conn, directory):
+        if apply_migration(conn, version, name, path):
+            applied.append(f"{version:04d}_{name}")
+    return applied
+
+
+def explain(conn, sql, params=()):
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()]
+
+
+def check_query_plans(conn):
+    failures = []
+    for label, sql, params, index in HOT_QUERIES:
+        plan = explain(conn, sql, params)
+        if not any(index in step for step in plan):
+            failures.append((label, index, plan))
+    return failures
+
+
+def main(argv):
+    path = config.DB_PATH
+    conn = sqlite3.connect(path, timeout=config.DB_BUSY_TIMEOUT)
+
+    try:
+        if "--status" in argv:
+            print(f"{path}: versão {current_version(conn)}")
+            for version, name, _ in pending_migrations(conn):
+                print(f"  pendente: {version:04d}_{name}")
+            return 0
+
+        applied = upgrade(conn)
+        for name in applied:
+            print(f"Migração aplicada: {name}")
+        if not applied:
+            print(f"{path} já está na versão {current_version(conn)}")
+
+        if "--check" in argv:
+            failures = check_query_plans(conn)
+            for label, index, plan in failures:
+                print(f"[FALHA] {label}: esperado {index}, plano = {plan}")
+            if failures:
+                return 1
+            print(f"Todas as {len(HOT_QUERIES)} consultas quentes usam índice.")
+        return 0
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
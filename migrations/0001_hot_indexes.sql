@@ -0,0 +1,39 @@
+-- Índices para as consultas mais frequentes (agenda, disponibilidade, comandas, estoque e caixa)
+
+-- Bancos antigos foram criados sem esta tabela
+CREATE TABLE IF NOT EXISTS stock_control (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    product_id INTEGER NOT NULL,
+    type TEXT CHECK(type IN ('entrada', 'saida')) NOT NULL,
+    quantity REAL NOT NULL,
+    description TEXT,
+    datetime TEXT DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY(product_id) REFERENCES products(id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_appointments_datetime
+    ON appointments (datetime, barber_id, service_id);
+
+CREATE INDEX IF NOT EXISTS idx_appointments_user_datetime
+    ON appointments (user_email, datetime);
+
+CREATE INDEX IF NOT EXISTS idx_availability_barber_date
+    ON availability (barber_id, date);
+
+CREATE INDEX IF NOT EXISTS idx_availability_hours_availability
+    ON availability_hours (availability_id, hour, is_booked);
+
+CREATE INDEX IF NOT EXISTS idx_barber_custom_hours_barber_date_time
+    ON barber_custom_hours (barber_id, date, time, active);
+
+CREATE INDEX IF NOT EXISTS idx_orders_order_number
+    ON orders (order_number, status, opened_at);
+
+CREATE INDEX IF NOT EXISTS idx_order_items_order
+    ON order_items (order_id);
+
+CREATE INDEX IF NOT EXISTS idx_stock_control_product
+    ON stock_control (product_id);
+
+CREATE INDEX IF NOT EXISTS idx_cashflow_datetime
+    ON cashflow (datetime);
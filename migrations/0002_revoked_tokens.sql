@@ -0,0 +1,14 @@
+-- Tokens revogados no logout. Só o sha256 do token é guardado; a linha pode
+-- ser apagada depois de expires_at (epoch em segundos), quando o JWT já não vale.
+-- O id crescente permite que os outros processos carreguem só o que é novo.
+
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    digest BLOB NOT NULL UNIQUE,
+    email TEXT,
+    expires_at INTEGER NOT NULL,
+    revoked_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_revoked_tokens_expires
+    ON revoked_tokens (expires_at);
@@ -0,0 +1,20 @@
+-- Refresh tokens com rotação: cada uso gera um novo token na mesma família e
+-- marca o anterior (used_at). Um token já usado que volte a aparecer indica
+-- vazamento, e a família inteira é revogada. Só o sha256 do token é guardado.
+
+CREATE TABLE IF NOT EXISTS refresh_tokens (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    token_hash BLOB NOT NULL UNIQUE,
+    family TEXT NOT NULL,
+    email TEXT NOT NULL,
+    expires_at INTEGER NOT NULL,
+    used_at INTEGER,
+    revoked INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_refresh_tokens_family
+    ON refresh_tokens (family);
+
+CREATE INDEX IF NOT EXISTS idx_refresh_tokens_expires
+    ON refresh_tokens (expires_at);
@@ -0,0 +1,7 @@
+-- Fotos e depoimentos são lidos por barbeiro (consulta.load_barber_profiles)
+
+CREATE INDEX IF NOT EXISTS idx_photos_barber
+    ON photos (barber_id);
+
+CREATE INDEX IF NOT EXISTS idx_testimonials_barber
+    ON testimonials (barber_id);
@@ -0,0 +1,54 @@
+-- Busca por proximidade (/barbers/nearby): índice espacial dos barbeiros e um
+-- contador de versão por tabela, para quem guarda dados em memória (geo.py)
+-- saber quando recarregar.
+
+CREATE VIRTUAL TABLE IF NOT EXISTS barbers_geo USING rtree(
+    id,
+    min_lat, max_lat,
+    min_lng, max_lng
+);
+
+INSERT OR REPLACE INTO barbers_geo (id, min_lat, max_lat, min_lng, max_lng)
+SELECT id, lat, lat, lng, lng FROM barbers WHERE lat IS NOT NULL AND lng IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS table_versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+INSERT OR IGNORE INTO table_versions (name, version) VALUES ('barbers', 0);
+
+CREATE TRIGGER IF NOT EXISTS barbers_geo_insert AFTER INSERT ON barbers
+WHEN NEW.lat IS NOT NULL AND NEW.lng IS NOT NULL
+BEGIN
+    INSERT OR REPLACE INTO barbers_geo (id, min_lat, max_lat, min_lng, max_lng)
+    VALUES (NEW.id, NEW.lat, NEW.lat, NEW.lng, NEW.lng);
+END;
+
+CREATE TRIGGER IF NOT EXISTS barbers_geo_update AFTER UPDATE OF id, lat, lng ON barbers
+BEGIN
+    DELETE FROM barbers_geo WHERE id = OLD.id;
+    INSERT INTO barbers_geo (id, min_lat, max_lat, min_lng, max_lng)
+    SELECT NEW.id, NEW.lat, NEW.lat, NEW.lng, NEW.lng
+    WHERE NEW.lat IS NOT NULL AND NEW.lng IS NOT NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS barbers_geo_delete AFTER DELETE ON barbers
+BEGIN
+    DELETE FROM barbers_geo WHERE id = OLD.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS barbers_version_insert AFTER INSERT ON barbers
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'barbers';
+END;
+
+CREATE TRIGGER IF NOT EXISTS barbers_version_update AFTER UPDATE ON barbers
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'barbers';
+END;
+
+CREATE TRIGGER IF NOT EXISTS barbers_version_delete AFTER DELETE ON barbers
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'barbers';
+END;
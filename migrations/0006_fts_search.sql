@@ -0,0 +1,106 @@
+-- Busca textual (search.py): tabelas FTS5 de conteúdo externo, sem cópia dos
+-- dados, mantidas pelos triggers abaixo. unicode61 com remove_diacritics 2
+-- ignora acentos e maiúsculas ("João" = "joao"); os índices de prefixo de 2 e 3
+-- letras deixam rápida a busca enquanto o usuário digita.
+
+CREATE VIRTUAL TABLE IF NOT EXISTS barbers_fts USING fts5(
+    name, loc,
+    content = 'barbers', content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS clients_fts USING fts5(
+    name, phone, email,
+    content = 'clients', content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS services_fts USING fts5(
+    name,
+    content = 'services', content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+    name, description,
+    content = 'products', content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+);
+
+-- Dados que já existiam
+INSERT INTO barbers_fts (barbers_fts) VALUES ('rebuild');
+INSERT INTO clients_fts (clients_fts) VALUES ('rebuild');
+INSERT INTO services_fts (services_fts) VALUES ('rebuild');
+INSERT INTO products_fts (products_fts) VALUES ('rebuild');
+
+-- barbers
+CREATE TRIGGER IF NOT EXISTS barbers_fts_insert AFTER INSERT ON barbers
+BEGIN
+    INSERT INTO barbers_fts (rowid, name, loc) VALUES (NEW.id, NEW.name, NEW.loc);
+END;
+
+CREATE TRIGGER IF NOT EXISTS barbers_fts_delete AFTER DELETE ON barbers
+BEGIN
+    INSERT INTO barbers_fts (barbers_fts, rowid, name, loc) VALUES ('delete', OLD.id, OLD.name, OLD.loc);
+END;
+
+CREATE TRIGGER IF NOT EXISTS barbers_fts_update AFTER UPDATE OF id, name, loc ON barbers
+BEGIN
+    INSERT INTO barbers_fts (barbers_fts, rowid, name, loc) VALUES ('delete', OLD.id, OLD.name, OLD.loc);
+    INSERT INTO barbers_fts (rowid, name, loc) VALUES (NEW.id, NEW.name, NEW.loc);
+END;
+
+-- clients
+CREATE TRIGGER IF NOT EXISTS clients_fts_insert AFTER INSERT ON clients
+BEGIN
+    INSERT INTO clients_fts (rowid, name, phone, email) VALUES (NEW.id, NEW.name, NEW.phone, NEW.email);
+END;
+
+CREATE TRIGGER IF NOT EXISTS clients_fts_delete AFTER DELETE ON clients
+BEGIN
+    INSERT INTO clients_fts (clients_fts, rowid, name, phone, email)
+    VALUES ('delete', OLD.id, OLD.name, OLD.phone, OLD.email);
+END;
+
+CREATE TRIGGER IF NOT EXISTS clients_fts_update AFTER UPDATE OF id, name, phone, email ON clients
+BEGIN
+    INSERT INTO clients_fts (clients_fts, rowid, name, phone, email)
+    VALUES ('delete', OLD.id, OLD.name, OLD.phone, OLD.email);
+    INSERT INTO clients_fts (rowid, name, phone, email) VALUES (NEW.id, NEW.name, NEW.phone, NEW.email);
+END;
+
+-- services
+CREATE TRIGGER IF NOT EXISTS services_fts_insert AFTER INSERT ON services
+BEGIN
+    INSERT INTO services_fts (rowid, name) VALUES (NEW.id, NEW.name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS services_fts_delete AFTER DELETE ON services
+BEGIN
+    INSERT INTO services_fts (services_fts, rowid, name) VALUES ('delete', OLD.id, OLD.name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS services_fts_update AFTER UPDATE OF id, name ON services
+BEGIN
+    INSERT INTO services_fts (services_fts, rowid, name) VALUES ('delete', OLD.id, OLD.name);
+    INSERT INTO services_fts (rowid, name) VALUES (NEW.id, NEW.name);
+END;
+
+-- products
+CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products
+BEGIN
+    INSERT INTO products_fts (rowid, name, description) VALUES (NEW.id, NEW.name, NEW.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products
+BEGIN
+    INSERT INTO products_fts (products_fts, rowid, name, description)
+    VALUES ('delete', OLD.id, OLD.name, OLD.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS products_fts_update AFTER UPDATE OF id, name, description ON products
+BEGIN
+    INSERT INTO products_fts (products_fts, rowid, name, description)
+    VALUES ('delete', OLD.id, OLD.name, OLD.description);
+    INSERT INTO products_fts (rowid, name, description) VALUES (NEW.id, NEW.name, NEW.description);
+END;
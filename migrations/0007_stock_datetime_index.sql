@@ -0,0 +1,4 @@
+-- /stock/all e /stock/movimentacoes listam da movimentação mais recente para a
+-- mais antiga; o cursor da paginação (pagination.py) continua por (datetime, id).
+CREATE INDEX IF NOT EXISTS idx_stock_control_datetime
+    ON stock_control (datetime, id);
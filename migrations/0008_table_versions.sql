@@ -0,0 +1,179 @@
+-- Contadores de versão (table_versions, da 0005) para as tabelas por trás das
+-- respostas com ETag (etag.py): serviços, produtos, pacotes e perfis de barbeiros.
+-- Cada INSERT/UPDATE/DELETE incrementa o contador da tabela.
+
+-- Bancos antigos foram criados sem as tabelas de pacotes
+CREATE TABLE IF NOT EXISTS packages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    price REAL NOT NULL,
+    duration INTEGER, -- minutos
+    expiration_date TEXT
+);
+
+CREATE TABLE IF NOT EXISTS package_services (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    package_id INTEGER,
+    service_id INTEGER,
+    FOREIGN KEY(package_id) REFERENCES packages(id),
+    FOREIGN KEY(service_id) REFERENCES services(id)
+);
+
+-- 'epoch' muda quando o banco é criado de novo (init_db, datagen): contadores
+-- que recomeçam do zero não repetem ETags de dados antigos
+INSERT OR IGNORE INTO table_versions (name, version) VALUES ('epoch', abs(random() % 1000000000000));
+
+INSERT OR IGNORE INTO table_versions (name, version) VALUES
+    ('photos', 0),
+    ('testimonials', 0),
+    ('availability', 0),
+    ('availability_hours', 0),
+    ('services', 0),
+    ('barber_services', 0),
+    ('products', 0),
+    ('packages', 0),
+    ('package_services', 0);
+
+-- photos
+CREATE TRIGGER IF NOT EXISTS photos_version_insert AFTER INSERT ON photos
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'photos';
+END;
+
+CREATE TRIGGER IF NOT EXISTS photos_version_update AFTER UPDATE ON photos
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'photos';
+END;
+
+CREATE TRIGGER IF NOT EXISTS photos_version_delete AFTER DELETE ON photos
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'photos';
+END;
+
+-- testimonials
+CREATE TRIGGER IF NOT EXISTS testimonials_version_insert AFTER INSERT ON testimonials
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'testimonials';
+END;
+
+CREATE TRIGGER IF NOT EXISTS testimonials_version_update AFTER UPDATE ON testimonials
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'testimonials';
+END;
+
+CREATE TRIGGER IF NOT EXISTS testimonials_version_delete AFTER DELETE ON testimonials
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'testimonials';
+END;
+
+-- availability
+CREATE TRIGGER IF NOT EXISTS availability_version_insert AFTER INSERT ON availability
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'availability';
+END;
+
+CREATE TRIGGER IF NOT EXISTS availability_version_update AFTER UPDATE ON availability
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'availability';
+END;
+
+CREATE TRIGGER IF NOT EXISTS availability_version_delete AFTER DELETE ON availability
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'availability';
+END;
+
+-- availability_hours
+CREATE TRIGGER IF NOT EXISTS availability_hours_version_insert AFTER INSERT ON availability_hours
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'availability_hours';
+END;
+
+CREATE TRIGGER IF NOT EXISTS availability_hours_version_update AFTER UPDATE ON availability_hours
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'availability_hours';
+END;
+
+CREATE TRIGGER IF NOT EXISTS availability_hours_version_delete AFTER DELETE ON availability_hours
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'availability_hours';
+END;
+
+-- services
+CREATE TRIGGER IF NOT EXISTS services_version_insert AFTER INSERT ON services
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'services';
+END;
+
+CREATE TRIGGER IF NOT EXISTS services_version_update AFTER UPDATE ON services
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'services';
+END;
+
+CREATE TRIGGER IF NOT EXISTS services_version_delete AFTER DELETE ON services
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'services';
+END;
+
+-- barber_services
+CREATE TRIGGER IF NOT EXISTS barber_services_version_insert AFTER INSERT ON barber_services
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'barber_services';
+END;
+
+CREATE TRIGGER IF NOT EXISTS barber_services_version_update AFTER UPDATE ON barber_services
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'barber_services';
+END;
+
+CREATE TRIGGER IF NOT EXISTS barber_services_version_delete AFTER DELETE ON barber_services
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'barber_services';
+END;
+
+-- products
+CREATE TRIGGER IF NOT EXISTS products_version_insert AFTER INSERT ON products
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'products';
+END;
+
+CREATE TRIGGER IF NOT EXISTS products_version_update AFTER UPDATE ON products
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'products';
+END;
+
+CREATE TRIGGER IF NOT EXISTS products_version_delete AFTER DELETE ON products
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'products';
+END;
+
+-- packages
+CREATE TRIGGER IF NOT EXISTS packages_version_insert AFTER INSERT ON packages
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'packages';
+END;
+
+CREATE TRIGGER IF NOT EXISTS packages_version_update AFTER UPDATE ON packages
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'packages';
+END;
+
+CREATE TRIGGER IF NOT EXISTS packages_version_delete AFTER DELETE ON packages
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'packages';
+END;
+
+-- package_services
+CREATE TRIGGER IF NOT EXISTS package_services_version_insert AFTER INSERT ON package_services
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'package_services';
+END;
+
+CREATE TRIGGER IF NOT EXISTS package_services_version_update AFTER UPDATE ON package_services
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'package_services';
+END;
+
+CREATE TRIGGER IF NOT EXISTS package_services_version_delete AFTER DELETE ON package_services
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'package_services';
+END;
@@ -0,0 +1,8 @@
+-- stock_control.datetime pode ser NULL, e (NULL, id) < (?, ?) nunca é verdadeiro:
+-- a paginação de /stock/all perdia essas movimentações. O cursor passa a usar
+-- COALESCE(datetime, '') (NULL continua no fim da lista, como antes), e o índice
+-- acompanha a expressão.
+DROP INDEX IF EXISTS idx_stock_control_datetime;
+
+CREATE INDEX IF NOT EXISTS idx_stock_control_datetime
+    ON stock_control (COALESCE(datetime, ''), id);
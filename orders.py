@@ -1,31 +1,19 @@
 import datetime
 from flask import Blueprint, request, jsonify
-from utils import verify_token
-from users import get_user
-import sqlite3
+from middleware import login_required
 from consulta import delete_order_item_by_id, fetch_all_orders, delete_order_by_id, get_order_by_id
+import pagination
 from database import get_db, close_connection
+from writequeue import write
 
 orders = Blueprint("orders", __name__, url_prefix="/orders")
 
 
 
 @orders.route("/create", methods=["POST"])
+@login_required
 def create_order():
     try:
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            return jsonify({"error": "Token não fornecido"}), 401
-
-        token = auth_header.split(" ")[1]
-        decoded = verify_token(token)
-        if not decoded:
-            return jsonify({"error": "Token inválido"}), 401
-
-        user = get_user(decoded.get("email"))
-        if not user:
-            return jsonify({"error": "Usuário não encontrado"}), 404
-
         opened_at = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
 
         data = request.get_json()
@@ -85,7 +73,7 @@ def create_order():
 @orders.route("/<int:id>/items", methods=["GET"])
 def list_items(id):
     try:
-        conn = sqlite3.connect("database.db")
+        conn = get_db(readonly=True)
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -123,7 +111,6 @@ def list_items(id):
         cursor.execute("SELECT total, status FROM orders WHERE id = ?", (id,))
         data = cursor.fetchone()
 
-        conn.close()
 
         if not data:
             return jsonify({"error": "Comanda não encontrada"}), 404
@@ -169,21 +156,9 @@ def list_items(id):
 # 🔹 Listar todas as comandas
 # =========================================
 @orders.route('/all', methods=['GET'])
+@login_required(data=[])
 def get_all_orders():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido", "data": []}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({"error": "Token inválido", "data": []}), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({"error": "Usuário não encontrado", "data": []}), 404
-
-    return fetch_all_orders()
+    return fetch_all_orders(pagination.from_request())
 
 
 
@@ -191,20 +166,8 @@ def get_all_orders():
 # 🔹 Cancelar/deletar comanda
 # =========================================
 @orders.route('/<int:id>/cancel', methods=['DELETE'])
+@login_required
 def cancel_orders(id):
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({"error": "Token inválido"}), 401
-
-    user = get_user(decoded["email"])
-    if not user:
-        return jsonify({"error": "Usuário não encontrado"}), 404
-
     orders = get_order_by_id(id)
     if not orders:
         return jsonify({"error": "Comanda não encontrada"}), 404
@@ -220,7 +183,7 @@ def cancel_orders(id):
 @orders.route("/<int:order_id>/items/<int:item_id>", methods=["DELETE"])
 def delete_item(order_id, item_id):
     try:
-        conn = sqlite3.connect("database.db")
+        conn = get_db()
         cursor = conn.cursor()
 
         
@@ -242,7 +205,6 @@ def delete_item(order_id, item_id):
         """, (order_id, order_id))
 
         conn.commit()
-        conn.close()
 
         return jsonify({
             "success": True,
@@ -269,8 +231,7 @@ def finalizar_order(order_number):
         forma_pagamento = data.get("forma_pagamento")
         desconto = float(data.get("desconto") or 0)
 
-        conn = sqlite3.connect("database.db")
-        conn.row_factory = sqlite3.Row
+        conn = get_db()
         cur = conn.cursor()
 
         cur.execute("""
@@ -322,7 +283,6 @@ def finalizar_order(order_number):
         ))
 
         conn.commit()
-        conn.close()
 
         return jsonify({
             "order_id": order_id,
@@ -348,7 +308,7 @@ def finalizar_order(order_number):
 @orders.route("/<int:order_id>", methods=["GET"])
 def get_order(order_id):
     try:
-        conn = sqlite3.connect("database.db")
+        conn = get_db(readonly=True)
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -369,7 +329,6 @@ def get_order(order_id):
         """, (order_id,))
         items = cursor.fetchall()
 
-        conn.close()
 
         return jsonify({
             "order": {
@@ -395,22 +354,28 @@ def get_order(order_id):
         return jsonify({"error": "Erro ao buscar comanda", "details": str(e)}), 500
 
 
-@orders.route("/item", methods=["POST"])
-def add_order_item():
-    # --- Autenticação ---
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
+def _insert_order_item(conn, order_id, service_id, qtd, price):
+    # --- Inserir item ---
+    conn.execute("""
+        INSERT INTO order_items (order_id, service_id, qtd, price)
+        VALUES (?, ?, ?, ?)
+    """, (order_id, service_id, qtd, price))
 
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({"error": "Token inválido"}), 401
+    # --- Atualizar total da comanda ---
+    conn.execute("""
+        UPDATE orders
+        SET total = (
+            SELECT SUM(qtd * price)
+            FROM order_items
+            WHERE order_id = ?
+        )
+        WHERE id = ?
+    """, (order_id, order_id))
 
-    user = get_user(decoded["email"])
-    if not user:
-        return jsonify({"error": "Usuário não encontrado"}), 404
 
+@orders.route("/item", methods=["POST"])
+@login_required
+def add_order_item():
     # --- Dados recebidos ---
     data = request.get_json()
     order_id = data.get("comanda_id")
@@ -425,7 +390,7 @@ def add_order_item():
         return jsonify({"error": "Campos obrigatórios faltando"}), 400
 
     try:
-        conn = sqlite3.connect("database.db")
+        conn = get_db(readonly=True)
         cursor = conn.cursor()
 
         # --- Buscar preço do serviço (tabela barber_services) ---
@@ -442,25 +407,7 @@ def add_order_item():
         price = float(row[0])
         total_item = price * qtd
 
-        # --- Inserir item ---
-        cursor.execute("""
-            INSERT INTO order_items (order_id, service_id, qtd, price)
-            VALUES (?, ?, ?, ?)
-        """, (order_id, service_id, qtd, price))
-
-        # --- Atualizar total da comanda ---
-        cursor.execute("""
-            UPDATE orders
-            SET total = (
-                SELECT SUM(qtd * price)
-                FROM order_items
-                WHERE order_id = ?
-            )
-            WHERE id = ?
-        """, (order_id, order_id))
-
-        conn.commit()
-        conn.close()
+        write(_insert_order_item, order_id, service_id, qtd, price)
 
         return jsonify({
             "success": True,
@@ -476,8 +423,7 @@ def add_order_item():
 @orders.route("/number/<order_number>", methods=["GET"])
 def get_order_by_number(order_number):
     try:
-        conn = sqlite3.connect("database.db")
-        conn.row_factory = sqlite3.Row  # permite acessar por nome
+        conn = get_db(readonly=True)
         cur = conn.cursor()
 
         # Buscar comanda + nome do cliente
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
-from utils import verify_token
-from users import get_user
+from middleware import login_required
+import pagination
+from etag import etag
 from consulta import delete_package, get_package_by_id, fetch_all_package, fetch_all_package_movements #insert_package, update_package
 
 
@@ -11,41 +12,16 @@ package = Blueprint('package', __name__, url_prefix='/package')
 
 
 @package.route('/all', methods=['GET'])
+@login_required(data=[])
+@etag("packages", "package_services", "services")
 def get_all_package():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({ "error": "Token inválido ou expirado", "data": [] }), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({ "error": "Usuário não encontrado", "data": [] }), 404
-
-
-    
-    return fetch_all_package()
+    return fetch_all_package(pagination.from_request())
 
 
 
 @package.route('/movimentacoes', methods=['POST'])
+@login_required(data=[])
 def get_all_package_movements():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({ "error": "Token inválido ou expirado", "data": [] }), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({ "error": "Usuário não encontrado", "data": [] }), 404
-
     data = request.get_json()
     name = data.get("name")
     
@@ -55,20 +31,8 @@ def get_all_package_movements():
 
 
 @package.route('/update', methods=['PUT'])  
+@login_required(data=[])
 def update_package():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({"error": "Token inválido ou expirado", "data": [] }), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({ "error": "Usuário não encontrado", "data": [] }), 404
-
     data = request.get_json()
     id = data.get("id")
     product_id = data.get(" product_id")
@@ -86,21 +50,8 @@ def update_package():
 
 
 @package.route('/delete/<int:package_id>', methods=['DELETE'])  
+@login_required
 def delete_package_route(package_id):
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-
-    if not decoded:
-        return jsonify({"error": "Token inválido"}), 401
-
-    user = get_user(decoded["email"])
-    if not user:
-        return jsonify({"error": "Usuário não encontrado"}), 404
-
     package = get_package_by_id(package_id)
     if not package:
         return jsonify({"error": "Produto não encontrado"}), 404
@@ -114,20 +65,8 @@ def delete_package_route(package_id):
 
 
 @package.route('/package', methods=['POST'])
+@login_required
 def create_package_route():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({"error": "Token inválido ou expirado"}), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({"error": "Usuário não encontrado"}), 404
-
     data = request.get_json()
     product_id = data.get('product_id')
     quantity = data.get('quantity')
@@ -0,0 +1,120 @@
+"""
+Paginação das listagens (/clients/all, /products/all, /barbers/all, ...).
+
+    GET /products/all?limit=50&cursor=...&fields=id,name
+
+O cursor é keyset: guarda a chave da última linha da página (id, ou data + id)
+e a próxima página começa com WHERE chave > cursor usando o índice, sem OFFSET
+e sem reler as linhas já enviadas. fields= devolve só os campos pedidos de
+cada item; campos que o endpoint não tem são ignorados.
+"""
+import base64
+import binascii
+import json
+from collections import namedtuple
+
+from flask import jsonify, request
+
+import config
+
+
+class PageError(ValueError):
+    pass
+
+
+class Page(namedtuple("Page", ["limit", "after", "fields"])):
+    __slots__ = ()
+
+    def wants(self, *names):
+        """Algum desses campos vai na resposta? (para não carregar o que será descartado)"""
+        return self.fields is None or any(name in self.fields for name in names)
+
+    def pick(self, item):
+        if self.fields is None:
+            return item
+        return {key: value for key, value in item.items() if key in self.fields}
+
+    def info(self, next_cursor):
+        return {"limit": self.limit, "next_cursor": next_cursor, "has_more": next_cursor is not None}
+
+
+def encode_cursor(values):
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise PageError("Cursor inválido") from None
+    # Só escalares vão para o bind do sqlite; bool é int para o isinstance, mas não é chave
+    if (not isinstance(values, list) or not values
+            or any(isinstance(v, bool) or not isinstance(v, (str, int, float)) for v in values)):
+        raise PageError("Cursor inválido")
+    return values
+
+
+def from_request(args=None):
+    """Page com limit, cursor e fields da query string (request.args por padrão)."""
+    args = request.args if args is None else args
+
+    limit = args.get("limit", "")
+    try:
+        limit = int(limit) if limit != "" else config.PAGE_DEFAULT_LIMIT
+    except ValueError:
+        raise PageError("limit deve ser um número") from None
+    if limit <= 0:
+        raise PageError("limit deve ser positivo")
+
+    cursor = args.get("cursor")
+    fields = args.get("fields")
+    if fields is not None:
+        fields = frozenset(f.strip() for f in fields.split(",") if f.strip()) or None
+
+    return Page(min(limit, config.PAGE_MAX_LIMIT), decode_cursor(cursor) if cursor else None, fields)
+
+
+def fetch_page(conn, select, page, key=("id",), where=None, params=(), descending=False, fetch=None):
+    """
+    Uma página de select (SELECT ... FROM ..., sem WHERE/ORDER BY): (rows, next_cursor).
+    key são as colunas da ordenação, únicas juntas (a última costuma ser o id),
+    e precisam vir no resultado com o mesmo nome (um alias do SELECT serve).
+    fetch(conn, sql, params) troca o conn.execute(...).fetchall() padrão
+    (ex.: records.fetch_all).
+    """
+    conditions = [where] if where else []
+    params = tuple(params)
+    if page.after is not None:
+        if len(page.after) != len(key):
+            raise PageError("Cursor inválido")
+        # (a, b) > (?, ?) é a comparação de tuplas do SQLite: continua exatamente de onde parou
+        op = '<' if descending else '>'
+        if len(key) > 1:
+            # Limite só na primeira coluna: sem ele o SQLite não usa o índice de
+            # expressão (ex.: COALESCE) para começar do cursor
+            conditions.append(f"{key[0]} {op}= ?")
+            params += (page.after[0],)
+        conditions.append(f"({', '.join(key)}) {op} ({', '.join('?' * len(key))})")
+        params += tuple(page.after)
+
+    direction = "DESC" if descending else "ASC"
+    sql = select
+    if conditions:
+        sql += " WHERE " + " AND ".join(f"({c})" for c in conditions)
+    sql += " ORDER BY " + ", ".join(f"{column} {direction}" for column in key) + " LIMIT ?"
+    params += (page.limit + 1,)
+
+    rows = fetch(conn, sql, params) if fetch else conn.execute(sql, params).fetchall()
+    if len(rows) <= page.limit:
+        return rows, None
+    rows = rows[:page.limit]
+    last = rows[-1]
+    return rows, encode_cursor(last[column.split(".")[-1]] for column in key)
+
+
+def init_app(app):
+    @app.errorhandler(PageError)
+    def page_error(e):
+        return jsonify({ "error": str(e), "data": [] }), 400
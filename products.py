@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify
-from utils import verify_token
-from users import get_user
+from middleware import login_required
 from consulta import delete_products, fetch_all_products, fetch_search_products, get_products_by_id, insert_products, update_products
+from search import page_args
+import pagination
+from etag import etag
 
 
 
@@ -11,40 +13,15 @@ products = Blueprint('products', __name__, url_prefix='/products')
 
 
 @products.route('/all', methods=['GET'])
+@login_required(data=[])
+@etag("products")
 def get_all_products():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({ "error": "Token inválido ou expirado", "data": [] }), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({ "error": "Usuário não encontrado", "data": [] }), 404
-
-
-    
-    return fetch_all_products()
+    return fetch_all_products(pagination.from_request())
 
 
 @products.route('/products', methods=['POST'])  
+@login_required(data=[])
 def create_products_route():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({"error": "Token inválido ou expirado", "data": [] }), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({ "error": "Usuário não encontrado", "data": [] }), 404
-
     data = request.get_json()
     if not data or "name" not in data:
         return jsonify({ "error": "Campos obrigatórios não preenchidos" }), 400
@@ -61,45 +38,21 @@ def create_products_route():
 
 
 @products.route('/name', methods=['POST'])  
+@login_required(data=[])
 def get_search_products():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({"error": "Token inválido ou expirado", "data": [] }), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({ "error": "Usuário não encontrado", "data": [] }), 404
-
     data = request.get_json()
     name = data.get("name")
 
     if not name:
         return jsonify({ "error": "Nome não fornecido", "data": [] }), 400
 
-    return fetch_search_products(name)
+    return fetch_search_products(name, *page_args(data))
 
 
 
 @products.route('/update', methods=['PUT'])  
+@login_required(data=[])
 def update_product():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({"error": "Token inválido ou expirado", "data": [] }), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({ "error": "Usuário não encontrado", "data": [] }), 404
-
     data = request.get_json()
     id = data.get("id")
     name = data.get("name")
@@ -116,21 +69,8 @@ def update_product():
 
 
 @products.route('/delete/<int:products_id>', methods=['DELETE'])  
+@login_required
 def delete_products_route(products_id):
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-
-    if not decoded:
-        return jsonify({"error": "Token inválido"}), 401
-
-    user = get_user(decoded["email"])
-    if not user:
-        return jsonify({"error": "Usuário não encontrado"}), 404
-
     products = get_products_by_id(products_id)
     if not products:
         return jsonify({"error": "Produto não encontrado"}), 404
@@ -143,6 +83,7 @@ def delete_products_route(products_id):
 
 
 @products.route('/list', methods=['GET'])
+@etag("products")
 def list_products():
-    return fetch_all_products()
+    return fetch_all_products(pagination.from_request())
 
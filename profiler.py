@@ -0,0 +1,248 @@
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+from datetime import datetime
+
+from flask import g, request
+
+import config
+
+# Um perfil por vez: cProfile não convive bem com dois profilers ativos no mesmo processo
+_busy = threading.Lock()
+_counter = {"n": 0}
+_counter_lock = threading.Lock()
+
+# Cache do arquivo de ativação (compartilhado entre os workers pelo disco)
+_toggle = {"mtime": None, "checked": 0.0, "value": None}
+_toggle_lock = threading.Lock()
+
+PROFILE_NAME = re.compile(r"^[\w.-]+\.prof$")
+
+
+def _toggle_path():
+    return os.path.join(config.PROFILE_DIR, "toggle.json")
+
+
+def get_toggle():
+    """Ativação feita pelo /admin/profiler, relida do disco no máximo a cada 1s."""
+    now = time.monotonic()
+    with _toggle_lock:
+        if now - _toggle["checked"] < 1.0:
+            return _toggle["value"]
+        _toggle["checked"] = now
+        try:
+            mtime = os.path.getmtime(_toggle_path())
+        except OSError:
+            _toggle.update(mtime=None, value=None)
+            return None
+        if mtime != _toggle["mtime"]:
+            try:
+                with open(_toggle_path(), encoding="utf-8") as f:
+                    _toggle["value"] = json.load(f)
+            except (OSError, ValueError):
+                _toggle["value"] = None
+            _toggle["mtime"] = mtime
+        value = _toggle["value"]
+    if value and value.get("until") and value["until"] < time.time():
+        return None
+    return value
+
+
+def set_toggle(target, rate=1.0, minutes=10):
+    """
+    target: endpoint do Flask (ex.: "barbers.get_all_barbers") ou prefixo de
+    caminho começando com "/" (ex.: "/barbers"). rate: fração das requisições.
+    """
+    os.makedirs(config.PROFILE_DIR, exist_ok=True)
+    value = {
+        "target": target,
+        "rate": max(0.0, min(1.0, float(rate))),
+        "until": time.time() + float(minutes) * 60,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    tmp = _toggle_path() + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(value, f)
+    os.replace(tmp, _toggle_path())
+    with _toggle_lock:
+        _toggle["checked"] = 0.0
+    return value
+
+
+def clear_toggle():
+    try:
+        os.remove(_toggle_path())
+    except FileNotFoundError:
+        pass
+    with _toggle_lock:
+        _toggle["checked"] = 0.0
+
+
+def _matches(target):
+    if target.startswith("/"):
+        return request.path.startswith(target)
+    return request.endpoint == target
+
+
+def _trigger():
+    # Cabeçalho: só com o ADMIN_TOKEN, para ninguém de fora ligar o profiler
+    if config.PROFILE_HEADER and request.headers.get(config.PROFILE_HEADER):
+        token = request.headers.get("X-Admin-Token", "")
+        if config.ADMIN_TOKEN and hmac.compare_digest(token, config.ADMIN_TOKEN):
+            return "header"
+
+    toggle = get_toggle()
+    if toggle and _matches(toggle["target"]) and random.random() < toggle.get("rate", 1.0):
+        return "toggle"
+    return None
+
+
+def start_profile():
+    trigger = _trigger()
+    if trigger is None or not _busy.acquire(blocking=False):
+        return
+    try:
+        profile = cProfile.Profile()
+        profile.enable()
+    except ValueError:
+        # Outro profiler (ex.: debugger) já está ativo
+        _busy.release()
+        return
+    g._profile = (profile, trigger, time.perf_counter(), datetime.now())
+
+
+def note_response(response):
+    if "_profile" in g:
+        g._profile_status = response.status_code
+        response.headers["X-Profile-Id"] = g._profile_name = _next_name()
+    return response
+
+
+def finish_profile(exc=None):
+    state = g.pop("_profile", None)
+    if state is None:
+        return
+    profile, trigger, t0, started = state
+    try:
+        profile.disable()
+        elapsed = time.perf_counter() - t0
+        name = g.pop("_profile_name", None) or _next_name()
+        status = g.pop("_profile_status", 500 if exc else None)
+        _save(profile, name, {
+            "method": request.method,
+            "path": request.path,
+            "query": request.query_string.decode(errors="replace"),
+            "endpoint": request.endpoint,
+            "status": status,
+            "error": repr(exc) if exc else None,
+            "duration_ms": round(elapsed * 1000, 3),
+            "trigger": trigger,
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name,
+            "started_at": started.isoformat(timespec="milliseconds"),
+        })
+    except Exception as e:
+        print("Erro ao salvar perfil:", e)
+    finally:
+        _busy.release()
+
+
+def _next_name():
+    with _counter_lock:
+        _counter["n"] += 1
+        n = _counter["n"]
+    endpoint = re.sub(r"[^\w.-]", "_", request.endpoint or "sem_rota")
+    return f"{datetime.now():%Y%m%d-%H%M%S}-{endpoint}-{os.getpid()}-{n}.prof"
+
+
+def _top(profile, limit=15):
+    out = io.StringIO()
+    stats = pstats.Stats(profile, stream=out)
+    stats.sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
+
+
+def _save(profile, name, meta):
+    os.makedirs(config.PROFILE_DIR, exist_ok=True)
+    path = os.path.join(config.PROFILE_DIR, name)
+    profile.dump_stats(path)
+    meta = dict(meta, file=name, top=_top(profile))
+    with open(path[:-len(".prof")] + ".json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+    prune()
+
+
+def _newest_first():
+    if not os.path.isdir(config.PROFILE_DIR):
+        return []
+    stamped = []
+    for name in os.listdir(config.PROFILE_DIR):
+        if PROFILE_NAME.match(name):
+            try:
+                stamped.append((os.path.getmtime(os.path.join(config.PROFILE_DIR, name)), name))
+            except OSError:
+                pass  # apagado por outro worker no meio da listagem
+    return [name for _, name in sorted(stamped, reverse=True)]
+
+
+def list_profiles(limit=None):
+    profiles = []
+    for name in _newest_first():
+        try:
+            with open(os.path.join(config.PROFILE_DIR, name[:-len(".prof")] + ".json"), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = {"file": name}
+        meta.pop("top", None)
+        profiles.append(meta)
+        if limit and len(profiles) >= limit:
+            break
+    return profiles
+
+
+def profile_path(name):
+    # Só nomes gerados aqui: nada de ../ no download
+    if not PROFILE_NAME.match(name):
+        return None
+    path = os.path.join(config.PROFILE_DIR, name)
+    return path if os.path.isfile(path) else None
+
+
+# Chaves aceitas por pstats.Stats.sort_stats (?sort= no /admin/profiles/<nome>)
+SORT_KEYS = sorted(pstats.Stats.sort_arg_dict_default)
+
+
+def profile_text(name, sort="cumulative", limit=50):
+    path = profile_path(name)
+    if path is None:
+        return None
+    out = io.StringIO()
+    pstats.Stats(path, stream=out).sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+def prune(keep=None):
+    keep = config.PROFILE_KEEP if keep is None else keep
+    names = _newest_first()
+    removed = 0
+    for name in names[keep:]:
+        for path in (name, name[:-len(".prof")] + ".json"):
+            try:
+                os.remove(os.path.join(config.PROFILE_DIR, path))
+            except FileNotFoundError:
+                pass
+        removed += 1
+    return removed
+
+
+def init_app(app):
+    app.before_request(start_profile)
+    app.after_request(note_response)
+    app.teardown_request(finish_profile)
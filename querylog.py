@@ -0,0 +1,207 @@
+import logging
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+import config
+
+slow_log = logging.getLogger("slow_queries")
+
+_lock = threading.Lock()
+_stats = {}
+# Funções chamadas a cada comando: fn(sql, elapsed, error) (ex.: metrics.py)
+_listeners = []
+
+# Módulos que são infraestrutura: o "chamador" é o primeiro frame fora deles
+_INTERNAL_MODULES = {__name__, "database", "sqlite3", "contextlib"}
+
+
+def _configure_slow_log():
+    if slow_log.handlers or not config.SLOW_QUERY_LOG:
+        return
+    handler = logging.FileHandler(config.SLOW_QUERY_LOG, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    slow_log.addHandler(handler)
+    slow_log.setLevel(logging.WARNING)
+    slow_log.propagate = False
+
+
+_configure_slow_log()
+
+
+def normalize(sql):
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+def _caller():
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module not in _INTERNAL_MODULES:
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "?"
+
+
+def add_listener(fn):
+    if fn not in _listeners:
+        _listeners.append(fn)
+
+
+def record(sql, elapsed, rows, caller, error=None):
+    # error: a exceção do sqlite3 quando o comando falhou
+    for listener in _listeners:
+        listener(sql, elapsed, error)
+
+    key = normalize(sql)
+    with _lock:
+        entry = _stats.get(key)
+        if entry is None:
+            entry = _stats[key] = {
+                "count": 0,
+                "errors": 0,
+                "rows": 0,
+                "total": 0.0,
+                "max": 0.0,
+                "samples": deque(maxlen=config.QUERY_STATS_SAMPLES),
+                "callers": Counter(),
+            }
+        entry["count"] += 1
+        entry["rows"] += rows
+        entry["total"] += elapsed
+        entry["max"] = max(entry["max"], elapsed)
+        entry["samples"].append(elapsed)
+        entry["callers"][caller] += 1
+        if error:
+            entry["errors"] += 1
+
+    elapsed_ms = elapsed * 1000
+    if elapsed_ms >= config.SLOW_QUERY_MS:
+        slow_log.warning("%.1f ms | %s | rows=%d | %s", elapsed_ms, caller, rows, key)
+
+
+def _percentile(ordered, p):
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def snapshot(limit=None, order="total"):
+    with _lock:
+        items = [(sql, dict(e, samples=sorted(e["samples"]), callers=e["callers"].most_common(5)))
+                 for sql, e in _stats.items()]
+
+    result = []
+    for sql, e in items:
+        samples = e["samples"]
+        result.append({
+            "sql": sql,
+            "count": e["count"],
+            "errors": e["errors"],
+            "rows": e["rows"],
+            "rows_per_call": round(e["rows"] / e["count"], 2),
+            "total_ms": round(e["total"] * 1000, 3),
+            "avg_ms": round(e["total"] * 1000 / e["count"], 3),
+            "p50_ms": round(_percentile(samples, 50) * 1000, 3),
+            "p95_ms": round(_percentile(samples, 95) * 1000, 3),
+            "p99_ms": round(_percentile(samples, 99) * 1000, 3),
+            "max_ms": round(e["max"] * 1000, 3),
+            "callers": [{"caller": c, "count": n} for c, n in e["callers"]],
+        })
+
+    keys = {"total": "total_ms", "count": "count", "p99": "p99_ms", "avg": "avg_ms", "rows": "rows"}
+    result.sort(key=lambda r: r[keys.get(order, "total_ms")], reverse=True)
+    return result[:limit] if limit else result
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    # A amostra de cada comando soma o execute com a primeira leitura: no sqlite3
+    # o execute só avança até a primeira linha, o resto acontece no fetch.
+    _pending = None
+
+    def _start(self, sql, run):
+        self._finish()
+        caller = _caller()
+        start = time.perf_counter()
+        try:
+            run()
+        except sqlite3.Error as e:
+            record(sql, time.perf_counter() - start, 0, caller, error=e)
+            raise
+        self._pending = [sql, time.perf_counter() - start, 0, caller]
+        if self.description is None:
+            self._finish()
+        return self
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            record(*pending)
+
+    def _fetched(self, elapsed, rows, done):
+        if self._pending is not None:
+            self._pending[1] += elapsed
+            self._pending[2] += rows
+            if done:
+                self._finish()
+
+    def execute(self, sql, parameters=()):
+        return self._start(sql, lambda: super(InstrumentedCursor, self).execute(sql, parameters))
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._start(sql, lambda: super(InstrumentedCursor, self).executemany(sql, seq_of_parameters))
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(time.perf_counter() - start, 0 if row is None else 1, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(time.perf_counter() - start, len(rows), not rows)
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(time.perf_counter() - start, len(rows), True)
+        return rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(time.perf_counter() - start, 0, True)
+            raise
+        self._fetched(time.perf_counter() - start, 1, False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        self._finish()
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
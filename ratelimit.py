@@ -0,0 +1,183 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask import request
+
+import config
+
+
+class RateLimited(Exception):
+    """Limite estourado: a rota responde 429 com Retry-After."""
+
+    def __init__(self, retry_after, scope=""):
+        super().__init__(f"Limite de tentativas excedido ({scope})")
+        self.retry_after = retry_after
+        self.scope = scope
+
+
+def parse_limit(text):
+    # "10/300" = 10 eventos a cada 300 segundos; vazio ou "0" desliga
+    count, _, seconds = (text or "0").partition("/")
+    return int(count), float(seconds or 60)
+
+
+def _apply(state, now, limit, window, count):
+    """
+    Janela deslizante aproximada: guarda só o contador da janela fixa atual e
+    o da anterior, e pondera a anterior pela fração que ainda cai na janela.
+    Retorna (novo_estado, permitido, retry_after).
+    """
+    start = math.floor(now / window) * window
+    if state is None or state[0] < start - window:
+        prev, curr = 0, 0
+    elif state[0] < start:
+        prev, curr = state[2], 0
+    else:
+        prev, curr = state[1], state[2]
+
+    # Uma consulta (count=0) pergunta se mais uma tentativa passaria
+    needed = max(count, 1)
+    elapsed = now - start
+    estimate = prev * (window - elapsed) / window + curr
+    if estimate + needed > limit:
+        if curr + needed > limit:
+            # Só na próxima janela, e ainda esperando a atual "escorrer"
+            wait = (window - elapsed) + window * (1 - (limit - needed) / curr)
+        else:
+            wait = window * (1 - (limit - curr - needed) / prev) - elapsed
+        return (start, prev, curr), False, max(1, math.ceil(wait))
+    return (start, prev, curr + count), True, 0
+
+
+class MemoryBackend:
+    def __init__(self, max_keys=None):
+        self.max_keys = max_keys or config.RATE_LIMIT_MAX_KEYS
+        self.states = OrderedDict()
+        self.lock = threading.Lock()
+
+    def hit(self, key, limit, window, count, now):
+        with self.lock:
+            state, allowed, retry_after = _apply(self.states.get(key), now, limit, window, count)
+            if count or key in self.states:
+                self.states[key] = state
+                self.states.move_to_end(key)
+                while len(self.states) > self.max_keys:
+                    self.states.popitem(last=False)
+            return allowed, retry_after
+
+    def reset(self, key):
+        with self.lock:
+            self.states.pop(key, None)
+
+
+class SQLiteBackend:
+    """
+    Estado compartilhado entre os workers do gunicorn num arquivo SQLite à
+    parte, para não disputar o writer do banco principal.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or config.RATE_LIMIT_DB
+        self.local = threading.local()
+        self.next_gc = 0.0
+
+    def _conn(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None or getattr(self.local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=config.DB_BUSY_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rate_limits (
+                    key TEXT PRIMARY KEY,
+                    window_start REAL NOT NULL,
+                    prev INTEGER NOT NULL,
+                    curr INTEGER NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            self.local.conn, self.local.pid = conn, os.getpid()
+        return conn
+
+    def hit(self, key, limit, window, count, now):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT window_start, prev, curr FROM rate_limits WHERE key = ?", (key,)
+            ).fetchone()
+            state, allowed, retry_after = _apply(row, now, limit, window, count)
+            if count:
+                conn.execute("""
+                    INSERT INTO rate_limits (key, window_start, prev, curr, expires_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET
+                        window_start = excluded.window_start, prev = excluded.prev,
+                        curr = excluded.curr, expires_at = excluded.expires_at
+                """, (key, *state, state[0] + 2 * window))
+            if now >= self.next_gc:
+                self.next_gc = now + 60
+                conn.execute("DELETE FROM rate_limits WHERE expires_at < ?", (now,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, retry_after
+
+    def reset(self, key):
+        self._conn().execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = SQLiteBackend() if config.RATE_LIMIT_SHARED else MemoryBackend()
+        return _backend
+
+
+class Limiter:
+    def __init__(self, name, limit):
+        self.name = name
+        self.limit, self.window = parse_limit(limit)
+
+    def hit(self, key, count=1):
+        # count=0 só consulta, sem contar a tentativa
+        if not config.RATE_LIMIT_ENABLED or self.limit <= 0 or not key:
+            return
+        allowed, retry_after = backend().hit(
+            f"{self.name}:{key}", self.limit, self.window, count, time.time()
+        )
+        if not allowed:
+            raise RateLimited(retry_after, self.name)
+
+    def check(self, key):
+        self.hit(key, count=0)
+
+    def reset(self, key):
+        if config.RATE_LIMIT_ENABLED and key:
+            backend().reset(f"{self.name}:{key}")
+
+
+# Tentativas por IP contam todas as requisições; por email só as senhas erradas
+login_ip = Limiter("login_ip", config.RATE_LIMIT_LOGIN_IP)
+login_email = Limiter("login_email", config.RATE_LIMIT_LOGIN_EMAIL)
+
+
+def client_ip():
+    if config.RATE_LIMIT_TRUST_PROXY:
+        # Cada proxy acrescenta à direita; o que vem antes dos nossos o cliente
+        # escreve como quiser, então conta RATE_LIMIT_PROXY_HOPS a partir do fim
+        hops = max(config.RATE_LIMIT_PROXY_HOPS, 1)
+        forwarded = [ip.strip() for ip in request.headers.get("X-Forwarded-For", "").split(",") if ip.strip()]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.remote_addr
@@ -0,0 +1,60 @@
+from collections import namedtuple
+
+
+def record_type(name, fields):
+    # Tupla com __slots__ vazio: nenhum dict por linha, mas continua aceitando
+    # user["email"], user.get("avatar") e dict(user) como o código já faz
+    base = namedtuple(name, fields)
+
+    class Record(base):
+        __slots__ = ()
+
+        def __getitem__(self, key):
+            if isinstance(key, str):
+                try:
+                    return getattr(self, key)
+                except AttributeError:
+                    raise KeyError(key) from None
+            return tuple.__getitem__(self, key)
+
+        def get(self, key, default=None):
+            return getattr(self, key, default)
+
+        def keys(self):
+            return self._fields
+
+    Record.__name__ = Record.__qualname__ = name
+    return Record
+
+
+User = record_type("User", ["id", "name", "email", "password", "avatar"])
+Barber = record_type("Barber", ["id", "name", "avatar", "stars", "lat", "lng", "loc"])
+
+USER_COLUMNS = ", ".join(User._fields)
+BARBER_COLUMNS = ", ".join(Barber._fields)
+
+
+def _cursor(conn, sql, params):
+    cur = conn.cursor()
+    # Sem sqlite3.Row: o sqlite devolve tuplas e elas viram o record direto
+    cur.row_factory = None
+    cur.execute(sql, params)
+    return cur
+
+
+def fetch_one(conn, record, sql, params=()):
+    row = _cursor(conn, sql, params).fetchone()
+    return record._make(row) if row is not None else None
+
+
+def fetch_all(conn, record, sql, params=()):
+    return list(map(record._make, _cursor(conn, sql, params).fetchall()))
+
+
+def fetch_rows(conn, sql, params=()):
+    # Tuplas puras, para quem monta o resultado na mão (ex.: consulta.load_barber_profiles)
+    return _cursor(conn, sql, params).fetchall()
+
+
+def as_dicts(records):
+    return [r._asdict() for r in records]
@@ -0,0 +1,95 @@
+import hashlib
+import secrets
+import threading
+import time
+
+import config
+from writequeue import write
+
+
+class RefreshError(Exception):
+    def __init__(self, reason):
+        super().__init__(reason)
+        # "invalid" (desconhecido/expirado) ou "reused" (família revogada)
+        self.reason = reason
+
+
+def _hash(token):
+    return hashlib.sha256(token.encode()).digest()
+
+
+def _insert(conn, token_hash, family, email, now):
+    conn.execute(
+        "INSERT INTO refresh_tokens (token_hash, family, email, expires_at) VALUES (?, ?, ?, ?)",
+        (token_hash, family, email, now + config.REFRESH_TOKEN_TTL)
+    )
+
+
+_gc_lock = threading.Lock()
+_next_gc = 0.0
+
+
+def _collect(conn, now):
+    # Apaga famílias vencidas de tempos em tempos (no máximo uma vez por REVOCATION_GC_INTERVAL)
+    global _next_gc
+    with _gc_lock:
+        if time.monotonic() < _next_gc:
+            return
+        _next_gc = time.monotonic() + config.REVOCATION_GC_INTERVAL
+    conn.execute("DELETE FROM refresh_tokens WHERE expires_at <= ?", (now,))
+
+
+def _issue(conn, email, token_hash, now):
+    _insert(conn, token_hash, secrets.token_hex(16), email, now)
+    _collect(conn, now)
+
+
+def issue(email):
+    """Novo refresh token (nova família), entregue no login/cadastro."""
+    token = secrets.token_urlsafe(32)
+    write(_issue, email, _hash(token), int(time.time()))
+    return token
+
+
+def _rotate(conn, token_hash, new_hash, now):
+    # Uma busca pelo índice único já consome o token, sem corrida entre dois refresh
+    row = conn.execute("""
+        UPDATE refresh_tokens SET used_at = ?
+        WHERE token_hash = ? AND used_at IS NULL AND revoked = 0 AND expires_at > ?
+        RETURNING family, email
+    """, (now, token_hash, now)).fetchone()
+    if row is not None:
+        family, email = row
+        _insert(conn, new_hash, family, email, now)
+        return "ok", email
+
+    old = conn.execute(
+        "SELECT family, used_at, revoked FROM refresh_tokens WHERE token_hash = ?", (token_hash,)
+    ).fetchone()
+    if old is not None and (old[1] is not None or old[2]):
+        # Reuso de um token já trocado: quem tinha a cópia perde a sessão toda.
+        # Retorna em vez de levantar exceção para o UPDATE ser confirmado.
+        conn.execute("UPDATE refresh_tokens SET revoked = 1 WHERE family = ?", (old[0],))
+        return "reused", None
+    return "invalid", None
+
+
+def rotate(token):
+    """Troca o refresh token por um novo da mesma família. Retorna (email, novo_token)."""
+    new_token = secrets.token_urlsafe(32)
+    status, email = write(_rotate, _hash(token), _hash(new_token), int(time.time()))
+    if status != "ok":
+        raise RefreshError(status)
+    return email, new_token
+
+
+def _revoke_family(conn, token_hash):
+    conn.execute("""
+        UPDATE refresh_tokens SET revoked = 1
+        WHERE family = (SELECT family FROM refresh_tokens WHERE token_hash = ?)
+    """, (token_hash,))
+
+
+def revoke(token):
+    # Logout: encerra a família do token (todas as renovações dessa sessão)
+    write(_revoke_family, _hash(token))
@@ -0,0 +1,162 @@
+import sqlite3
+import threading
+import time
+
+from flask import g, has_request_context
+
+import config
+from database import DB_PATH
+from writequeue import write
+
+
+class _Store:
+    """
+    Tokens revogados de um arquivo de banco: um dict em memória (digest -> exp)
+    na frente da tabela revoked_tokens. A consulta por requisição é só um
+    lookup no dict; a cada REVOCATION_SYNC_INTERVAL o PRAGMA data_version diz
+    se algum outro processo gravou no banco e, se sim, carrega as linhas novas.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.revoked = {}
+        self.last_id = 0
+        self.data_version = None
+        self.next_sync = 0.0
+        self.next_gc = 0.0
+        self.conn = None
+        self.lock = threading.Lock()
+        self.stats = {"checks": 0, "rejected": 0, "syncs": 0, "loaded": 0, "collected": 0}
+
+    def _connect(self):
+        # Conexão própria e fixa: data_version só muda entre leituras da mesma conexão
+        if self.conn is None:
+            self.conn = sqlite3.connect(
+                f"file:{self.path}?mode=ro", uri=True,
+                timeout=config.DB_BUSY_TIMEOUT, check_same_thread=False,
+            )
+        return self.conn
+
+    def sync(self, force=False):
+        now = time.monotonic()
+        if not force and now < self.next_sync:
+            return
+        self.next_sync = now + config.REVOCATION_SYNC_INTERVAL
+        try:
+            conn = self._connect()
+            version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if not force and version == self.data_version:
+                return
+            rows = conn.execute(
+                "SELECT id, digest, expires_at FROM revoked_tokens WHERE id > ? AND expires_at > ?",
+                (self.last_id, int(time.time()))
+            ).fetchall()
+            self.data_version = version
+        except sqlite3.Error as e:
+            # Banco sem a migração 0002 ainda: nada revogado
+            if "no such table" not in str(e):
+                print(f"Erro ao sincronizar tokens revogados ({self.path}):", e)
+            return
+
+        for row_id, digest, expires_at in rows:
+            self.revoked[bytes(digest)] = expires_at
+            self.last_id = max(self.last_id, row_id)
+        self.stats["syncs"] += 1
+        self.stats["loaded"] += len(rows)
+        self._prune()
+
+    def _prune(self):
+        now = time.time()
+        expired = [d for d, exp in self.revoked.items() if exp <= now]
+        for digest in expired:
+            del self.revoked[digest]
+
+    def is_revoked(self, digest):
+        with self.lock:
+            self.sync()
+            self.stats["checks"] += 1
+            if digest in self.revoked:
+                self.stats["rejected"] += 1
+                return True
+            return False
+
+    def add(self, digest, expires_at):
+        with self.lock:
+            self.revoked[digest] = expires_at
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def _current_path():
+    path = g.get("db_path") if has_request_context() else None
+    return path or DB_PATH
+
+
+def store_for(path=None):
+    path = path or _current_path()
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = _Store(path)
+        return store
+
+
+def is_revoked(digest, path=None):
+    return store_for(path).is_revoked(digest)
+
+
+def _insert(conn, digest, email, expires_at):
+    conn.execute(
+        "INSERT OR IGNORE INTO revoked_tokens (digest, email, expires_at) VALUES (?, ?, ?)",
+        (digest, email, expires_at)
+    )
+
+
+def _collect(conn, now):
+    return conn.execute("DELETE FROM revoked_tokens WHERE expires_at <= ?", (now,)).rowcount
+
+
+def revoke(digest, email, expires_at, path=None):
+    """
+    Grava a revogação (já vale neste processo na hora; nos outros em até
+    REVOCATION_SYNC_INTERVAL) e, de tempos em tempos, apaga as vencidas.
+    """
+    store = store_for(path)
+    expires_at = int(expires_at)
+    write(_insert, digest, email, expires_at)
+    store.add(digest, expires_at)
+
+    now = time.monotonic()
+    if now >= store.next_gc:
+        store.next_gc = now + config.REVOCATION_GC_INTERVAL
+        collected = write(_collect, int(time.time()))
+        with store.lock:
+            store.stats["collected"] += collected
+            store._prune()
+
+
+def stats():
+    with _stores_lock:
+        stores = list(_stores.values())
+    result = {}
+    for store in stores:
+        with store.lock:
+            result[store.path] = dict(store.stats, size=len(store.revoked))
+    return result
+
+
+def reset():
+    # Depois de um fork ou de restaurar o banco: recarrega tudo na próxima consulta
+    with _stores_lock:
+        stores = list(_stores.values())
+        _stores.clear()
+    for store in stores:
+        store.close()
@@ -0,0 +1,85 @@
+"""
+Busca textual pelas tabelas FTS5 da migração 0006 (barbers_fts, clients_fts,
+services_fts, products_fts). O tokenizador ignora acentos e maiúsculas, cada
+palavra digitada casa como prefixo ("jo sil" acha "João Silva") e o resultado
+vem ordenado por bm25, paginado com page/per_page. Por padrão a busca olha só
+a coluna name, como o LIKE que ela substituiu; column=None procura em todas.
+"""
+import re
+
+import config
+
+# tabela -> pesos do bm25 por coluna da tabela FTS, na ordem da migração
+FTS_TABLES = {
+    "barbers": "10.0, 2.0",          # name, loc
+    "clients": "10.0, 2.0, 2.0",     # name, phone, email
+    "services": "1.0",               # name
+    "products": "10.0, 1.0",         # name, description
+}
+
+_WORD = re.compile(r"\w+")
+
+
+def match_query(term, column="name"):
+    """Expressão MATCH para o que o usuário digitou; None se não sobrar palavra."""
+    words = _WORD.findall(str(term or ""))[:config.SEARCH_MAX_TERMS]
+    if not words:
+        return None
+    # Entre aspas nada vira operador do FTS5 (AND, NEAR, -, ...); o * pede prefixo
+    query = " ".join(f'"{word}"*' for word in words)
+    return f"{column} : ({query})" if column else query
+
+
+def _int(value, default):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def page_args(source):
+    """(page, per_page) de um dict (corpo JSON ou request.args), dentro dos limites."""
+    source = source or {}
+    page = max(_int(source.get("page"), 1), 1)
+    per_page = _int(source.get("per_page"), config.SEARCH_PAGE_SIZE)
+    return page, min(max(per_page, 1), config.SEARCH_MAX_PAGE_SIZE)
+
+
+def page_info(page, per_page, has_more):
+    return {"page": page, "per_page": per_page or config.SEARCH_PAGE_SIZE, "has_more": has_more}
+
+
+def search(conn, table, term, page=1, per_page=None, columns=None, fetch=None, match_column="name"):
+    """
+    Linhas de table que casam com term, das mais relevantes às menos: (rows, has_more).
+    Sem palavra nenhuma devolve a tabela toda por id. fetch(conn, sql, params)
+    troca o conn.execute(...).fetchall() padrão (ex.: records.fetch_all);
+    match_column=None busca em todas as colunas da tabela FTS.
+    """
+    per_page = per_page or config.SEARCH_PAGE_SIZE
+    columns = columns or f"{table}.*"
+    offset = (page - 1) * per_page
+    query = match_query(term, match_column)
+
+    if query is None:
+        sql = f"SELECT {columns} FROM {table} ORDER BY {table}.id LIMIT ? OFFSET ?"
+        params = (per_page + 1, offset)
+    else:
+        # O FTS5 ordena e corta a página sozinho; só as linhas dela vão para o JOIN
+        fts = f"{table}_fts"
+        sql = f"""
+            SELECT {columns}
+            FROM (
+                SELECT rowid AS match_id, bm25({fts}, {FTS_TABLES[table]}) AS match_rank
+                FROM {fts}
+                WHERE {fts} MATCH ?
+                ORDER BY match_rank, rowid
+                LIMIT ? OFFSET ?
+            ) m
+            JOIN {table} ON {table}.id = m.match_id
+            ORDER BY m.match_rank, m.match_id
+        """
+        params = (query, per_page + 1, offset)
+
+    rows = fetch(conn, sql, params) if fetch else conn.execute(sql, params).fetchall()
+    return rows[:per_page], len(rows) > per_page
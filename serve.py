@@ -0,0 +1,85 @@
+"""
+Sobe a API.
+
+    python serve.py                          # produção: gunicorn com gunicorn.conf.py
+    python serve.py --workers 4 --threads 8 --bind 127.0.0.1:8000
+    python serve.py --show                   # mostra a configuração calculada e sai
+    python serve.py --reload                 # recicla os workers do servidor em execução (HUP)
+    python serve.py --dev                    # servidor do Flask, só para desenvolvimento
+
+As opções viram variáveis SERVER_* (ver config.py), lidas pelo gunicorn.conf.py.
+"""
+import argparse
+import importlib.util
+import os
+import runpy
+import signal
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+GUNICORN_CONF = os.path.join(ROOT, "gunicorn.conf.py")
+
+SETTINGS = ["bind", "workers", "threads", "max_requests", "max_requests_jitter", "timeout",
+            "graceful_timeout", "keepalive", "preload_app", "pidfile"]
+
+
+def _read_pid():
+    import config
+    try:
+        with open(config.SERVER_PIDFILE, encoding="utf-8") as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        raise SystemExit(f"Servidor não encontrado (pidfile {config.SERVER_PIDFILE})")
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Servidor da API (gunicorn em produção)")
+    parser.add_argument("--bind", help="endereço:porta (SERVER_BIND)")
+    parser.add_argument("-w", "--workers", type=int, help="processos (SERVER_WORKERS; 0 = automático)")
+    parser.add_argument("-t", "--threads", type=int, help="threads por processo (SERVER_THREADS)")
+    parser.add_argument("--max-requests", type=int, help="recicla o worker após N requisições (0 desliga)")
+    parser.add_argument("--no-preload", action="store_true", help="cada worker importa o app sozinho")
+    parser.add_argument("--show", action="store_true", help="mostra a configuração e sai")
+    parser.add_argument("--reload", action="store_true", help="recicla os workers do servidor em execução")
+    parser.add_argument("--dev", action="store_true", help="servidor de desenvolvimento do Flask")
+    parser.add_argument("--debug", action="store_true", help="com --dev: debugger e reload automático")
+    args = parser.parse_args(argv)
+
+    overrides = {
+        "SERVER_BIND": args.bind,
+        "SERVER_WORKERS": args.workers,
+        "SERVER_THREADS": args.threads,
+        "SERVER_MAX_REQUESTS": args.max_requests,
+        "SERVER_PRELOAD": "0" if args.no_preload else None,
+    }
+    for key, value in overrides.items():
+        if value is not None:
+            os.environ[key] = str(value)
+
+    if args.reload:
+        os.kill(_read_pid(), signal.SIGHUP)
+        print("Workers sendo reciclados (HUP)")
+        return 0
+
+    if args.dev:
+        import config
+        from app import create_app
+        host, _, port = config.SERVER_BIND.rpartition(":")
+        create_app().run(host=host or "127.0.0.1", port=int(port), debug=args.debug, threaded=True)
+        return 0
+
+    if args.show:
+        settings = runpy.run_path(GUNICORN_CONF)
+        for name in SETTINGS:
+            print(f"{name:<20} {settings[name]}")
+        return 0
+
+    if importlib.util.find_spec("gunicorn") is None:
+        raise SystemExit("gunicorn não está instalado (pip install gunicorn); para testar use --dev")
+
+    os.chdir(ROOT)
+    os.execv(sys.executable, [sys.executable, "-m", "gunicorn", "-c", GUNICORN_CONF, "wsgi:app"])
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
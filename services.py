@@ -1,8 +1,10 @@
-import sqlite3
+from database import get_db
 from flask import Blueprint, request, jsonify
-from utils import verify_token
-from users import get_user
+from middleware import login_required
 from consulta import create_barber_service, delete_service, fetch_all_services, fetch_full_services, fetch_search_service, get_service_by_id, insert_service, search_service_with_barber, update_service
+from search import page_args
+import pagination
+from etag import etag
 
 
 
@@ -12,40 +14,15 @@ service = Blueprint('service', __name__, url_prefix='/service')
 
 
 @service.route('/all', methods=['GET'])
+@login_required(data=[])
+@etag("services")
 def get_all_service():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({ "error": "Token inválido ou expirado", "data": [] }), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({ "error": "Usuário não encontrado", "data": [] }), 404
-
-
-    
-    return fetch_all_services()
+    return fetch_all_services(pagination.from_request())
 
 
 @service.route('/service', methods=['POST'])  
+@login_required(data=[])
 def create_service_route():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({"error": "Token inválido ou expirado", "data": [] }), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({ "error": "Usuário não encontrado", "data": [] }), 404
-
     data = request.get_json()
     if not data or "name" not in data:
         return jsonify({ "error": "Campos obrigatórios não preenchidos" }), 400
@@ -57,43 +34,19 @@ def create_service_route():
 
 
 @service.route('/name', methods=['POST'])  
+@login_required(data=[])
 def get_search_service():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({"error": "Token inválido ou expirado", "data": [] }), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({ "error": "Usuário não encontrado", "data": [] }), 404
-
     data = request.get_json()
     name = data.get("name")
 
     if not name:
         return jsonify({ "error": "Nome não fornecido", "data": [] }), 400
 
-    return fetch_search_service(name)
+    return fetch_search_service(name, *page_args(data))
 
 @service.route('/update', methods=['PUT'])  
+@login_required(data=[])
 def update_services():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({"error": "Token inválido ou expirado", "data": [] }), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({ "error": "Usuário não encontrado", "data": [] }), 404
-
     data = request.get_json()
     id = data.get("id")
     name = data.get("name")
@@ -106,21 +59,8 @@ def update_services():
 
 
 @service.route('/delete/<int:service_id>', methods=['DELETE'])  
+@login_required
 def delete_service_route(service_id):
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-
-    if not decoded:
-        return jsonify({"error": "Token inválido"}), 401
-
-    user = get_user(decoded["email"])
-    if not user:
-        return jsonify({"error": "Usuário não encontrado"}), 404
-
     service = get_service_by_id(service_id)
     if not service:
         return jsonify({"error": "Serviço não encontrado"}), 404
@@ -149,20 +89,8 @@ def add_barber_service():
 
 
 @service.route('/barber_service/name', methods=['POST'])  
+@login_required(data=[])
 def get_search_service_name():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({"error": "Token inválido ou expirado", "data": [] }), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({ "error": "Usuário não encontrado", "data": [] }), 404
-
     data = request.get_json()
     print(data)
     name = data.get("name")
@@ -173,38 +101,15 @@ def get_search_service_name():
     return search_service_with_barber(name)
 
 @service.route('/full', methods=['GET'])
+@login_required
+@etag("services", "barber_services", "barbers")
 def get_full_services():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({"error": "Token inválido ou expirado"}), 401
-
-    user = get_user(decoded.get("email"))
-    if not user:
-        return jsonify({"error": "Usuário não encontrado"}), 404
-
     return fetch_full_services()
 
 
 @service.route('/barber/search', methods=['POST'])
+@login_required(data=[])
 def search_service_by_barber():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({"error": "Token inválido ou expirado", "data": []}), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({"error": "Usuário não encontrado", "data": []}), 404
-
     data = request.get_json()
     barber_id = data.get("barber_id")
     
@@ -214,8 +119,7 @@ def search_service_by_barber():
 
 
     try:
-        conn = sqlite3.connect("database.db")
-        conn.row_factory = sqlite3.Row
+        conn = get_db(readonly=True)
         cur = conn.cursor()
 
         cur.execute("""
@@ -234,7 +138,6 @@ WHERE bs.barber_id = ?;
         """, (barber_id,))
 
         result = [dict(row) for row in cur.fetchall()]
-        conn.close()
 
         return jsonify({
             "success": True,
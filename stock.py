@@ -1,7 +1,8 @@
 from flask import Blueprint, request, jsonify
-from utils import verify_token
-from users import get_user
+from middleware import login_required
 from consulta import delete_stock, fetch_all_stock, fetch_all_stock_movements, get_stock_by_id, insert_stock, update_stock
+from search import page_args
+import pagination
 
 
 
@@ -11,64 +12,26 @@ stock = Blueprint('stock', __name__, url_prefix='/stock')
 
 
 @stock.route('/all', methods=['GET'])
+@login_required(data=[])
 def get_all_stock():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({ "error": "Token inválido ou expirado", "data": [] }), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({ "error": "Usuário não encontrado", "data": [] }), 404
-
-
-    
-    return fetch_all_stock()
+    return fetch_all_stock(pagination.from_request())
 
 
 
 @stock.route('/movimentacoes', methods=['POST'])
+@login_required(data=[])
 def get_all_stock_movements():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({ "error": "Token inválido ou expirado", "data": [] }), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({ "error": "Usuário não encontrado", "data": [] }), 404
-
     data = request.get_json()
     name = data.get("name")
     
     # Puxa os dados do banco
-    return fetch_all_stock_movements(name)
+    return fetch_all_stock_movements(name, *page_args(data))
 
 
 
 @stock.route('/update', methods=['PUT'])  
+@login_required(data=[])
 def update_stock():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({"error": "Token inválido ou expirado", "data": [] }), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({ "error": "Usuário não encontrado", "data": [] }), 404
-
     data = request.get_json()
     id = data.get("id")
     product_id = data.get(" product_id")
@@ -86,21 +49,8 @@ def update_stock():
 
 
 @stock.route('/delete/<int:stock_id>', methods=['DELETE'])  
+@login_required
 def delete_stock_route(stock_id):
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-
-    if not decoded:
-        return jsonify({"error": "Token inválido"}), 401
-
-    user = get_user(decoded["email"])
-    if not user:
-        return jsonify({"error": "Usuário não encontrado"}), 404
-
     stock = get_stock_by_id(stock_id)
     if not stock:
         return jsonify({"error": "Produto não encontrado"}), 404
@@ -114,20 +64,8 @@ def delete_stock_route(stock_id):
 
 
 @stock.route('/stock', methods=['POST'])
+@login_required
 def create_stock_route():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return jsonify({"error": "Token não fornecido"}), 401
-
-    token = auth_header.split(" ")[1]
-    decoded = verify_token(token)
-    if not decoded:
-        return jsonify({"error": "Token inválido ou expirado"}), 401
-
-    user = get_user(decoded.get('email'))
-    if not user:
-        return jsonify({"error": "Usuário não encontrado"}), 404
-
     data = request.get_json()
     product_id = data.get('product_id')
     quantity = data.get('quantity')
@@ -0,0 +1,158 @@
+import os
+import re
+import sqlite3
+import sys
+
+from flask import g, request, jsonify
+
+import config
+from database import connection
+from migrate import upgrade
+from utils import verify_token
+
+# O id vira nome de arquivo: só letras minúsculas, números, "-" e "_"
+TENANT_ID = re.compile(r"^[a-z0-9][a-z0-9_-]{0,62}$")
+
+
+class TenantError(Exception):
+    pass
+
+
+def valid_tenant(shop):
+    return bool(shop) and TENANT_ID.match(shop) is not None
+
+
+def tenant_path(shop):
+    if shop == config.DEFAULT_TENANT:
+        return config.DB_PATH
+    if not valid_tenant(shop):
+        raise TenantError(f"Barbearia inválida: {shop!r}")
+    return os.path.join(config.TENANT_DIR, f"{shop}.db")
+
+
+def list_tenants():
+    tenants = [config.DEFAULT_TENANT]
+    if os.path.isdir(config.TENANT_DIR):
+        for name in sorted(os.listdir(config.TENANT_DIR)):
+            shop, ext = os.path.splitext(name)
+            if ext == ".db" and valid_tenant(shop) and shop != config.DEFAULT_TENANT:
+                tenants.append(shop)
+    return tenants
+
+
+def _token_shop():
+    auth_header = request.headers.get("Authorization", "")
+    if not auth_header.startswith("Bearer "):
+        return None
+    decoded = verify_token(auth_header.split(" ")[1])
+    return decoded.get("shop") if decoded else None
+
+
+def bind_tenant():
+    """
+    before_request: escolhe a barbearia pelo claim "shop" do JWT ou, sem token,
+    pelo cabeçalho TENANT_HEADER / ?shop. get_db() abre o arquivo dela.
+    """
+    token_shop = _token_shop()
+    requested = request.headers.get(config.TENANT_HEADER) or request.args.get("shop")
+
+    if token_shop and requested and requested != token_shop:
+        return jsonify({"error": "Token não pertence a esta barbearia"}), 403
+
+    shop = token_shop or requested or config.DEFAULT_TENANT
+    try:
+        path = tenant_path(shop)
+    except TenantError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Não cria arquivos para ids desconhecidos: barbearias novas passam por create_tenant
+    if not os.path.exists(path):
+        return jsonify({"error": "Barbearia não encontrada"}), 404
+
+    g.tenant = shop
+    g.db_path = path
+
+
+def create_tenant(shop, template_path=None):
+    """Cria o banco da barbearia copiando o schema (sem os dados) do banco padrão."""
+    path = tenant_path(shop)
+    if os.path.exists(path):
+        raise TenantError(f"Barbearia já existe: {shop}")
+    os.makedirs(config.TENANT_DIR, exist_ok=True)
+
+    template = sqlite3.connect(template_path or config.DB_PATH)
+    try:
+        schema = template.execute("""
+            SELECT type, sql FROM sqlite_master
+            WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'
+            ORDER BY CASE type WHEN 'table' THEN 0 WHEN 'index' THEN 1 ELSE 2 END
+        """).fetchall()
+        migrations = template.execute(
+            "SELECT version, name, applied_at FROM schema_migrations"
+        ).fetchall() if any("schema_migrations" in sql for _, sql in schema) else []
+    finally:
+        template.close()
+
+    partial = path + ".partial"
+    conn = sqlite3.connect(partial)
+    try:
+        with conn:
+            for _, sql in schema:
+                conn.execute(sql)
+            if migrations:
+                conn.executemany(
+                    "INSERT INTO schema_migrations (version, name, applied_at) VALUES (?, ?, ?)", migrations
+                )
+    finally:
+        conn.close()
+    os.replace(partial, path)
+
+    with connection(path=path) as conn:
+        upgrade(conn)
+    return path
+
+
+def upgrade_all():
+    applied = {}
+    for shop in list_tenants():
+        with connection(path=tenant_path(shop)) as conn:
+            names = upgrade(conn)
+        if names:
+            applied[shop] = names
+    return applied
+
+
+def for_each_tenant(fn, readonly=True):
+    # Relatórios entre barbearias: cada uma pelo próprio pool de leitura
+    results = {}
+    for shop in list_tenants():
+        try:
+            with connection(readonly=readonly, path=tenant_path(shop)) as conn:
+                results[shop] = fn(conn)
+        except sqlite3.Error as e:
+            results[shop] = {"error": str(e)}
+    return results
+
+
+def main(argv):
+    if len(argv) == 2 and argv[0] == "create":
+        try:
+            print(f"Barbearia criada: {create_tenant(argv[1])}")
+        except TenantError as e:
+            print(e)
+            return 1
+    elif argv == ["list"]:
+        for shop in list_tenants():
+            print(f"{shop:<24} {tenant_path(shop)}")
+    elif argv == ["upgrade"]:
+        for shop, names in upgrade_all().items():
+            for name in names:
+                print(f"{shop}: migração aplicada {name}")
+    else:
+        print("uso: python tenants.py create <shop> | list | upgrade")
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
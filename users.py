@@ -1,34 +1,93 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import g, has_request_context
+
+import config
 from consulta import add_user as add_user_to_db
-import sqlite3
-# users = {}
+from database import DB_PATH, get_db
+from records import User, USER_COLUMNS, fetch_one
+from writequeue import write
+
+# Cache LRU com TTL dos usuários: toda rota autenticada busca o usuário do token.
+# A chave inclui o arquivo do banco para não misturar barbearias.
+_cache = OrderedDict()  # (db_path, email) -> (expira_em, User)
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+
+def _cache_key(email):
+    db_path = g.get("db_path") if has_request_context() else None
+    return (db_path or DB_PATH, email)
+
+
+def _load_user(email):
+    return fetch_one(
+        get_db(readonly=True), User,
+        f"SELECT {USER_COLUMNS} FROM users WHERE email = ?", (email,)
+    )
+
 
 def get_user(email):
-    conn = sqlite3.connect("database.db")
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    if not config.USER_CACHE_SIZE:
+        return _load_user(email)
+
+    key = _cache_key(email)
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] > now:
+            _cache.move_to_end(key)
+            _cache_stats["hits"] += 1
+            return entry[1]
+        _cache_stats["misses"] += 1
 
-    cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
-    row = cursor.fetchone()
-    conn.close()
+    user = _load_user(email)
+    # Usuário inexistente não vai para o cache: o cadastro tem que enxergá-lo na hora
+    if user is not None:
+        with _cache_lock:
+            _cache[key] = (now + config.USER_CACHE_TTL, user)
+            _cache.move_to_end(key)
+            while len(_cache) > config.USER_CACHE_SIZE:
+                _cache.popitem(last=False)
+                _cache_stats["evictions"] += 1
+    return user
 
-    if row:
-        return dict(row)
-    return None
 
+def invalidate_user(email=None):
+    # Sem email limpa tudo (ex.: depois de uma restauração do banco)
+    with _cache_lock:
+        if email is None:
+            _cache.clear()
+        else:
+            for key in [k for k in _cache if k[1] == email]:
+                del _cache[key]
+        _cache_stats["invalidations"] += 1
 
 
+def user_cache_stats():
+    with _cache_lock:
+        stats = dict(_cache_stats, size=len(_cache), max_size=config.USER_CACHE_SIZE, ttl=config.USER_CACHE_TTL)
+    total = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = round(stats["hits"] / total, 4) if total else 0.0
+    return stats
+
 
 def add_user(email, name, hashed_password):
     # Primeiro adiciona ao banco de dados
     success, message = add_user_to_db(email, name, hashed_password)
-    
-    # if success:
-    #     # Se deu certo, salva também em memória (opcional)
-    #     users[email] = {
-    #         'name': name,
-    #         'password': hashed_password,
-    #         'email': email,
-    #         'avatar': f'https://i.pravatar.cc/150?u={email}'
-    #     }
-    
+
+    if success:
+        invalidate_user(email)
+
     return success, message
+
+
+def _update_password(conn, email, hashed):
+    conn.execute("UPDATE users SET password = ? WHERE email = ?", (hashed, email))
+
+
+def update_password_hash(email, hashed):
+    # Usado no rehash do login quando BCRYPT_ROUNDS muda
+    write(_update_password, email, hashed)
+    invalidate_user(email)
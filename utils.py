@@ -1,28 +1,105 @@
+import hashlib
 import jwt
-import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from passlib.hash import bcrypt
-from dotenv import load_dotenv
+from flask import g, has_request_context
 
-load_dotenv()
+import config
+import hashing
+import revocation
 
-JWT_SECRET = os.getenv("JWT_SECRET")
+JWT_SECRET = config.JWT_SECRET
 
-def generate_token(data):
+def generate_token(data, ttl=None):
+    # Com várias barbearias o token carrega a loja em que foi emitido
+    if has_request_context() and "tenant" in g and "shop" not in data:
+        data = {**data, "shop": g.tenant}
     payload = {
         **data,
-        "exp": datetime.utcnow() + timedelta(days=7)
+        "exp": datetime.utcnow() + timedelta(seconds=ttl or config.ACCESS_TOKEN_TTL)
     }
     return jwt.encode(payload, JWT_SECRET, algorithm="HS256")
 
-def verify_token(token):
+def access_token(user):
+    # Nome e avatar vão no token para o /auth/check responder sem ir ao banco
+    return generate_token({
+        "email": user["email"],
+        "name": user["name"],
+        "avatar": user.get("avatar") or "",
+    })
+
+# Cache dos tokens já verificados: sha256(token) -> (exp, payload).
+# O app manda o mesmo token em toda requisição; só o primeiro paga o jwt.decode.
+_token_cache = OrderedDict()
+_token_lock = threading.Lock()
+_token_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+def token_digest(token):
+    return hashlib.sha256(token.encode()).digest()
+
+def _decode(token):
     try:
         return jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
     except:
         return None
 
+def verify_token(token):
+    if not token:
+        return None
+    key = token_digest(token)
+    # Revogado no logout: recusado mesmo que ainda esteja no cache
+    if revocation.is_revoked(key):
+        return None
+    if not config.TOKEN_CACHE_SIZE:
+        return _decode(token)
+
+    now = time.time()
+    with _token_lock:
+        entry = _token_cache.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                _token_cache.move_to_end(key)
+                _token_stats["hits"] += 1
+                return dict(entry[1])
+            del _token_cache[key]
+        _token_stats["misses"] += 1
+
+    decoded = _decode(token)
+    # Tokens inválidos não entram (não deixam lixo no cache); sem exp também não
+    exp = decoded.get("exp") if decoded else None
+    if isinstance(exp, (int, float)):
+        with _token_lock:
+            _token_cache[key] = (exp, decoded)
+            while len(_token_cache) > config.TOKEN_CACHE_SIZE:
+                _token_cache.popitem(last=False)
+                _token_stats["evictions"] += 1
+        decoded = dict(decoded)
+    return decoded
+
+def evict_token(token):
+    with _token_lock:
+        return _token_cache.pop(token_digest(token), None) is not None
+
+def revoke_token(token, decoded):
+    # decoded já verificado; a revogação só precisa durar até o exp do próprio token
+    revocation.revoke(token_digest(token), decoded.get("email"), decoded["exp"])
+    evict_token(token)
+
+def token_cache_stats():
+    with _token_lock:
+        stats = dict(_token_stats, size=len(_token_cache), max_size=config.TOKEN_CACHE_SIZE)
+    total = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = round(stats["hits"] / total, 4) if total else 0.0
+    return stats
+
+# O bcrypt roda no pool de hashing.py; HashPoolBusy sobe quando a fila está cheia
 def hash_password(password):
-    return bcrypt.hash(password)
+    return hashing.hash_password(password)
 
 def verify_password(password, hashed):
-    return bcrypt.verify(password, hashed)
+    return hashing.verify_password(password, hashed)
+
+def verify_and_update_password(password, hashed):
+    return hashing.verify_and_update(password, hashed)
@@ -0,0 +1,201 @@
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from flask import g, has_request_context
+
+import config
+from database import DB_PATH, connection, get_db
+
+
+class WriteQueueFull(Exception):
+    pass
+
+
+_STOP = object()
+
+
+class WriteQueue:
+    """
+    Fila de escrita com group commit: as escritas que chegam dentro de `window`
+    segundos (até `max_batch`) vão numa única transação, cada uma no próprio
+    SAVEPOINT. O Future de cada escrita só é resolvido depois do COMMIT.
+    """
+
+    def __init__(self, path=None, window=None, max_batch=None, max_pending=None):
+        self.path = path or DB_PATH
+        self.window = config.WRITE_QUEUE_WINDOW_MS / 1000 if window is None else window
+        self.max_batch = max_batch or config.WRITE_QUEUE_MAX_BATCH
+        self._queue = queue.Queue(maxsize=max_pending or config.WRITE_QUEUE_MAX_PENDING)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats = {"writes": 0, "failed": 0, "batches": 0, "batch_failures": 0, "max_batch": 0}
+
+    def _start(self):
+        with self._lock:
+            # Iniciada só no primeiro uso: sobrevive ao fork dos workers do gunicorn
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=f"write-queue:{self.path}", daemon=True)
+                self._thread.start()
+
+    def submit(self, fn, *args, **kwargs):
+        # fn(conn, *args, **kwargs) não deve chamar commit(): quem confirma é a fila
+        self._start()
+        future = Future()
+        try:
+            self._queue.put((future, fn, args, kwargs), timeout=config.WRITE_QUEUE_TIMEOUT)
+        except queue.Full:
+            raise WriteQueueFull(f"Fila de escrita cheia ({self.path})") from None
+        return future
+
+    def flush(self, timeout=None):
+        # A fila é FIFO: quando este no-op é confirmado, tudo o que veio antes também foi
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        try:
+            self.submit(lambda conn: None).result(timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    def close(self, timeout=None):
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["pending"] = self._queue.qsize()
+        stats["avg_batch"] = round(stats["writes"] / stats["batches"], 2) if stats["batches"] else 0
+        return stats
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            batch, stop = [item], False
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._commit(batch)
+            if stop:
+                return
+
+    def _commit(self, batch):
+        outcomes = []
+        try:
+            with connection(path=self.path) as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    for future, fn, args, kwargs in batch:
+                        if not future.set_running_or_notify_cancel():
+                            continue
+                        conn.execute("SAVEPOINT write_item")
+                        try:
+                            value = fn(conn, *args, **kwargs)
+                        except Exception as e:
+                            # Só esta escrita é desfeita; as outras do lote seguem
+                            conn.execute("ROLLBACK TO write_item")
+                            conn.execute("RELEASE write_item")
+                            outcomes.append((future, False, e))
+                        else:
+                            conn.execute("RELEASE write_item")
+                            outcomes.append((future, True, value))
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+        except Exception as e:
+            with self._lock:
+                self._stats["batch_failures"] += 1
+                self._stats["failed"] += len(batch)
+            for future, *_ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["writes"] += len(outcomes)
+            self._stats["failed"] += sum(1 for _, ok, _ in outcomes if not ok)
+            self._stats["max_batch"] = max(self._stats["max_batch"], len(batch))
+
+        for future, ok, value in outcomes:
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def queue_for(path=None):
+    path = path or DB_PATH
+    with _queues_lock:
+        if path not in _queues:
+            _queues[path] = WriteQueue(path)
+        return _queues[path]
+
+
+def write(fn, *args, **kwargs):
+    """
+    Executa fn(conn, *args, **kwargs) e confirma. Com WRITE_QUEUE ligada passa
+    pela fila e espera o commit do lote; senão (ou se a requisição já segura o
+    writer) grava direto, como antes.
+    """
+    if has_request_context():
+        if not config.WRITE_QUEUE or "db" in g:
+            conn = get_db()
+            with conn:
+                return fn(conn, *args, **kwargs)
+        path = g.get("db_path")
+    else:
+        path = None
+        if not config.WRITE_QUEUE:
+            with connection() as conn, conn:
+                return fn(conn, *args, **kwargs)
+
+    return queue_for(path).submit(fn, *args, **kwargs).result(timeout=config.WRITE_QUEUE_TIMEOUT)
+
+
+def flush(timeout=None):
+    with _queues_lock:
+        queues = list(_queues.values())
+    return all(q.flush(timeout) for q in queues)
+
+
+def stats():
+    with _queues_lock:
+        return {path: q.stats() for path, q in _queues.items()}
+
+
+def reset():
+    # Depois de um fork: as threads da fila não vêm junto, cada worker cria as suas
+    global _queues, _queues_lock
+    _queues_lock = threading.Lock()
+    _queues = {}
+
+
+@atexit.register
+def _shutdown():
+    flush(timeout=config.WRITE_QUEUE_TIMEOUT)
+    with _queues_lock:
+        queues = list(_queues.values())
+    for q in queues:
+        q.close(timeout=1)